@@ -0,0 +1,235 @@
+'''
+Micro-benchmarks das rotinas de limpeza executadas sobre cada célula ingerida.
+
+Cobre utils/convert_date.py, utils/safe_parse_date.py, a normalização de cabeçalhos
+(unidecode(col.lower().replace(' ', '_'))) e o tratamento de NaN (df.where(pd.notna(df), None)
+e o "None if pd.isna(x) else x" por célula), em entradas de 1e4 a 1e7 elementos com colunas
+mistas e sujas (NaN, None, Timestamps, datas inválidas, números de série do Excel, texto).
+
+Cada caso "atual" é acompanhado de uma alternativa vetorizada de referência, para medir o ganho
+de uma substituição antes de aplicá-la no código. Como no pytest-benchmark, cada caso roda várias
+rodadas e reporta mín./mediana/média/desvio; o resultado é gravado em JSON e, com --baseline,
+comparado com uma execução anterior (código de saída 1 se algum caso piorar além da tolerância).
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/cleaning_benchmark.py --sizes 10000 100000 1000000 --output benchmarks/results/limpeza.json
+    python benchmarks/cleaning_benchmark.py --baseline benchmarks/results/limpeza.json --tolerance 0.2
+    python benchmarks/cleaning_benchmark.py --filter datas --sizes 10000000 --scalar-limit 10000000
+'''
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from unidecode import unidecode
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, SRC_DIR)
+
+from utils.convert_date import convert_date
+from utils.safe_parse_date import safe_parse_date
+
+HEADER_WORDS = ["Número", "Contrato", "Situação", "Física", "Término", "Após", "Aditivo", "Publicação", "Ceará", "Convênio", "Código", "Beneficiário"]
+
+
+'''
+Entradas sintéticas (mesma semente para todas as execuções)
+'''
+def dirty_dates(size, seed):
+    rng = np.random.default_rng(seed)
+    days = rng.integers(0, 6000, size)
+    dates = pd.Timestamp("2007-01-01") + pd.to_timedelta(days, unit="D")
+    values = pd.Series(dates.strftime("%d/%m/%Y"), dtype=object)
+    kind = rng.random(size)
+    values[kind < 0.10] = np.nan
+    values[(kind >= 0.10) & (kind < 0.12)] = None
+    timestamps = (kind >= 0.12) & (kind < 0.20)
+    values[timestamps] = list(dates[timestamps])
+    garbage = (kind >= 0.20) & (kind < 0.23)
+    values[garbage] = rng.choice(["31/02/2020", "N/A", "", "2020-01-05", "sem data", "00/00/0000"], int(garbage.sum()))
+    serials = (kind >= 0.23) & (kind < 0.25)
+    values[serials] = rng.integers(39000, 45000, int(serials.sum())).astype(float)
+    return values
+
+def dirty_frame(size, seed):
+    rng = np.random.default_rng(seed)
+    values = np.round(rng.lognormal(12, 1.5, size), 2)
+    values[rng.random(size) < 0.15] = np.nan
+    text = pd.Series(rng.choice(["Secretaria da Saúde", "Fortaleza", "Sobral", "Obra"], size), dtype=object)
+    text[rng.random(size) < 0.1] = np.nan
+    text[rng.random(size) < 0.05] = None
+    dates = pd.Series(pd.Timestamp("2007-01-01") + pd.to_timedelta(rng.integers(0, 6000, size), unit="D"))
+    dates[rng.random(size) < 0.2] = pd.NaT
+    mixed = pd.Series(rng.integers(0, 1000, size), dtype=object)
+    mixed[rng.random(size) < 0.3] = "12.345.678/0001-90"
+    mixed[rng.random(size) < 0.1] = np.nan
+    return pd.DataFrame({"valor": values, "texto": text, "data": dates, "misto": mixed})
+
+def dirty_headers(size, seed):
+    rng = np.random.default_rng(seed)
+    words = rng.choice(HEADER_WORDS, (size, 3))
+    return [" ".join(row) + f" {index}" for index, row in enumerate(words)]
+
+
+'''
+Implementações atuais (como executadas na ingestão) e alternativas vetorizadas de referência
+'''
+def quiet(function):
+    # convert_date/safe_parse_date imprimem no stdout; a saída é descartada, mas o custo é medido
+    def run(data):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return function(data)
+    return run
+
+def convert_date_per_cell(values):
+    return [convert_date(value) for value in values]
+
+def convert_date_vectorized(values):
+    # Textos no formato dd/mm/aaaa; datetimes/Timestamps são mantidos; o restante vira NaT
+    parsed = pd.to_datetime(values.where(values.map(type) == str), format="%d/%m/%Y", errors="coerce")
+    timestamps = values.map(lambda value: isinstance(value, datetime))
+    parsed[timestamps] = pd.to_datetime(values[timestamps])
+    return parsed
+
+def safe_parse_date_per_cell(values):
+    return [safe_parse_date(value) for value in values]
+
+def safe_parse_date_vectorized(values):
+    return pd.to_datetime(values, errors="coerce", format="mixed").dt.date
+
+def headers_per_column(headers):
+    return [unidecode(col.lower().replace(' ', '_')) for col in headers]
+
+def headers_vectorized(headers):
+    # unidecode aplicado uma vez ao texto concatenado; a separação é refeita pelo delimitador
+    return unidecode("\n".join(headers).lower().replace(" ", "_")).split("\n")
+
+def nan_where(df):
+    # Em colunas float o None volta a ser NaN: apenas as colunas object/datetime recebem None
+    return df.where(pd.notna(df), None)
+
+def nan_astype_object(df):
+    return df.astype(object).where(pd.notna(df), None)
+
+def nan_per_cell(df):
+    return [[None if pd.isna(value) else value for value in row] for row in zip(*(df[column] for column in df.columns))]
+
+def nan_records(df):
+    return df.astype(object).where(pd.notna(df), None).to_numpy().tolist()
+
+# Casos: (grupo, nome, gerador de entrada, função, por célula?)
+CASES = [
+    ("datas", "convert_date_por_celula", dirty_dates, quiet(convert_date_per_cell), True),
+    ("datas", "convert_date_vetorizado", dirty_dates, convert_date_vectorized, False),
+    ("datas", "safe_parse_date_por_celula", dirty_dates, quiet(safe_parse_date_per_cell), True),
+    ("datas", "safe_parse_date_vetorizado", dirty_dates, safe_parse_date_vectorized, False),
+    ("cabecalhos", "unidecode_por_coluna", dirty_headers, headers_per_column, False),
+    ("cabecalhos", "unidecode_concatenado", dirty_headers, headers_vectorized, False),
+    ("nan", "df_where_notna", dirty_frame, nan_where, False),
+    ("nan", "df_astype_object_where", dirty_frame, nan_astype_object, False),
+    ("nan", "isna_por_celula", dirty_frame, nan_per_cell, True),
+    ("nan", "astype_object_to_list", dirty_frame, nan_records, False),
+]
+
+
+def measure(function, data, rounds, min_time):
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < rounds or time.perf_counter() - started < min_time:
+        start = time.perf_counter()
+        function(data)
+        timings.append(time.perf_counter() - start)
+        if len(timings) >= rounds * 10:
+            break
+    return timings
+
+def summarize(timings, size):
+    median = statistics.median(timings)
+    return {
+        "rounds": len(timings),
+        "min_s": round(min(timings), 6),
+        "median_s": round(median, 6),
+        "mean_s": round(statistics.mean(timings), 6),
+        "stddev_s": round(statistics.stdev(timings), 6) if len(timings) > 1 else 0.0,
+        "ns_per_element": round(median / size * 1e9, 1),
+    }
+
+'''
+Compara com um resultado anterior; retorna os casos cuja mediana piorou além da tolerância
+'''
+def compare(results, baseline, tolerance):
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get("results", {}).get(key)
+        if previous and "median_s" in current and "median_s" in previous and previous["median_s"]:
+            change = (current["median_s"] - previous["median_s"]) / previous["median_s"]
+            if change > tolerance:
+                regressions.append(f"{key}: mediana {previous['median_s']} s -> {current['median_s']} s (+{change:.0%})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks das rotinas de limpeza da ingestão")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="Quantidade de elementos (ou linhas)")
+    parser.add_argument("--rounds", type=int, default=5, help="Rodadas mínimas por caso")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Tempo mínimo (s) de medição por caso")
+    parser.add_argument("--scalar-limit", type=int, default=100_000, help="Tamanho máximo para os casos por célula (safe_parse_date leva ~0,3 ms por célula)")
+    parser.add_argument("--filter", help="Executa apenas os casos cujo grupo ou nome contém o texto")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results", f"limpeza-{datetime.now():%Y%m%d-%H%M%S}.json"))
+    parser.add_argument("--baseline", help="Resultado anterior para comparação")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Piora relativa tolerada na comparação (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'caso':<48} {'mín.':>10} {'mediana':>10} {'desvio':>10} {'ns/elem':>10} {'rodadas':>8}")
+    for size in args.sizes:
+        inputs = {}
+        for group, name, generate, function, per_cell in CASES:
+            key = f"{group}/{name}[{size}]"
+            if args.filter and args.filter not in group and args.filter not in name:
+                continue
+            if per_cell and size > args.scalar_limit:
+                results[key] = {"skipped": f"acima de --scalar-limit ({args.scalar_limit})"}
+                print(f"{key:<48} ignorado (acima de --scalar-limit)")
+                continue
+            if generate not in inputs:
+                inputs[generate] = generate(size, args.seed)
+            result = summarize(measure(function, inputs[generate], args.rounds, args.min_time), size)
+            results[key] = result
+            print(f"{key:<48} {result['min_s']:>9.4f}s {result['median_s']:>9.4f}s {result['stddev_s']:>9.4f}s "
+                  f"{result['ns_per_element']:>10.1f} {result['rounds']:>8}")
+
+    output = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "sizes": args.sizes,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(output, file, indent=2, ensure_ascii=False)
+    print(f"Resultados gravados em {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSÃO: {regression}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
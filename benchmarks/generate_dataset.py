@@ -0,0 +1,286 @@
+'''
+Gerador de planilhas sintéticas de contratos e convênios, com as mesmas colunas dos arquivos
+lidos pelas rotas de ingestão (POST /contracts/, POST /agreements/ e POST /administrative_processes/).
+
+As distribuições imitam os dados reais: cardinalidades das categorias (órgãos, fornecedores,
+municípios, modalidades), valores com distribuição log-normal, prazos e taxas de nulos por coluna.
+A geração é feita em blocos de tamanho fixo, portanto a mesma semente produz sempre os mesmos dados,
+de 10 mil a 10 milhões de linhas.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/generate_dataset.py --contracts 100000 --agreements 50000 --seed 42 --output src/data
+    python benchmarks/generate_dataset.py --contracts 10000000 --agreements 2000000 --format csv --output /tmp/sfa-data
+
+Com --format xlsx cada planilha comporta no máximo 1.048.575 linhas (limite do Excel); volumes
+maiores devem usar --format csv.
+'''
+import argparse
+import csv
+import os
+import sys
+import time
+from datetime import date
+import numpy as np
+import pandas as pd
+
+# Linhas geradas por bloco (fixo, para que o resultado não dependa da memória disponível)
+CHUNK_ROWS = 100_000
+
+# Limite de linhas de dados de uma planilha do Excel (descontando o cabeçalho)
+XLSX_MAX_ROWS = 1_048_575
+
+# Arquivos de contratos lidos por POST /contracts/, com o período de assinatura de cada um
+CONTRACT_FILES = [
+    ("Contratos 2007 - 2010", date(2007, 1, 1), date(2010, 12, 31)),
+    ("Contratos 2011 - 2015", date(2011, 1, 1), date(2015, 12, 31)),
+    ("Contratos 2016 - 2020", date(2016, 1, 1), date(2020, 12, 31)),
+    ("Contratos 2021-Julho 2023", date(2021, 1, 1), date(2023, 7, 31)),
+]
+AGREEMENTS_FILE = ("Convênios 2007 - Setembro 2023", date(2007, 1, 1), date(2023, 9, 30))
+
+# Cabeçalhos originais; após unidecode(col.lower().replace(' ', '_')) resultam nas colunas esperadas
+CONTRACT_HEADERS = [
+    "Número Contrato", "CPF/CNPJ", "Contratante", "Contratado", "Tipo Objeto", "Objeto",
+    "Valor Original", "Valor Aditivo", "Valor Atualizado", "Valor Empenhado", "Valor Pago",
+    "Data de Assinatura", "Data de Término Original", "Data de Término Após Aditivo", "Data de Rescisão", "Data Publicação no DOE",
+    "Nº do Processo - SPU", "Modalidade de licitação", "Justificativa", "Status str", "Situação Física",
+]
+AGREEMENT_HEADERS = [
+    "Código Plano de Trabalho", "Concedente", "Convenente", "Objeto",
+    "Valor Inicial Total", "Valor Inicial do Repasse do Concedente", "Valor Inicial da Contrapartida do Convenente/Beneficiário",
+    "Valor Atualizado Total", "Valor Pago",
+    "Data de Assinatura", "Data de Término Após Aditivo/Apostilamento", "Data de Publicação na Plataforma Ceará Transparente", "Data Publicação no DOE",
+]
+
+ORGAOS = [
+    "Secretaria da Educação", "Secretaria da Saúde", "Secretaria da Infraestrutura", "Secretaria das Cidades",
+    "Secretaria da Segurança Pública e Defesa Social", "Secretaria do Desenvolvimento Agrário", "Secretaria da Fazenda",
+    "Secretaria do Planejamento e Gestão", "Secretaria da Cultura", "Secretaria do Esporte e Juventude",
+    "Secretaria dos Recursos Hídricos", "Secretaria do Meio Ambiente", "Secretaria do Turismo",
+    "Secretaria da Proteção Social", "Secretaria da Ciência, Tecnologia e Educação Superior",
+    "Departamento Estadual de Rodovias", "Superintendência de Obras Públicas", "Companhia de Gestão dos Recursos Hídricos",
+    "Polícia Militar do Ceará", "Corpo de Bombeiros Militar", "Detran", "Universidade Estadual do Ceará",
+]
+MUNICIPIOS = [
+    "Fortaleza", "Caucaia", "Juazeiro do Norte", "Maracanaú", "Sobral", "Crato", "Itapipoca", "Maranguape",
+    "Iguatu", "Quixadá", "Pacatuba", "Aquiraz", "Quixeramobim", "Canindé", "Russas", "Crateús", "Tianguá",
+    "Aracati", "Cascavel", "Pacajus", "Icó", "Horizonte", "Camocim", "Morada Nova", "Acaraú", "Viçosa do Ceará",
+    "Barbalha", "Limoeiro do Norte", "Tauá", "Trairi",
+]
+TIPOS_OBJETO = ["Obras", "Serviços", "Serviços de Engenharia", "Aquisição de Bens", "Locação de Imóveis", "Consultoria", "Tecnologia da Informação", "Outros"]
+MODALIDADES = ["Pregão Eletrônico", "Dispensa", "Inexigibilidade", "Concorrência", "Tomada de Preços", "Convite", "Pregão Presencial", "Adesão a Ata", "RDC", "Chamamento Público"]
+MODALIDADE_PESOS = [0.38, 0.2, 0.12, 0.08, 0.07, 0.04, 0.04, 0.04, 0.02, 0.01]
+SITUACOES = ["Concluído", "Em Execução", "Paralisado", "Cancelado", "Não Iniciado", "Rescindido"]
+SITUACAO_PESOS = [0.55, 0.25, 0.06, 0.05, 0.06, 0.03]
+STATUS = ["Vigente", "Encerrado", "Rescindido", "Suspenso", "Inadimplente"]
+STATUS_PESOS = [0.3, 0.55, 0.06, 0.04, 0.05]
+OBJETOS = [
+    "Construção de escola de ensino médio", "Reforma de unidade básica de saúde", "Pavimentação em pedra tosca",
+    "Aquisição de equipamentos hospitalares", "Fornecimento de merenda escolar", "Manutenção de rodovias estaduais",
+    "Construção de passagem molhada", "Locação de veículos", "Serviços de limpeza e conservação",
+    "Implantação de sistema de abastecimento de água", "Aquisição de material de expediente", "Consultoria em gestão",
+    "Construção de areninha", "Perfuração de poços", "Serviços de vigilância", "Aquisição de medicamentos",
+]
+JUSTIFICATIVAS = [
+    "Menor preço global", "Menor preço por item", "Contratação emergencial", "Fornecedor exclusivo",
+    "Notória especialização", "Valor abaixo do limite legal", "Licitação deserta", "Continuidade do serviço",
+]
+
+
+def zipf_choice(rng, values, size, exponent=1.1):
+    # Poucos valores muito frequentes e uma cauda longa, como órgãos e fornecedores reais
+    ranks = np.arange(1, len(values) + 1)
+    weights = 1 / ranks ** exponent
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=size, p=weights / weights.sum())]
+
+def weighted_choice(rng, values, weights, size):
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=size, p=weights)]
+
+def with_nulls(rng, values, rate):
+    values = pd.Series(values, dtype=object)
+    return values.mask(rng.random(len(values)) < rate, None)
+
+def random_dates(rng, start, end, size):
+    days = (end - start).days
+    return pd.to_datetime(start) + pd.to_timedelta(rng.integers(0, days + 1, size), unit="D")
+
+def format_dates(dates):
+    # As planilhas de contratos trazem as datas como texto dd/mm/aaaa (ver utils/convert_date.py).
+    # Formata apenas as datas distintas (poucos milhares), bem mais rápido que strftime em cada linha
+    codes, uniques = pd.factorize(pd.Series(dates))
+    labels = np.append(np.asarray(uniques.strftime("%d/%m/%Y"), dtype=object), None)
+    return pd.Series(labels[codes])
+
+def document(ids):
+    # CNPJ para pessoas jurídicas (maioria) e CPF para pessoas físicas
+    digits = [f"{value:014d}" for value in ids]
+    return [
+        f"{d[:2]}.{d[2:5]}.{d[5:8]}/{d[8:12]}-{d[12:]}" if value % 7 else f"{d[3:6]}.{d[6:9]}.{d[9:12]}-{d[12:]}"
+        for d, value in zip(digits, ids)
+    ]
+
+'''
+Bloco de contratos com assinatura entre start e end
+'''
+def contract_chunk(rng, size, start, end, first_number, suppliers):
+    supplier_ids = zipf_choice(rng, np.arange(suppliers), size, exponent=1.05).astype(np.int64)
+    signed = random_dates(rng, start, end, size)
+
+    original = np.round(rng.lognormal(mean=12, sigma=1.6, size=size), 2)
+    has_addendum = rng.random(size) < 0.3
+    addendum = np.round(np.where(has_addendum, original * rng.uniform(0.01, 0.5, size), 0.0), 2)
+    updated = original + addendum
+    committed = np.round(updated * rng.uniform(0.4, 1.0, size), 2)
+    paid = np.round(committed * rng.beta(4, 1.5, size), 2)
+
+    original_end = signed + pd.to_timedelta(rng.integers(60, 1096, size), unit="D")
+    addendum_end = pd.Series(original_end + pd.to_timedelta(rng.integers(30, 731, size), unit="D")).where(has_addendum)
+    rescinded = pd.Series(signed + pd.to_timedelta(rng.integers(30, 720, size), unit="D")).where(rng.random(size) < 0.05)
+    published = pd.Series(signed + pd.to_timedelta(rng.integers(1, 31, size), unit="D")).where(rng.random(size) >= 0.1)
+
+    numbers = np.arange(first_number, first_number + size)
+    years = pd.Series(signed).dt.year.to_numpy()
+    return pd.DataFrame({
+        "Número Contrato": [f"{number:06d}/{year}" for number, year in zip(numbers, years)],
+        "CPF/CNPJ": document((supplier_ids * 2654435761 + 97531) % 10**14),
+        "Contratante": zipf_choice(rng, ORGAOS, size),
+        "Contratado": [f"Fornecedor {supplier:06d} Ltda" for supplier in supplier_ids],
+        "Tipo Objeto": with_nulls(rng, weighted_choice(rng, TIPOS_OBJETO, [0.2, 0.3, 0.15, 0.2, 0.04, 0.04, 0.05, 0.02], size), 0.01),
+        "Objeto": with_nulls(rng, zipf_choice(rng, OBJETOS, size, exponent=0.8), 0.01),
+        "Valor Original": original,
+        "Valor Aditivo": addendum,
+        "Valor Atualizado": np.round(updated, 2),
+        "Valor Empenhado": committed,
+        "Valor Pago": paid,
+        "Data de Assinatura": format_dates(signed),
+        "Data de Término Original": format_dates(original_end),
+        "Data de Término Após Aditivo": format_dates(addendum_end),
+        "Data de Rescisão": format_dates(rescinded),
+        "Data Publicação no DOE": format_dates(published),
+        "Nº do Processo - SPU": with_nulls(rng, [f"{value:08d}/{year}" for value, year in zip(rng.integers(0, 10**8, size), years)], 0.03),
+        "Modalidade de licitação": with_nulls(rng, weighted_choice(rng, MODALIDADES, MODALIDADE_PESOS, size), 0.02),
+        "Justificativa": with_nulls(rng, zipf_choice(rng, JUSTIFICATIVAS, size), 0.4),
+        "Status str": weighted_choice(rng, STATUS, STATUS_PESOS, size),
+        "Situação Física": with_nulls(rng, weighted_choice(rng, SITUACOES, SITUACAO_PESOS, size), 0.05),
+    })
+
+'''
+Bloco de convênios com assinatura entre start e end
+'''
+def agreement_chunk(rng, size, start, end, first_number, partners):
+    signed = random_dates(rng, start, end, size)
+    total = np.round(rng.lognormal(mean=12.5, sigma=1.4, size=size), 2)
+    counterpart = np.round(total * rng.uniform(0.0, 0.2, size), 2)
+    transfer = np.round(total - counterpart, 2)
+    updated = np.round(total * np.where(rng.random(size) < 0.25, rng.uniform(1.0, 1.5, size), 1.0), 2)
+    paid = np.round(updated * rng.beta(3, 1.5, size), 2)
+
+    partner_names = MUNICIPIOS + [f"Associação Comunitária {index:05d}" for index in range(max(partners - len(MUNICIPIOS), 0))]
+    end_after = pd.Series(signed + pd.to_timedelta(rng.integers(180, 1461, size), unit="D")).where(rng.random(size) >= 0.15)
+    platform = pd.Series(signed + pd.to_timedelta(rng.integers(0, 61, size), unit="D")).where(rng.random(size) >= 0.05)
+    published = pd.Series(signed + pd.to_timedelta(rng.integers(1, 31, size), unit="D")).where(rng.random(size) >= 0.1)
+
+    years = pd.Series(signed).dt.year.to_numpy()
+    return pd.DataFrame({
+        "Código Plano de Trabalho": [f"{number:07d}/{year}" for number, year in zip(range(first_number, first_number + size), years)],
+        "Concedente": zipf_choice(rng, ORGAOS, size, exponent=1.3),
+        "Convenente": zipf_choice(rng, partner_names, size, exponent=0.9),
+        "Objeto": with_nulls(rng, zipf_choice(rng, OBJETOS, size, exponent=0.8), 0.02),
+        "Valor Inicial Total": total,
+        "Valor Inicial do Repasse do Concedente": transfer,
+        "Valor Inicial da Contrapartida do Convenente/Beneficiário": with_nulls(rng, counterpart, 0.2),
+        "Valor Atualizado Total": updated,
+        "Valor Pago": with_nulls(rng, paid, 0.1),
+        # As datas de convênios são células de data do Excel (ver utils/safe_parse_date.py)
+        "Data de Assinatura": signed,
+        "Data de Término Após Aditivo/Apostilamento": end_after,
+        "Data de Publicação na Plataforma Ceará Transparente": platform,
+        "Data Publicação no DOE": published,
+    })
+
+
+class CsvWriter:
+    def __init__(self, path, headers):
+        self.file = open(path, "w", encoding="utf-8", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(headers)
+
+    def write(self, df):
+        df.to_csv(self.file, header=False, index=False, date_format="%Y-%m-%d")
+
+    def close(self):
+        self.file.close()
+
+
+class XlsxWriter:
+    def __init__(self, path, headers):
+        # Modo write_only do openpyxl: as linhas são gravadas em fluxo, sem manter a planilha na memória
+        from openpyxl import Workbook
+
+        self.path = path
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet()
+        self.sheet.append(headers)
+
+    def write(self, df):
+        for row in df.astype(object).where(pd.notna(df), None).itertuples(index=False, name=None):
+            self.sheet.append([value.to_pydatetime() if isinstance(value, pd.Timestamp) else value for value in row])
+
+    def close(self):
+        self.workbook.save(self.path)
+
+
+def split_rows(total, files):
+    # Distribui as linhas entre os arquivos proporcionalmente à duração de cada período
+    days = [(end - start).days + 1 for _, start, end in files]
+    counts = [total * day // sum(days) for day in days]
+    counts[-1] += total - sum(counts)
+    return counts
+
+def write_file(rng, path, headers, rows, build_chunk, fmt, first_number, **kwargs):
+    if fmt == "xlsx" and rows > XLSX_MAX_ROWS:
+        sys.exit(f"{path}: {rows} linhas ultrapassam o limite do Excel ({XLSX_MAX_ROWS}); utilize --format csv")
+
+    writer = XlsxWriter(path, headers) if fmt == "xlsx" else CsvWriter(path, headers)
+    written = 0
+    while written < rows:
+        size = min(CHUNK_ROWS, rows - written)
+        writer.write(build_chunk(rng, size, first_number=first_number + written, **kwargs))
+        written += size
+    writer.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera planilhas sintéticas de contratos e convênios")
+    parser.add_argument("--contracts", type=int, default=10_000, help="Total de contratos (distribuídos entre os quatro arquivos de período)")
+    parser.add_argument("--agreements", type=int, default=10_000, help="Total de convênios")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do gerador (mesma semente, mesmos dados)")
+    parser.add_argument("--format", choices=["xlsx", "csv"], default="xlsx", help="Formato dos arquivos gerados")
+    parser.add_argument("--output", default=os.path.join("src", "data"), help="Diretório de saída (as rotas de ingestão leem src/data)")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    # Uma sequência independente por arquivo: alterar o volume de um arquivo não muda os demais
+    seeds = np.random.SeedSequence(args.seed).spawn(len(CONTRACT_FILES) + 1)
+    # Cardinalidades proporcionais ao volume, como nos dados reais
+    suppliers = max(args.contracts // 15, 50)
+    partners = max(args.agreements // 40, len(MUNICIPIOS))
+
+    first_number = 1
+    for (name, start, end), rows, seed in zip(CONTRACT_FILES, split_rows(args.contracts, CONTRACT_FILES), seeds):
+        path = os.path.join(args.output, f"{name}.{args.format}")
+        started = time.perf_counter()
+        write_file(np.random.default_rng(seed), path, CONTRACT_HEADERS, rows, contract_chunk, args.format,
+                   start=start, end=end, first_number=first_number, suppliers=suppliers)
+        first_number += rows
+        print(f"{path}: {rows} contratos em {time.perf_counter() - started:.1f} s")
+
+    name, start, end = AGREEMENTS_FILE
+    path = os.path.join(args.output, f"{name}.{args.format}")
+    started = time.perf_counter()
+    write_file(np.random.default_rng(seeds[-1]), path, AGREEMENT_HEADERS, args.agreements, agreement_chunk, args.format,
+               start=start, end=end, first_number=1, partners=partners)
+    print(f"{path}: {args.agreements} convênios em {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
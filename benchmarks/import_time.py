@@ -0,0 +1,74 @@
+'''
+Benchmark do tempo de inicialização da aplicação.
+
+Mede, em um processo novo, o tempo de "import main" (descontando a inicialização do
+próprio interpretador) e falha com código de saída 1 se a mediana ultrapassar o orçamento.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/import_time.py --budget-ms 1500 --runs 5
+'''
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Módulos que não devem ser carregados na inicialização
+DEFERRED_MODULES = ["pandas", "matplotlib", "unidecode"]
+
+
+def run_import(code):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=SRC_DIR, check=True, stdout=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def slowest_imports(limit):
+    # Usa -X importtime para listar os módulos com maior tempo acumulado
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=SRC_DIR, check=True, capture_output=True, text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        rows.append((int(cumulative.strip()), name.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do tempo de importação da aplicação")
+    parser.add_argument("--budget-ms", type=float, default=1500, help="Tempo máximo de importação (mediana) em ms")
+    parser.add_argument("--runs", type=int, default=5, help="Quantidade de execuções")
+    parser.add_argument("--top", type=int, default=10, help="Quantidade de módulos mais lentos exibidos")
+    args = parser.parse_args()
+
+    baseline = statistics.median(run_import("pass") for _ in range(args.runs))
+    timings = [run_import("import main") - baseline for _ in range(args.runs)]
+    median = statistics.median(timings)
+
+    print(f"Importação de main: mediana {median:.0f} ms (mín. {min(timings):.0f} ms, máx. {max(timings):.0f} ms)")
+    print("Módulos mais lentos (tempo acumulado):")
+    for cumulative, name in slowest_imports(args.top):
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failures = []
+    check = f"import main, sys; print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    loaded = subprocess.run([sys.executable, "-c", check], cwd=SRC_DIR, check=True, capture_output=True, text=True).stdout.strip()
+    if loaded:
+        failures.append(f"módulos pesados carregados na inicialização: {loaded}")
+    if median > args.budget_ms:
+        failures.append(f"importação levou {median:.0f} ms, acima do orçamento de {args.budget_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"FALHA: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
-from fastapi import FastAPI, Depends
+import os
+from typing import Literal
+from fastapi import FastAPI, Depends, HTTPException
+from fastapi.responses import FileResponse, PlainTextResponse
 from sqlmodel import Session
-from database import get_db
+from database import close_db, get_db, get_pool_stats, init_db
 from models import *
 from services.contracts import router as contracts_router
 from services.contract_values import router as contract_values_router
@@ -10,13 +13,28 @@ from services.agreements import router as agreements_router
 from services.agreement_values import router as agreement_values_router
 from services.agreement_dates import router as agreement_dates_router
 from services.accountability import router as accountability_router
+from services.dashboard import router as dashboard_router
+from services.export import router as export_router
+from services.analytics import router as analytics_router
+from services.cube import router as cube_router
+from services.distributions import router as distributions_router
+from services.suppliers import router as suppliers_router
+from services.duplicates import router as duplicates_router
+from utils.admission import get_admission_stats
+from utils.executors import shutdown_executors
 from utils.generate_logs import generate_logs
+from utils.metrics import MetricsMiddleware, render_metrics
+from utils.request_profiler import RequestProfilerMiddleware, get_request_profiler_config, profile_path
+from utils.sql_profiler import SQLProfilerMiddleware, get_profiler_config, statement_stats
 from contextlib import asynccontextmanager
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     generate_logs()
+    init_db()
     yield
+    await close_db()
+    shutdown_executors()
 
 app = FastAPI(
     title="State Financial Analyzer",
@@ -24,12 +42,39 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Métricas de latência, tamanho, status e consultas SQL de cada rota
+app.add_middleware(MetricsMiddleware)
+
+# Acompanhamento dos comandos SQL de cada requisição (detecção de N+1)
+app.add_middleware(SQLProfilerMiddleware)
+
+# Perfil (cProfile) sob demanda das requisições com o cabeçalho X-Profile, quando habilitado
+app.add_middleware(RequestProfilerMiddleware)
+
 
 @app.get("/")
 def get_db(db: Session = Depends(get_db)):
     if db is None:
         return {"message": "Database not connected"}
-    return {"message": "Database connected"}
+    return {"message": "Database connected", "pool": get_pool_stats(), "admission": get_admission_stats()}
+
+# Métricas no formato de texto do Prometheus
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# Comandos SQL com maior tempo acumulado, agrupados pela impressão digital
+@app.get("/profiling/sql", include_in_schema=False)
+def profiling_sql():
+    return statement_stats.top(get_profiler_config()["top"])
+
+# Download de um perfil gerado pelo cabeçalho X-Profile (pstats ou resumo em texto)
+@app.get("/profiling/profiles/{profile_id}", include_in_schema=False)
+def download_profile(profile_id: str, format: Literal["prof", "txt"] = "prof"):
+    path = profile_path(profile_id, format)
+    if not get_request_profiler_config()["enabled"] or path is None or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    return FileResponse(path, filename=os.path.basename(path))
 
 # Adicionando rotas de contratos
 app.include_router(contracts_router)
@@ -53,4 +98,25 @@ app.include_router(agreement_values_router)
 app.include_router(agreement_dates_router)
 
 # Adicionando rotas de prestação de contas
-app.include_router(accountability_router)
\ No newline at end of file
+app.include_router(accountability_router)
+
+# Adicionando rota do painel de gráficos
+app.include_router(dashboard_router)
+
+# Adicionando rotas de exportação colunar (Parquet / Arrow)
+app.include_router(export_router)
+
+# Adicionando rotas de análise (consulta genérica e snapshot do motor analítico)
+app.include_router(analytics_router)
+
+# Adicionando rota do cubo multidimensional
+app.include_router(cube_router)
+
+# Adicionando rotas de distribuição dos valores (quantis e histogramas)
+app.include_router(distributions_router)
+
+# Adicionando rotas de fornecedores (maiores fornecedores e concentração)
+app.include_router(suppliers_router)
+
+# Adicionando rotas de deduplicação (grupos de duplicatas e mesclagem)
+app.include_router(duplicates_router)
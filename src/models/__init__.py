@@ -6,6 +6,12 @@ from .agreement import Agreement
 from .agreement_values import AgreementValues
 from .agreement_dates import AgreementDates
 from .accountability import Accountability
+from .summary_state import SummaryState
+from .value_sketch import ValueSketch
+from .supplier_total import SupplierTotal
+from .contract_anomaly import ContractAnomaly
+from .record_fingerprint import RecordFingerprint
+from .lsh_bucket import LshBucket
 
 
-__all__ = ["Contract", "ContractValues", "ContractDates", "AdministrativeProcess", "Agreement", "AgreementValues", "AgreementDates", "Accountability"]
\ No newline at end of file
+__all__ = ["Contract", "ContractValues", "ContractDates", "AdministrativeProcess", "Agreement", "AgreementValues", "AgreementDates", "Accountability", "SummaryState", "ValueSketch", "SupplierTotal", "ContractAnomaly", "RecordFingerprint", "LshBucket"]
\ No newline at end of file
@@ -0,0 +1,25 @@
+from typing import Optional
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+
+# Valor de contrato atípico em uma métrica, em relação ao seu grupo (modalidade, ano)
+class ContractAnomaly(SQLModel, table=True):
+    __tablename__ = "contract_anomalies"  # Table name
+    __table_args__ = (
+        Index("ix_contract_anomalies_metrica_score", "metrica", "score"),
+        Index("ix_contract_anomalies_contract_id", "contract_id"),
+    )
+    
+    id: int = Field(default=None, primary_key=True)
+    contract_id: int
+    contract_value_id: int
+    ano: Optional[int] = Field(default=None)
+    modalidade: Optional[str] = Field(default=None)
+    metrica: str  # razao_aditivo, razao_pago_empenhado ou excesso_pago_atualizado
+    valor: float  # Valor da métrica no contrato
+    mediana: float  # Mediana da métrica no grupo
+    escala: float  # Desvio absoluto mediano (MAD) do grupo, na escala do desvio padrão
+    z_robusto: float
+    score: float  # |z_robusto|, usado na ordenação
+    grupo: str  # modalidade_ano ou geral (grupos pequenos usam a distribuição de todos os contratos)
+    tamanho_grupo: int
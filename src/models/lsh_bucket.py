@@ -0,0 +1,16 @@
+from sqlalchemy import BigInteger, Index
+from sqlmodel import SQLModel, Field
+
+# Bucket LSH de uma banda da assinatura MinHash: registros no mesmo bucket são candidatos a quase duplicatas
+class LshBucket(SQLModel, table=True):
+    __tablename__ = "lsh_buckets"  # Table name
+    __table_args__ = (
+        Index("ix_lsh_buckets_bucket", "dataset", "banda", "bucket"),
+        Index("ix_lsh_buckets_record", "dataset", "record_id"),
+    )
+    
+    id: int = Field(default=None, primary_key=True)
+    dataset: str  # contracts ou agreements
+    banda: int
+    bucket: int = Field(sa_type=BigInteger)  # Hash de 64 bits das linhas da banda
+    record_id: int
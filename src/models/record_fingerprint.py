@@ -0,0 +1,20 @@
+from typing import Optional
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+
+# Impressão digital de um contrato ou convênio para a deduplicação (chave natural e assinatura MinHash)
+class RecordFingerprint(SQLModel, table=True):
+    __tablename__ = "record_fingerprints"  # Table name
+    __table_args__ = (
+        Index("ix_record_fingerprints_record", "dataset", "record_id", unique=True),
+        Index("ix_record_fingerprints_chave", "dataset", "chave"),
+        Index("ix_record_fingerprints_cluster", "dataset", "cluster"),
+    )
+    
+    id: int = Field(default=None, primary_key=True)
+    dataset: str  # contracts ou agreements
+    record_id: int  # Id do contrato ou convênio
+    chave: Optional[str] = Field(default=None)  # Hash da chave natural normalizada (nulo se a chave está vazia)
+    assinatura: Optional[str] = Field(default=None)  # Assinatura MinHash do nome e do objeto, em JSON (nula se o texto está vazio)
+    cluster: Optional[int] = Field(default=None)  # Menor id do grupo de duplicatas e quase duplicatas (nulo se o registro não tem nenhuma)
+    similaridade: Optional[float] = Field(default=None)  # Maior similaridade estimada com outro registro do grupo
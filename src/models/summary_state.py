@@ -0,0 +1,13 @@
+from datetime import datetime
+from typing import Optional
+from sqlmodel import SQLModel, Field
+
+# Estado de uma tabela de resumo mantida incrementalmente: último id processado de cada tabela de origem
+class SummaryState(SQLModel, table=True):
+    __tablename__ = "summary_states"  # Table name
+    
+    name: str = Field(primary_key=True)  # Nome do resumo (ex.: value_sketches)
+    source: str = Field(primary_key=True)  # Tabela de origem
+    last_id: int = Field(default=0)
+    row_count: int = Field(default=0)
+    updated_at: Optional[datetime] = Field(default=None)
@@ -0,0 +1,23 @@
+from typing import Optional
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+
+# Totais recebidos por fornecedor (contratado) ou convenente, pré-agregados por escopo (geral, ano, contratante, ano e contratante)
+class SupplierTotal(SQLModel, table=True):
+    __tablename__ = "supplier_totals"  # Table name
+    # Os índices terminam na coluna de valor: o top-K de um escopo é lido em ordem pelo índice
+    __table_args__ = (
+        Index("ix_supplier_totals_valor_pago", "dataset", "escopo", "ano", "contratante", "valor_pago"),
+        Index("ix_supplier_totals_valor_atualizado", "dataset", "escopo", "ano", "contratante", "valor_atualizado"),
+    )
+    
+    id: int = Field(default=None, primary_key=True)
+    dataset: str  # contracts ou agreements
+    escopo: str  # geral, ano, contratante ou ano_contratante
+    ano: Optional[int] = Field(default=None)
+    contratante: Optional[str] = Field(default=None)  # Contratante do contrato ou concedente do convênio
+    entidade: Optional[str] = Field(default=None)  # Contratado do contrato ou convenente do convênio
+    documento: Optional[str] = Field(default=None)  # CPF/CNPJ do contratado
+    quantidade: int = Field(default=0)
+    valor_pago: float = Field(default=0.0)
+    valor_atualizado: float = Field(default=0.0)
@@ -0,0 +1,16 @@
+from typing import Optional
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+
+# Sketch de quantis dos valores de uma coluna em uma partição (ano, modalidade)
+class ValueSketch(SQLModel, table=True):
+    __tablename__ = "value_sketches"  # Table name
+    __table_args__ = (Index("ix_value_sketches_partition", "dataset", "coluna", "ano", "modalidade"),)
+    
+    id: int = Field(default=None, primary_key=True)
+    dataset: str  # contracts ou agreements
+    coluna: str
+    ano: Optional[int] = Field(default=None)
+    modalidade: Optional[str] = Field(default=None)
+    quantidade: int = Field(default=0)
+    sketch: str  # Sketch serializado em JSON (utils/quantile_sketch.py)
@@ -3,7 +3,9 @@ from typing import List, Optional
 from sqlalchemy import desc
 from sqlmodel import Session, and_, select
 from sqlalchemy.sql import func
-from database import get_db
+from database import get_db, get_read_db
+from sqlmodel.ext.asyncio.session import AsyncSession
+from utils.admission import admit
 from models.accountability import Accountability
 from math import ceil
 from services.configs import accountability_logger as logger
@@ -58,16 +60,16 @@ def delete_accountability(accountability_id: int, db: Session = Depends(get_db))
 
 # Buscar uma prestação de contas pelo ID
 @router.get("/{accountability_id}", response_model=Accountability, description="Obtém uma prestação de contas pelo ID")
-def get_accountability(accountability_id: int, db: Session = Depends(get_db)):
-    accountability = db.get(Accountability, accountability_id)
+async def get_accountability(accountability_id: int, db: AsyncSession = Depends(get_read_db)):
+    accountability = await db.get(Accountability, accountability_id)
     if accountability is None:
         raise HTTPException(status_code=404, detail="Prestação de contas não encontrada")
     return accountability
 
 # Listagem das prestações de contas com paginação e filtros
-@router.get("/", description="Lista as prestações de contas")
-def list_accountabilities(
-    db: Session = Depends(get_db),
+@router.get("/", description="Lista as prestações de contas", dependencies=[Depends(admit("listing"))])
+async def list_accountabilities(
+    db: AsyncSession = Depends(get_read_db),
     page: Optional[int] = Query(default=1, ge=1, description="Página"),
     limit: Optional[int] = Query(default=100, ge=1, le=100, description="Quantidade por página"),
     agreement_id: Optional[int] = Query(default=None, description="ID do convênio"),
@@ -85,9 +87,9 @@ def list_accountabilities(
         
         offset = (page - 1) * limit
         stmt = select(Accountability).where(and_(*filters)).offset(offset).limit(limit)
-        accountabilities = db.exec(stmt).all()
+        accountabilities = (await db.exec(stmt)).all()
         
-        total = db.exec(select(func.count()).select_from(Accountability).where(and_(*filters))).first()
+        total = (await db.exec(select(func.count()).select_from(Accountability).where(and_(*filters)))).first()
         total_pages = ceil(total / limit)
         
         return {
@@ -99,24 +101,24 @@ def list_accountabilities(
             "total_pages": total_pages
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao listar prestações de contas: {str(e)}")
 
 
 @router.get('/per_status', description='Retorna os convênios pela sua situação em prestação de contas')
-def get_per_status(db: Session = Depends(get_db)):
+async def get_per_status(db: AsyncSession = Depends(get_read_db)):
     try:
-        data = db.exec(
+        data = (await db.exec(
             select(Agreement, Accountability.status.label('categoria'), func.count(Agreement.id).label('qntd_categoria'))
             .join(Accountability)
             .group_by(Accountability.status)
             .order_by(desc(func.count(Agreement.id)))
-        ).all()
+        )).all()
         
         logger.info('Listando os convênios pelo status da prestação de contas')
     except Exception as e:
         logger.error(f'Erro ao retornar os convênios. Erro: {str(e)}')
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f'Erro ao retornar os convênios. Erro: {str(e)}')
     
     result = []
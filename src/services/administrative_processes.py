@@ -1,22 +1,29 @@
-import io
 from math import ceil
 import os
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, Response
-from matplotlib import pyplot as plt
-import pandas as pd
-from sqlmodel import Session, and_, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlmodel import Session, and_, extract, select
 from sqlalchemy.sql import func
-from database import get_db
+from database import get_db, get_read_db
+from sqlmodel.ext.asyncio.session import AsyncSession
 from models.administrative_process import AdministrativeProcess
+from models.contract_dates import ContractDates
+from utils.admission import admit
+from utils.analytics_engine import analytics_exec
+from utils.after_ingestion import after_ingestion
+from utils.executors import run_in_executor
+from utils.render_chart import ChartFormat, render_chart
+from utils.vega_lite import bar_spec, line_spec, pie_spec
 from services.configs import administrative_processes_logger as logger
  
 # Criar roteador
 router = APIRouter(prefix="/administrative_processes", tags=["Administrative Processes"])
 
-# Criar um processo administrativo
-@router.post("/")
-async def create_administrative_processes(db: Session = Depends(get_db)):
+# Leitura da planilha e escrita no banco (bloqueantes: executadas no executor de ingestão)
+def ingest_administrative_processes(db: Session):
+    # Importação pesada carregada apenas quando a ingestão é executada
+    import pandas as pd
+    
     try:
         file_name = "Contratos 2016 - 2020.xlsx"  
 
@@ -61,6 +68,13 @@ async def create_administrative_processes(db: Session = Depends(get_db)):
         db.rollback()  
         return {"message": f"Erro ao criar processos administrativos: {str(e)}"}
 
+# Criar um processo administrativo
+@router.post("/", dependencies=[Depends(admit("ingestion"))])
+async def create_administrative_processes(db: Session = Depends(get_db)):
+    result = await run_in_executor("ingestion", ingest_administrative_processes, db)
+    after_ingestion()
+    return result
+
 
 # Atualizar um processo administrativo
 @router.put("/{process_id}", description="Atualiza um processo administrativo")
@@ -100,9 +114,9 @@ def delete_process(process_id: int, db: Session = Depends(get_db)):
 
 # Buscar um processo administrativo pelo ID
 @router.get("/{process_id}", response_model=AdministrativeProcess, description="Obtém um processo administrativo")
-def get_process(process_id: int, db: Session = Depends(get_db)):
+async def get_process(process_id: int, db: AsyncSession = Depends(get_read_db)):
     try:
-        process = db.get(AdministrativeProcess, process_id)
+        process = await db.get(AdministrativeProcess, process_id)
         if not process:
             raise HTTPException(status_code=404, detail="Processo administrativo não encontrado")
         return process
@@ -111,9 +125,9 @@ def get_process(process_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Erro ao obter processo administrativo")
 
 # Listar processos administrativos com paginação e filtros
-@router.get("/", description="Lista os processos administrativos")
-def list_processes(
-    db: Session = Depends(get_db),
+@router.get("/", description="Lista os processos administrativos", dependencies=[Depends(admit("listing"))])
+async def list_processes(
+    db: AsyncSession = Depends(get_read_db),
     page: Optional[int] = Query(default=1, ge=1, description="Página de processos"),
     limit: Optional[int] = Query(default=100, ge=1, le=100, description="Quantidade de processos a serem retornados"),
     contract_id: Optional[int] = Query(default=None, description="ID do contrato relacionado"),
@@ -134,9 +148,9 @@ def list_processes(
         
         offset = (page - 1) * limit
         stmt = select(AdministrativeProcess).where(and_(*filters)).offset(offset).limit(limit) if filters else select(AdministrativeProcess).offset(offset).limit(limit)
-        processes = db.exec(stmt).all()
+        processes = (await db.exec(stmt)).all()
 
-        total_processes = db.exec(select(func.count()).select_from(AdministrativeProcess).where(and_(*filters))).first() if filters else db.exec(select(func.count()).select_from(AdministrativeProcess)).first()
+        total_processes = (await db.exec(select(func.count()).select_from(AdministrativeProcess).where(and_(*filters)))).first() if filters else (await db.exec(select(func.count()).select_from(AdministrativeProcess))).first()
         total_pages = ceil(total_processes / limit) if total_processes else 1
         
         return {
@@ -149,14 +163,14 @@ def list_processes(
         }
     except Exception as e:
         logger.error(f"Erro ao listar processos administrativos: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao listar processos administrativos")
 # Contagem de processos por status
 @router.get("/stats/status")
-def count_by_status(db: Session = Depends(get_db)):
+async def count_by_status(db: AsyncSession = Depends(get_read_db)):
     try:
         stmt = select(AdministrativeProcess.status_str, func.count()).group_by(AdministrativeProcess.status_str)
-        results = db.exec(stmt).all()
+        results = (await db.exec(stmt)).all()
         return {"status_distribution": dict(results)}
     except Exception as e:
         logger.error(f"Erro ao contar processos por status: {str(e)}")
@@ -165,10 +179,10 @@ def count_by_status(db: Session = Depends(get_db)):
 
 # Contagem de processos por ano
 @router.get("/stats/year")
-def count_by_year(db: Session = Depends(get_db)):
+async def count_by_year(db: AsyncSession = Depends(get_read_db)):
     try:
         stmt = select(func.extract('year', AdministrativeProcess.data_criacao), func.count()).group_by(func.extract('year', AdministrativeProcess.data_criacao))
-        results = db.exec(stmt).all()
+        results = (await db.exec(stmt)).all()
         return {"year_distribution": dict(results)}
     except Exception as e:
         logger.error(f"Erro ao contar processos por ano: {str(e)}")
@@ -177,10 +191,10 @@ def count_by_year(db: Session = Depends(get_db)):
 
 # Contagem de processos por modalidade
 @router.get("/stats/modality")
-def count_by_modality(db: Session = Depends(get_db)):
+async def count_by_modality(db: AsyncSession = Depends(get_read_db)):
     try:
         stmt = select(AdministrativeProcess.modalidade_de_licitacao, func.count()).group_by(AdministrativeProcess.modalidade_de_licitacao)
-        results = db.exec(stmt).all()
+        results = await analytics_exec(db, stmt)
         return {"modality_distribution": dict(results)}
     except Exception as e:
         logger.error(f"Erro ao contar processos por modalidade: {str(e)}")
@@ -189,10 +203,10 @@ def count_by_modality(db: Session = Depends(get_db)):
 
 # Buscar processos por múltiplos filtros
 @router.get("/search")
-def search_processes(
+async def search_processes(
     status: Optional[str] = None,
     modalidade: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     try:
         stmt = select(AdministrativeProcess)
@@ -200,55 +214,73 @@ def search_processes(
             stmt = stmt.where(AdministrativeProcess.status_str == status)
         if modalidade:
             stmt = stmt.where(AdministrativeProcess.modalidade_de_licitacao == modalidade)
-        results = db.exec(stmt).all()
+        results = (await db.exec(stmt)).all()
         return {"data": results}
     except Exception as e:
         logger.error(f"Erro ao buscar processos administrativos: {str(e)}")
         raise HTTPException(status_code=500, detail="Erro ao buscar processos")
     
-@router.get("/chart/status")
-def chart_status(db: Session = Depends(get_db)):
-    data = db.exec(select(AdministrativeProcess.status_str, func.count()).group_by(AdministrativeProcess.status_str)).all()
+# Especificações Vega-Lite dos gráficos (formato json)
+SPEC_STATUS = pie_spec("Distribuição de Processos por Status", theta="values", color="labels")
+SPEC_EVOLUCAO = line_spec("Evolução de Processos Administrativos", x="years", y="counts", x_title="Ano", y_title="Número de Processos")
+SPEC_MODALIDADE = bar_spec("Distribuição por Modalidade de Licitação", x="labels", y="values", x_title="Modalidade de Licitação", y_title="Quantidade")
+
+# Gráfico de pizza da distribuição por status
+def grafico_status(ax, series):
+    ax.pie(series["values"], labels=series["labels"], autopct='%1.1f%%', startangle=140)
+    ax.set_title("Distribuição de Processos por Status")
+
+# Gráfico de linha da evolução de processos por ano
+def grafico_evolucao(ax, series):
+    ax.plot(series["years"], series["counts"], marker='o', linestyle='-')
+    ax.set_xlabel("Ano")
+    ax.set_ylabel("Número de Processos")
+    ax.set_title("Evolução de Processos Administrativos")
+    ax.grid(True)
+
+# Gráfico de barras da distribuição por modalidade
+def grafico_modalidade(ax, series):
+    ax.bar(series["labels"], series["values"], color='blue')
+    ax.set_xlabel("Modalidade de Licitação")
+    ax.set_ylabel("Quantidade")
+    ax.set_title("Distribuição por Modalidade de Licitação")
+    ax.tick_params(axis='x', labelrotation=45)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment('right')
+
+# Série de gráficos por categoria (linhas: categoria, contagem)
+def serie_categorias(data):
     labels, values = zip(*data) if data else ([], [])
-    plt.figure(figsize=(6,6))
-    plt.pie(values, labels=labels, autopct='%1.1f%%', startangle=140)
-    plt.title("Distribuição de Processos por Status")
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png')
-    plt.close()
-    buf.seek(0)
-    return Response(content=buf.getvalue(), media_type="image/png")
-
-# Gráfico: Evolução de processos ao longo dos anos
-@router.get("/chart/evolution")
-def chart_evolution(db: Session = Depends(get_db)):
-    data = db.exec(select(func.extract('year', AdministrativeProcess.data_criacao), func.count()).group_by(func.extract('year', AdministrativeProcess.data_criacao)).order_by(func.extract('year', AdministrativeProcess.data_criacao))).all()
+    return {"labels": [str(label) for label in labels], "values": list(values)}
+
+# Série do gráfico de evolução (linhas: ano, contagem)
+def serie_evolucao(data):
     years, counts = zip(*data) if data else ([], [])
-    plt.figure(figsize=(8,5))
-    plt.plot(years, counts, marker='o', linestyle='-')
-    plt.xlabel("Ano")
-    plt.ylabel("Número de Processos")
-    plt.title("Evolução de Processos Administrativos")
-    plt.grid()
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png')
-    plt.close()
-    buf.seek(0)
-    return Response(content=buf.getvalue(), media_type="image/png")
+    return {"years": [int(year) for year in years], "counts": list(counts)}
+
+@router.get("/chart/status", dependencies=[Depends(admit("charts"))])
+async def chart_status(request: Request, format: ChartFormat = Query(default="png", description="Formato do gráfico: png, svg ou json"), db: AsyncSession = Depends(get_read_db)):
+    data = await analytics_exec(db, select(AdministrativeProcess.status_do_instrumento, func.count()).group_by(AdministrativeProcess.status_do_instrumento))
+    series = serie_categorias(data)
+    return await run_in_executor("charts", render_chart, request, "administrative_processes/chart/status", series, grafico_status, spec=SPEC_STATUS, figsize=(6, 6), format=format)
+
+# Gráfico: Evolução de processos ao longo dos anos (pelo ano de assinatura do contrato)
+@router.get("/chart/evolution", dependencies=[Depends(admit("charts"))])
+async def chart_evolution(request: Request, format: ChartFormat = Query(default="png", description="Formato do gráfico: png, svg ou json"), db: AsyncSession = Depends(get_read_db)):
+    ano = extract('year', ContractDates.data_de_assinatura)
+    data = await analytics_exec(db,
+        select(ano, func.count(AdministrativeProcess.id))
+        .join(ContractDates, ContractDates.contract_id == AdministrativeProcess.contract_id)
+        .where(ContractDates.data_de_assinatura.is_not(None))
+        .group_by(ano)
+        .order_by(ano)
+    )
+    series = serie_evolucao(data)
+    return await run_in_executor("charts", render_chart, request, "administrative_processes/chart/evolution", series, grafico_evolucao, spec=SPEC_EVOLUCAO, figsize=(8, 5), format=format)
 
 # Gráfico: Distribuição por modalidade de licitação
-@router.get("/chart/modalidade")
-def chart_modalidade(db: Session = Depends(get_db)):
-    data = db.exec(select(AdministrativeProcess.modalidade_de_licitacao, func.count()).group_by(AdministrativeProcess.modalidade_de_licitacao)).all()
-    labels, values = zip(*data) if data else ([], [])
-    plt.figure(figsize=(10,5))
-    plt.bar(labels, values, color='blue')
-    plt.xlabel("Modalidade de Licitação")
-    plt.ylabel("Quantidade")
-    plt.title("Distribuição por Modalidade de Licitação")
-    plt.xticks(rotation=45, ha='right')
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png')
-    plt.close()
-    buf.seek(0)
-    return Response(content=buf.getvalue(), media_type="image/png")
+@router.get("/chart/modalidade", dependencies=[Depends(admit("charts"))])
+async def chart_modalidade(request: Request, format: ChartFormat = Query(default="png", description="Formato do gráfico: png, svg ou json"), db: AsyncSession = Depends(get_read_db)):
+    data = await analytics_exec(db, select(AdministrativeProcess.modalidade_de_licitacao, func.count()).group_by(AdministrativeProcess.modalidade_de_licitacao))
+    series = serie_categorias(data)
+    return await run_in_executor("charts", render_chart, request, "administrative_processes/chart/modalidade", series, grafico_modalidade, spec=SPEC_MODALIDADE, figsize=(10, 5), format=format)
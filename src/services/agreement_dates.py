@@ -1,14 +1,16 @@
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, asc, select, func
-from database import get_db
+from database import get_db, get_read_db
+from sqlmodel.ext.asyncio.session import AsyncSession
+from utils.admission import admit
+from utils.analytics_engine import analytics_exec
 from models.agreement import Agreement
 from models.agreement_dates import AgreementDates
 from services.configs import agreement_dates_logger as logger
 from datetime import date, datetime
 from models.agreement_values import AgreementValues
 import os
-import pandas as pd
 # Criar roteador para AgreementDates
 router = APIRouter(prefix="/agreement_dates", tags=["Agreement Dates"])
 
@@ -56,16 +58,16 @@ router = APIRouter(prefix="/agreement_dates", tags=["Agreement Dates"])
  #       raise HTTPException(status_code=500, detail=f"Erro ao criar datas de convênios: {str(e)}")
 
 # Listar datas de convênios 
-@router.get("/")
-def list_agreement_dates(page: Optional[int] = Query(1, gt=0), length: Optional[int] = Query(100, gt=0), db: Session = Depends(get_db)):
+@router.get("/", dependencies=[Depends(admit("listing"))])
+async def list_agreement_dates(page: Optional[int] = Query(1, gt=0), length: Optional[int] = Query(100, gt=0), db: AsyncSession = Depends(get_read_db)):
     try:
-        agreement_dates = db.exec(select(AgreementDates).offset((page - 1) * length).limit(length)).all()
+        agreement_dates = (await db.exec(select(AgreementDates).offset((page - 1) * length).limit(length))).all()
     except Exception as e:
         logger.error(f"Erro ao listar datas dos convênios: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao listar datas dos convênios")
 
-    total = db.exec(select(func.count(AgreementDates.id))).one()
+    total = (await db.exec(select(func.count(AgreementDates.id)))).one()
     total_pages = (total // length) + (1 if total % length > 0 else 0)
     pagination = {
         "page": page,
@@ -89,12 +91,12 @@ def list_agreement_dates(page: Optional[int] = Query(1, gt=0), length: Optional[
 
 # Obter data de convênio
 @router.get("/{agreement_date_id}", response_model=AgreementDates)
-def get_agreement_date(agreement_date_id: int, db: Session = Depends(get_db)):
+async def get_agreement_date(agreement_date_id: int, db: AsyncSession = Depends(get_read_db)):
     try:
-        agreement_date = db.get(AgreementDates, agreement_date_id)
+        agreement_date = await db.get(AgreementDates, agreement_date_id)
     except Exception as e:
         logger.error(f"Erro ao obter data de convênio: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao obter data de convênio")
 
     if agreement_date is None:
@@ -150,13 +152,13 @@ def delete_agreement_date(agreement_date_id: int, db: Session = Depends(get_db))
     return {"message": f"Data de convênio {agreement_date_id} deletada com sucesso"}
 
 @router.get('/atributos/')
-def get_agreement_dates_by_attributes(
+async def get_agreement_dates_by_attributes(
     agreement_id: Optional[int] = None,
     data_assinatura: Optional[date] = None,
     data_termino: Optional[date] = None,
     data_publi_ce: Optional[date] = None,
     data_publi_doe: Optional[date] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     try:
         query = select(AgreementDates)
@@ -171,41 +173,41 @@ def get_agreement_dates_by_attributes(
         if data_publi_doe is not None:
             query = query.where(AgreementDates.data_publi_doe == data_publi_doe)
 
-        agreement_dates = db.exec(query).all()
+        agreement_dates = (await db.exec(query)).all()
     except Exception as e:
         logger.error(f"Erro ao buscar datas dos convênios: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao buscar datas dos convênios")
 
     logger.info('buscando datas dos convênios com os atributos fornecidos')
     return agreement_dates
 
 @router.get('/quantidade/')
-def get_agreement_dates_quantidade(db: Session = Depends(get_db)):
+async def get_agreement_dates_quantidade(db: AsyncSession = Depends(get_read_db)):
     try:
-        quantity = db.exec(select(func.count(AgreementDates.id))).one()
+        quantity = (await db.exec(select(func.count(AgreementDates.id)))).one()
     except Exception as e:
         logger.error(f"Erro ao buscar quantidade de datas dos convênios: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao buscar quantidade de datas dos convênios: {str(e)}")
 
     logger.info('buscando quantidade de datas dos convênios')
     return {'quantidade de datas dos convênios': quantity}
 
 @router.get('/values_per_year/', description='Exibe a evolução do valor pago de convênios ao longo dos anos')
-def get_values_per_year(db: Session = Depends(get_db)):
+async def get_values_per_year(db: AsyncSession = Depends(get_read_db)):
     try:
-        data = db.exec(
+        data = await analytics_exec(db,
             select(func.extract('year', AgreementDates.data_assinatura).label('ano') ,func.sum(AgreementValues.valor_pago).label('valor_pago_ano'))
             .join(AgreementDates, AgreementDates.agreement_id == AgreementValues.agreement_id)
             .group_by(func.extract('year', AgreementDates.data_assinatura))
             .order_by(asc(func.extract('year', AgreementDates.data_assinatura)))
-        ).all()
+        )
         
         logger.info('Buscando a soma dos valores pagos por ano')
     except Exception as e:
         logger.erro(f'Erro ao retornar as soma de valores pagos por ano. Erro: {str(e)}')
-        db.rollback()
+        await db.rollback()
         HTTPException(status_code=500, detail=f'Erro ao retornar as soma de valores pagos por ano. Erro: {str(e)}')
         
     return [
@@ -2,7 +2,10 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, select
 from sqlalchemy.sql import func
-from database import get_db
+from database import get_db, get_read_db
+from sqlmodel.ext.asyncio.session import AsyncSession
+from utils.admission import admit
+from utils.analytics_engine import analytics_exec
 from models.agreement_dates import AgreementDates
 from models.agreement_values import AgreementValues
 from services.configs import agreement_values_logger as logger
@@ -11,13 +14,13 @@ from services.configs import agreement_values_logger as logger
 router = APIRouter(prefix="/agreement_values", tags=["Agreement Values"])
 
 # Listar valores de convênios
-@router.get("/", response_model=list[AgreementValues], description="Lista os valores dos convênios")
-def list_agreement_values(db: Session = Depends(get_db)):
+@router.get("/", response_model=list[AgreementValues], description="Lista os valores dos convênios", dependencies=[Depends(admit("listing"))])
+async def list_agreement_values(db: AsyncSession = Depends(get_read_db)):
     try:
-        agreement_values = db.exec(select(AgreementValues)).all()
+        agreement_values = (await db.exec(select(AgreementValues))).all()
     except Exception as e:
         logger.error(f"Erro ao listar valores dos convênios: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao listar valores dos convênios")
     
     logger.info('listando todos os valores dos convênios')
@@ -26,15 +29,15 @@ def list_agreement_values(db: Session = Depends(get_db)):
 
 # Listar valores de convênios paginado
 @router.get("/pagination/", description="Lista os valores dos convênios com paginação")
-def list_agreement_values_paginated(page: Optional[int] = Query(1, gt=0), length: Optional[int] = Query(100, gt=0), db: Session = Depends(get_db)):
+async def list_agreement_values_paginated(page: Optional[int] = Query(1, gt=0), length: Optional[int] = Query(100, gt=0), db: AsyncSession = Depends(get_read_db)):
     try:
-        agreement_values = db.exec(select(AgreementValues).offset((page - 1) * length).limit(length)).all()
+        agreement_values = (await db.exec(select(AgreementValues).offset((page - 1) * length).limit(length))).all()
     except Exception as e:
         logger.error(f"Erro ao listar valores dos convênios: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao listar valores dos convênios")
     
-    total = db.exec(select(func.count(AgreementValues.id))).one()
+    total = (await db.exec(select(func.count(AgreementValues.id)))).one()
     total_pages = (total // length) + (1 if total % length > 0 else 0)
     pagination = {
         "page": page,
@@ -59,12 +62,12 @@ def list_agreement_values_paginated(page: Optional[int] = Query(1, gt=0), length
 
 # Obter valor de convênio
 @router.get("/{agreement_value_id}", response_model=AgreementValues, description="Obtém um valor de convênio")
-def get_agreement_value(agreement_value_id: int, db: Session = Depends(get_db)):
+async def get_agreement_value(agreement_value_id: int, db: AsyncSession = Depends(get_read_db)):
     try:
-        agreement_value = db.get(AgreementValues, agreement_value_id)
+        agreement_value = await db.get(AgreementValues, agreement_value_id)
     except Exception as e:
         logger.error(f"Erro ao obter valor de convênio: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao obter valor de convênio")
     
     if agreement_value is None:
@@ -120,25 +123,25 @@ def delete_agreement_value(agreement_value_id: int, db: Session = Depends(get_db
     return {"message": f"Valor de convênio {agreement_value_id} deletado com sucesso"}
 
 @router.get('/count/', description="Retorna a quantidade de valores de convênios")
-def count_agreement_values(db: Session = Depends(get_db)):
+async def count_agreement_values(db: AsyncSession = Depends(get_read_db)):
     try:
-        count = db.exec(select(func.count(AgreementValues.id))).one()
+        count = (await db.exec(select(func.count(AgreementValues.id)))).one()
     except Exception as e:
         logger.error(f"Erro ao contar valores dos convênios: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao contar valores dos convênios")
         
     logger.info('contando a quantidade de valores dos convênios')
     return {"quantidade": count}
 
 @router.get('/atributos/', description="Lista os atributos do modelo de valores de convênios")
-def get_agreement_values_attributes(
+async def get_agreement_values_attributes(
     agreement_id: Optional[int],
     valor_inicial_total: Optional[float],
     valor_inicial_repasse_concedente: Optional[float],
     valor_inicial_contrapartida_convenente: Optional[float],
     valor_atualizado_total: Optional[float],
-    valor_pago: Optional[float], db: Session = Depends(get_db)):
+    valor_pago: Optional[float], db: AsyncSession = Depends(get_read_db)):
     try:
         query = select(AgreementValues)
         if agreement_id is not None:
@@ -154,10 +157,10 @@ def get_agreement_values_attributes(
         if valor_pago is not None:
             query = query.where(AgreementValues.valor_pago == valor_pago)
         
-        agreement_values = db.exec(query).all()
+        agreement_values = (await db.exec(query)).all()
     except Exception as e:
         logger.error(f"Erro ao buscar valores dos convênios: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao buscar valores dos convênios")
     
     logger.info('buscando valores dos convênios com os atributos fornecidos')
@@ -165,7 +168,7 @@ def get_agreement_values_attributes(
     return result
 
 @router.get('/search/valor_inicial_total/', description='Faz uma pesquisa por valor inicial total de convênios')
-def get_search_valor_inicial_total(min_value: Optional[float] = None, max_value: Optional[float] = None, db: Session = Depends(get_db)):
+async def get_search_valor_inicial_total(min_value: Optional[float] = None, max_value: Optional[float] = None, db: AsyncSession = Depends(get_read_db)):
     try:
         query = select(AgreementValues)
         if min_value is not None:
@@ -173,10 +176,10 @@ def get_search_valor_inicial_total(min_value: Optional[float] = None, max_value:
         if max_value is not None:
             query = query.where(AgreementValues.valor_inicial_total <= max_value)
         
-        data = db.exec(query.order_by(AgreementValues.id)).all()
+        data = (await db.exec(query.order_by(AgreementValues.id))).all()
     except Exception as e:
         logger.error(f'Erro ao listar os valores de convênios pelo valor inicial total. Erro: {str(e)}')
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f'Erro ao listar os valores de convênios pelo valor inicial total. Erro: {str(e)}')
     
     return [
@@ -192,7 +195,7 @@ def get_search_valor_inicial_total(min_value: Optional[float] = None, max_value:
     ]
 
 @router.get('/search/valor_inicial_repasse_concedente/', description='Faz uma pesquisa por valor inicial repasse concedente de convênios')
-def get_search_valor_inicial_repasse_concedente(min_value: Optional[float] = None, max_value: Optional[float] = None, db: Session = Depends(get_db)):
+async def get_search_valor_inicial_repasse_concedente(min_value: Optional[float] = None, max_value: Optional[float] = None, db: AsyncSession = Depends(get_read_db)):
     try:
         query = select(AgreementValues)
         if min_value is not None:
@@ -200,10 +203,10 @@ def get_search_valor_inicial_repasse_concedente(min_value: Optional[float] = Non
         if max_value is not None:
             query = query.where(AgreementValues.valor_inicial_repasse_concedente <= max_value)
         
-        data = db.exec(query.order_by(AgreementValues.id)).all()
+        data = (await db.exec(query.order_by(AgreementValues.id))).all()
     except Exception as e:
         logger.error(f'Erro ao listar os valores de convênios pelo valor inicial repasse concedente. Erro: {str(e)}')
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f'Erro ao listar os valores de convênios pelo valor inicial repasse concedente. Erro: {str(e)}')
     
     return [
@@ -219,7 +222,7 @@ def get_search_valor_inicial_repasse_concedente(min_value: Optional[float] = Non
     ]
 
 @router.get('/search/valor_inicial_contrapartida_convenente/', description='Faz uma pesquisa por valor inicial contrapartida convenente de convênios')
-def get_search_valor_inicial_contrapartida_convenente(min_value: Optional[float] = None, max_value: Optional[float] = None, db: Session = Depends(get_db)):
+async def get_search_valor_inicial_contrapartida_convenente(min_value: Optional[float] = None, max_value: Optional[float] = None, db: AsyncSession = Depends(get_read_db)):
     try:
         query = select(AgreementValues)
         if min_value is not None:
@@ -227,10 +230,10 @@ def get_search_valor_inicial_contrapartida_convenente(min_value: Optional[float]
         if max_value is not None:
             query = query.where(AgreementValues.valor_inicial_contrapartida_convenente <= max_value)
         
-        data = db.exec(query.order_by(AgreementValues.id)).all()
+        data = (await db.exec(query.order_by(AgreementValues.id))).all()
     except Exception as e:
         logger.error(f'Erro ao listar os valores de convênios pelo valor inicial contrapartida convenente. Erro: {str(e)}')
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f'Erro ao listar os valores de convênios pelo valor inicial contrapartida convenente. Erro: {str(e)}')
     
     return [
@@ -246,7 +249,7 @@ def get_search_valor_inicial_contrapartida_convenente(min_value: Optional[float]
     ]
 
 @router.get('/search/valor_atualizado_total/', description='Faz uma pesquisa por valor atualizado total de convênios')
-def get_search_valor_atualizado_total(min_value: Optional[float] = None, max_value: Optional[float] = None, db: Session = Depends(get_db)):
+async def get_search_valor_atualizado_total(min_value: Optional[float] = None, max_value: Optional[float] = None, db: AsyncSession = Depends(get_read_db)):
     try:
         query = select(AgreementValues)
         if min_value is not None:
@@ -254,10 +257,10 @@ def get_search_valor_atualizado_total(min_value: Optional[float] = None, max_val
         if max_value is not None:
             query = query.where(AgreementValues.valor_atualizado_total <= max_value)
         
-        data = db.exec(query.order_by(AgreementValues.id)).all()
+        data = (await db.exec(query.order_by(AgreementValues.id))).all()
     except Exception as e:
         logger.error(f'Erro ao listar os valores de convênios pelo valor atualizado total. Erro: {str(e)}')
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f'Erro ao listar os valores de convênios pelo valor atualizado total. Erro: {str(e)}')
     
     return [
@@ -273,7 +276,7 @@ def get_search_valor_atualizado_total(min_value: Optional[float] = None, max_val
     ]
 
 @router.get('/search/valor_pago/', description='Faz uma pesquisa por valor pago de convênios')
-def get_search_valor_pago(min_value: Optional[float] = None, max_value: Optional[float] = None, db: Session = Depends(get_db)):
+async def get_search_valor_pago(min_value: Optional[float] = None, max_value: Optional[float] = None, db: AsyncSession = Depends(get_read_db)):
     try:
         query = select(AgreementValues)
         if min_value is not None:
@@ -281,10 +284,10 @@ def get_search_valor_pago(min_value: Optional[float] = None, max_value: Optional
         if max_value is not None:
             query = query.where(AgreementValues.valor_pago <= max_value)
         
-        data = db.exec(query.order_by(AgreementValues.id)).all()
+        data = (await db.exec(query.order_by(AgreementValues.id))).all()
     except Exception as e:
         logger.error(f'Erro ao listar os valores de convênios pelo valor pago. Erro: {str(e)}')
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f'Erro ao listar os valores de convênios pelo valor pago. Erro: {str(e)}')
     
     return [
@@ -300,19 +303,19 @@ def get_search_valor_pago(min_value: Optional[float] = None, max_value: Optional
     ]
 
 @router.get('/compare_values/', description='Compara os valores iniciais com os valores atualizados de convênios por ano')
-def get_compare_values(db: Session = Depends(get_db)):
+async def get_compare_values(db: AsyncSession = Depends(get_read_db)):
     try:
-        data = db.exec(
+        data = await analytics_exec(db,
             select(func.extract('year', AgreementDates.data_assinatura).label('ano'),
                    func.sum(AgreementValues.valor_inicial_total).label('soma_valores_originais'),
                    func.sum(AgreementValues.valor_atualizado_total).label('soma_valores_atualizados'))
             .join(AgreementDates, AgreementValues.agreement_id == AgreementDates.agreement_id)
             .group_by(func.extract('year', AgreementDates.data_assinatura))
             .order_by(func.extract('year', AgreementDates.data_assinatura))
-        ).all()
+        )
     except Exception as e:
         logger.error(f'Erro ao comparar os valores dos convênios. Erro: {str(e)}')
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f'Erro ao comparar os valores dos convênios. Erro: {str(e)}')
     
     return [
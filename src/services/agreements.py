@@ -1,36 +1,36 @@
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy import text
-from sqlmodel import Session, select, delete
+from sqlmodel import Session, extract, select, delete
 from sqlalchemy.sql import func
-from database import get_db
+from database import get_db, get_read_db
+from sqlmodel.ext.asyncio.session import AsyncSession
 from models.agreement import Agreement
 from models.agreement_dates import AgreementDates
 from models.agreement_values import AgreementValues
 from services.configs import agreements_logger as logger
 from services.configs import agreement_values_logger as logger_values
 from services.configs import agreement_dates_logger as logger_dates # adicionando logger de datas
-import pandas as pd
-from pandas import read_excel
-from unidecode import unidecode
 import os
 from datetime import datetime
 
-from utils.safe_parse_date import safe_parse_date
-import matplotlib.pyplot as plt
-import io
-from fastapi.responses import Response
+from utils.admission import admit
+from utils.analytics_engine import analytics_exec
+from utils.after_ingestion import after_ingestion
+from utils.executors import run_in_executor
+from utils.render_chart import ChartFormat, render_chart
+from utils.vega_lite import grouped_bar_spec, line_spec
 # Criar roteador
 router = APIRouter(prefix="/agreements", tags=["Agreements"])
 
 # Listar convênios
-@router.get("/", response_model=list[Agreement], description="Lista os convênios")
-def list_agreements(db: Session = Depends(get_db)):
+@router.get("/", response_model=list[Agreement], description="Lista os convênios", dependencies=[Depends(admit("listing"))])
+async def list_agreements(db: AsyncSession = Depends(get_read_db)):
     try:
-        agreements = db.exec(select(Agreement)).all()
+        agreements = (await db.exec(select(Agreement))).all()
     except Exception as e:
         logger.error(f"Erro ao listar convênios: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao listar convênios")
     
     logger.info('listando todos os convênios')
@@ -39,15 +39,15 @@ def list_agreements(db: Session = Depends(get_db)):
 
 # Listar convênios paginado
 @router.get("/pagination", description="Lista os convênios com paginação")
-def list_agreements_paginated(page: Optional[int] = Query(1, gt=0), length: Optional[int] = Query(100, gt=0), db: Session = Depends(get_db)):
+async def list_agreements_paginated(page: Optional[int] = Query(1, gt=0), length: Optional[int] = Query(100, gt=0), db: AsyncSession = Depends(get_read_db)):
     try:
-        agreements = db.exec(select(Agreement).offset((page - 1) * length).limit(length)).all()
+        agreements = (await db.exec(select(Agreement).offset((page - 1) * length).limit(length))).all()
     except Exception as e:
         logger.error(f"Erro ao listar convênios: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao listar convênios")
     
-    total = db.exec(select(func.count(Agreement.id))).one()
+    total = (await db.exec(select(func.count(Agreement.id)))).one()
     total_pages = (total // length) + (1 if total % length > 0 else 0)
     pagination = {
         "page": page,
@@ -69,13 +69,13 @@ def list_agreements_paginated(page: Optional[int] = Query(1, gt=0), length: Opti
     return pagination
 
 # Obter convênio
-@router.get("/{agreement_id}", response_model=Agreement, description="Obtém um convênio")
-def get_agreement(agreement_id: int, db: Session = Depends(get_db)):
+@router.get("/{agreement_id:int}", response_model=Agreement, description="Obtém um convênio")
+async def get_agreement(agreement_id: int, db: AsyncSession = Depends(get_read_db)):
     try:
-        agreement = db.get(Agreement, agreement_id)
+        agreement = await db.get(Agreement, agreement_id)
     except Exception as e:
         logger.error(f"Erro ao obter convênio: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao obter convênio")
     
     if agreement is None:
@@ -85,67 +85,97 @@ def get_agreement(agreement_id: int, db: Session = Depends(get_db)):
     logger.info(f'obtendo convênio {agreement_id}')
     return agreement
 
-# Cria os convênios
-@router.post("/", description="Cria todos os convênios e valores de convênios")
-def create_agreements(db: Session = Depends(get_db)):
+# Lê a planilha e grava os convênios (bloqueante: executado no executor de ingestão)
+def ingest_agreements(db: Session):
     columns_agreements = ['codigo_plano_de_trabalho', 'concedente', 'convenente', 'objeto']
     columns_values = ['valor_inicial_total', 'valor_inicial_do_repasse_do_concedente', 'valor_inicial_da_contrapartida_do_convenente/beneficiario', 'valor_atualizado_total', 'valor_pago']
     columns_dates = ['data_de_assinatura', 'data_de_termino_apos_aditivo/apostilamento', 'data_de_publicacao_na_plataforma_ceara_transparente', 'data_publicacao_no_doe']
+    
+    # Importações pesadas carregadas apenas quando a ingestão é executada
+    import pandas as pd
+    from pandas import read_excel
+    from unidecode import unidecode
+    from utils.ingestion_report import IngestionReport
+    from utils.safe_parse_date import safe_parse_date
+    
+    # Tempo, CPU, linhas e memória de cada etapa da ingestão
+    report = IngestionReport("agreements")
+    
     try:
         curr_dir = os.path.dirname(os.path.abspath(__file__))
         excel_file = os.path.join(curr_dir, "../data/Convênios 2007 - Setembro 2023.xlsx")
-        df = read_excel(excel_file)
-        df.columns = [unidecode(col.lower().replace(' ', '_')) for col in df.columns]
-        df = df.where(pd.notna(df), None)
+        with report.stage("leitura_excel") as stage:
+            df = read_excel(excel_file)
+            stage["rows"] += len(df)
+        with report.stage("normalizacao_colunas"):
+            df.columns = [unidecode(col.lower().replace(' ', '_')) for col in df.columns]
+        with report.stage("limpeza_nan") as stage:
+            df = df.where(pd.notna(df), None)
+            stage["rows"] += len(df)
         
         data_agreement = [df[col] for col in columns_agreements if col in df.columns]
         data_values = [df[col] for col in columns_values if col in df.columns]
         data_dates = [df[col] for col in columns_dates if col in df.columns] # Adição de lista data_dates
         for cod, con, conv, obj, vit, virc, vicc, vat, vp, das, dta, dpc, dpd in zip(*data_agreement, *data_values, *data_dates): #incluindo data_dates no loop
             # Tratando dados de convênio e valores de convênio
-            cod = None if pd.isna(cod) else cod
-            con = None if pd.isna(con) else con
-            conv = None if pd.isna(conv) else conv
-            obj = None if pd.isna(obj) else obj
-            vit = None if pd.isna(vit) else vit
-            virc = None if pd.isna(virc) else virc
-            vicc = None if pd.isna(vicc) else vicc
-            vat = None if pd.isna(vat) else vat
-            vp = None if pd.isna(vp) else vp
-            # Cria os convênios
-            agreement = Agreement(codigo_plano_trabalho=cod, concedente=con, convenente=conv, objeto=obj)
-            db.add(agreement)
-            db.commit()
-            db.refresh(agreement)
-            logger.info(f'criando convênio {agreement.id}')
-            # Cria os valores dos convênios
-            agreement_value = AgreementValues(agreement_id=agreement.id, valor_inicial_total=vit, valor_inicial_repasse_concedente=virc, valor_inicial_contrapartida_convenente=vicc, valor_atualizado_total=vat, valor_pago=vp)
-            db.add(agreement_value)
-            db.commit()
-            db.refresh(agreement_value)
-            logger_values.info(f'criando valor de convênio {agreement_value.id}')
+            with report.stage("limpeza_nan"):
+                cod = None if pd.isna(cod) else cod
+                con = None if pd.isna(con) else con
+                conv = None if pd.isna(conv) else conv
+                obj = None if pd.isna(obj) else obj
+                vit = None if pd.isna(vit) else vit
+                virc = None if pd.isna(virc) else virc
+                vicc = None if pd.isna(vicc) else vicc
+                vat = None if pd.isna(vat) else vat
+                vp = None if pd.isna(vp) else vp
+            with report.stage("gravacao_banco") as stage:
+                # Cria os convênios
+                agreement = Agreement(codigo_plano_trabalho=cod, concedente=con, convenente=conv, objeto=obj)
+                db.add(agreement)
+                db.commit()
+                db.refresh(agreement)
+                logger.info(f'criando convênio {agreement.id}')
+                # Cria os valores dos convênios
+                agreement_value = AgreementValues(agreement_id=agreement.id, valor_inicial_total=vit, valor_inicial_repasse_concedente=virc, valor_inicial_contrapartida_convenente=vicc, valor_atualizado_total=vat, valor_pago=vp)
+                db.add(agreement_value)
+                db.commit()
+                db.refresh(agreement_value)
+                logger_values.info(f'criando valor de convênio {agreement_value.id}')
+                stage["rows"] += 2
             # Cria as datas dos convênios
-            data_assinatura = safe_parse_date(das)
-            data_termino = safe_parse_date(dta)
-            data_publi_ce = safe_parse_date(dpc)
-            data_publi_doe = safe_parse_date(dpd)
-            agreement_date = AgreementDates(
-                agreement_id=agreement.id,
-                data_assinatura=data_assinatura,
-                data_termino=data_termino,
-                data_publi_ce=data_publi_ce,
-                data_publi_doe=data_publi_doe
-            )
-            db.add(agreement_date)
-            db.commit()
-            db.refresh(agreement_date)
-            logger_dates.info(f'criando data de convênio {agreement_date.id}')
+            with report.stage("conversao_datas") as stage:
+                data_assinatura = safe_parse_date(das)
+                data_termino = safe_parse_date(dta)
+                data_publi_ce = safe_parse_date(dpc)
+                data_publi_doe = safe_parse_date(dpd)
+                stage["rows"] += 1
+            with report.stage("gravacao_banco") as stage:
+                agreement_date = AgreementDates(
+                    agreement_id=agreement.id,
+                    data_assinatura=data_assinatura,
+                    data_termino=data_termino,
+                    data_publi_ce=data_publi_ce,
+                    data_publi_doe=data_publi_doe
+                )
+                db.add(agreement_date)
+                db.commit()
+                db.refresh(agreement_date)
+                logger_dates.info(f'criando data de convênio {agreement_date.id}')
+                stage["rows"] += 1
     except Exception as e:
         logger.error(f"Erro ao criar convênios: {str(e)}")
         db.rollback()
+        report.finish(error=e)
         raise HTTPException(status_code=500, detail=f"Erro ao criar convênios. Erro: {str(e)}")
     
-    return {"message": "Convênios e seus valores criados com sucesso"}
+    return {"message": "Convênios e seus valores criados com sucesso", "report": report.finish()}
+
+# Cria os convênios
+@router.post("/", description="Cria todos os convênios e valores de convênios", dependencies=[Depends(admit("ingestion"))])
+async def create_agreements(db: Session = Depends(get_db)):
+    result = await run_in_executor("ingestion", ingest_agreements, db)
+    after_ingestion()
+    return result
     
 @router.put("/{agreement_id}", description="Atualiza um convênio")
 def update_agreement(agreement_id: int, new_agree: Agreement, db: Session = Depends(get_db)):
@@ -186,24 +216,24 @@ def delete_agreement(agreement_id: int, db: Session = Depends(get_db)):
     return {"message": f"Convênio {agreement_id} deletado com sucesso"}
 
 @router.get('/count/', description="Retorna a quantidade de convênios")
-def count_agreements(db: Session = Depends(get_db)):
+async def count_agreements(db: AsyncSession = Depends(get_read_db)):
     try:
-        quantity = db.exec(select(func.count(Agreement.id))).one()
+        quantity = (await db.exec(select(func.count(Agreement.id)))).one()
     except Exception as e:
         logger.error(f"Erro ao buscar quantidade de convênios: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao buscar quantidade de convênios")
     
     logger.info('buscando quantidade de convênios')
     return {"quantidade": quantity}
 
 @router.get('/atributos/', description="Lista os atributos do modelo de convênios")
-def get_agreements_attributes(
+async def get_agreements_attributes(
     codigo_plano_trabalho: Optional[str] = None,
     concedente: Optional[str] = None,
     convenente: Optional[str] = None,
     objeto: Optional[str] = None,
-    db: Session = Depends(get_db)):
+    db: AsyncSession = Depends(get_read_db)):
     try:
         query = select(Agreement)
         if codigo_plano_trabalho is not None:
@@ -215,10 +245,10 @@ def get_agreements_attributes(
         if objeto is not None:
             query = query.where(Agreement.objeto == objeto)
         
-        agreements = db.exec(query.order_by(Agreement.id)).all()
+        agreements = (await db.exec(query.order_by(Agreement.id))).all()
     except Exception as e:
         logger.error(f"Erro ao buscar convênios: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao buscar convênios")
     
     logger.info('buscando convênios com os atributos fornecidos')
@@ -226,12 +256,12 @@ def get_agreements_attributes(
     return result
 
 @router.get('/search/codigo_plano_trabalho/', description='Faz uma pesquisa por palavra no código plano de trabalho de convênios')
-def get_search_codigo_plano_trabalho(word: str = Query(min_length=5), db: Session = Depends(get_db)):
+async def get_search_codigo_plano_trabalho(word: str = Query(min_length=5), db: AsyncSession = Depends(get_read_db)):
     try:
-        data = db.exec(select(Agreement).where(func.lower(Agreement.codigo_plano_trabalho).contains(func.lower(word))).order_by(Agreement.id)).all()
+        data = (await db.exec(select(Agreement).where(func.lower(Agreement.codigo_plano_trabalho).contains(func.lower(word))).order_by(Agreement.id))).all()
     except Exception as e:
         logger.error(f'Erro ao listar os convenios pelo codigo plano de trabalho. Erro: {str(e)}')
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f'Erro ao listar os convenios pelo codigo plano de trabalho. Erro: {str(e)}')
     
     return [
@@ -245,12 +275,12 @@ def get_search_codigo_plano_trabalho(word: str = Query(min_length=5), db: Sessio
     ]
 
 @router.get('/search/concedente/', description='Faz uma pesquisa por palavra no concedente de convênios')
-def get_search_concedente(word: str = Query(min_length=5), db: Session = Depends(get_db)):
+async def get_search_concedente(word: str = Query(min_length=5), db: AsyncSession = Depends(get_read_db)):
     try:
-        data = db.exec(select(Agreement).where(func.lower(Agreement.concedente).contains(func.lower(word))).order_by(Agreement.id)).all()
+        data = (await db.exec(select(Agreement).where(func.lower(Agreement.concedente).contains(func.lower(word))).order_by(Agreement.id))).all()
     except Exception as e:
         logger.error(f'Erro ao listar os convenios pelo concedente. Erro: {str(e)}')
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f'Erro ao listar os convenios pelo concedente. Erro: {str(e)}')
     
     return [
@@ -264,12 +294,12 @@ def get_search_concedente(word: str = Query(min_length=5), db: Session = Depends
     ]
 
 @router.get('/search/convenente/', description='Faz uma pesquisa por palavra no convenente de convênios')
-def get_search_convenente(word: str = Query(min_length=5), db: Session = Depends(get_db)):
+async def get_search_convenente(word: str = Query(min_length=5), db: AsyncSession = Depends(get_read_db)):
     try:
-        data = db.exec(select(Agreement).where(func.lower(Agreement.convenente).contains(func.lower(word))).order_by(Agreement.id)).all()
+        data = (await db.exec(select(Agreement).where(func.lower(Agreement.convenente).contains(func.lower(word))).order_by(Agreement.id))).all()
     except Exception as e:
         logger.error(f'Erro ao listar os convenios pelo convenente. Erro: {str(e)}')
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f'Erro ao listar os convenios pelo convenente. Erro: {str(e)}')
     
     return [
@@ -283,12 +313,12 @@ def get_search_convenente(word: str = Query(min_length=5), db: Session = Depends
     ]
 
 @router.get('/search/objeto/', description='Faz uma pesquisa por palavra no objeto de convênios')
-def get_search_objeto(word: str = Query(min_length=5), db: Session = Depends(get_db)):
+async def get_search_objeto(word: str = Query(min_length=5), db: AsyncSession = Depends(get_read_db)):
     try:
-        data = db.exec(select(Agreement).where(func.lower(Agreement.objeto).contains(func.lower(word))).order_by(Agreement.id)).all()
+        data = (await db.exec(select(Agreement).where(func.lower(Agreement.objeto).contains(func.lower(word))).order_by(Agreement.id))).all()
     except Exception as e:
         logger.error(f'Erro ao listar os convenios pelo objeto. Erro: {str(e)}')
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f'Erro ao listar os convenios pelo objeto. Erro: {str(e)}')
     
     return [
@@ -301,7 +331,7 @@ def get_search_objeto(word: str = Query(min_length=5), db: Session = Depends(get
         } for item in data
     ]
 
-@router.delete("/delete_all/", description="Deleta todos os convênios, valores e datas")
+@router.delete("/delete_all/", description="Deleta todos os convênios, valores e datas", dependencies=[Depends(admit("ingestion"))])
 def delete_all_agreements(db: Session = Depends(get_db)):
     try:
         # Deletar todos os registros de agreement_values
@@ -327,88 +357,93 @@ def delete_all_agreements(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Erro ao deletar todos os convênios. Erro: {str(e)}")
         
     logger.info('deletando todos os convênios, valores e datas')
+    after_ingestion()
     return {"message": "Todos os convênios, valores e datas foram deletados com sucesso"}
 
-@router.get("/comparison-original-updated")
-def comparacao_valores_originais_atualizados(db: Session = Depends(get_db)):
+# Especificações Vega-Lite dos gráficos (formato json)
+SPEC_COMPARACAO_VALORES = grouped_bar_spec('Comparação de Valores de Convênios por Ano', x="anos", fields={"valores_originais": "Valores Originais", "valores_atualizados": "Valores Atualizados"}, x_title='Ano de Assinatura', y_title='Valor')
+SPEC_EVOLUCAO_VALOR_PAGO = line_spec('Evolução dos Valores Totais Pagos de Convênios por Ano', x="anos", y="valores_pagos", x_title='Ano de Assinatura', y_title='Valor Pago')
+
+# Gráfico de barras comparando valores originais e atualizados por ano
+def grafico_comparacao_valores(ax, series):
+    anos = series["anos"]
+    ax.bar([ano - 0.2 for ano in anos], series["valores_originais"], width=0.4, label='Valores Originais', alpha=0.7)
+    ax.bar([ano + 0.2 for ano in anos], series["valores_atualizados"], width=0.4, label='Valores Atualizados', alpha=0.7)
+    ax.set_xlabel('Ano de Assinatura')
+    ax.set_ylabel('Valor')
+    ax.set_title('Comparação de Valores de Convênios por Ano')
+    ax.legend()
+    ax.set_xticks(anos)
+    ax.figure.tight_layout()
+
+# Gráfico de linhas da evolução dos valores pagos por ano
+def grafico_evolucao_valor_pago(ax, series):
+    ax.plot(series["anos"], series["valores_pagos"], marker='o')
+    ax.set_title('Evolução dos Valores Totais Pagos de Convênios por Ano')
+    ax.set_xlabel('Ano de Assinatura')
+    ax.set_ylabel('Valor Pago')
+    ax.grid(True)
+
+# Série do gráfico de comparação (linhas: ano, soma original, soma atualizada)
+def serie_comparacao_valores(result):
+    anos, valores_originais, valores_atualizados = zip(*result)
+    return {
+        "anos": [int(ano) for ano in anos],
+        "valores_originais": list(valores_originais),
+        "valores_atualizados": list(valores_atualizados)
+    }
+
+# Série do gráfico de evolução (linhas: ano, soma do valor pago)
+def serie_evolucao_valor_pago(result):
+    anos, valores_pagos = zip(*result)
+    return {"anos": [int(ano) for ano in anos], "valores_pagos": list(valores_pagos)}
+
+@router.get("/comparison-original-updated", dependencies=[Depends(admit("charts"))])
+async def comparacao_valores_originais_atualizados(request: Request, format: ChartFormat = Query(default="png", description="Formato do gráfico: png, svg ou json"), db: AsyncSession = Depends(get_read_db)):
     # Consulta ao banco de dados
     stmt = (
         select(
-            func.strftime('%Y', Agreement.dates[0].data_assinatura).label('Ano_assinatura'),
-            func.sum(Agreement.values[0].valor_inicial_total).label('Valor_original'),
-            func.sum(Agreement.values[0].valor_atualizado_total).label('Valor_atualizado')
+            extract('year', AgreementDates.data_assinatura).label('ano'),
+            func.sum(AgreementValues.valor_inicial_total),
+            func.sum(AgreementValues.valor_atualizado_total)
         )
-        .group_by('Ano_assinatura')
-        .order_by('Ano_assinatura')
+        .join(AgreementDates, AgreementDates.agreement_id == AgreementValues.agreement_id)
+        .where(AgreementDates.data_assinatura.is_not(None))
+        .group_by('ano')
+        .order_by('ano')
     )
 
-    result = db.exec(stmt).all()
+    result = await analytics_exec(db, stmt)
 
     if not result:
         return {"message": "Nenhum convênio encontrado"}
    
     # Preparação dos dados para o gráfico
-    df = pd.DataFrame(result)
-    df['Ano_assinatura'] = pd.to_numeric(df['Ano_assinatura'], errors='coerce').fillna(0) # Tratar valores não numéricos
-    df['Ano_assinatura'] = df['Ano_assinatura'].astype(int) # transforma para inteiro
-    df = df.set_index('Ano_assinatura')
-  
-
-    # Geração do gráfico de barras
-    plt.figure(figsize=(12, 6))
-    plt.bar(df.index - 0.2, df['Valor_original'], width=0.4, label='Valores Originais', alpha=0.7)
-    plt.bar(df.index + 0.2, df['Valor_atualizado'], width=0.4, label='Valores Atualizados', alpha=0.7)
-    plt.xlabel('Ano de Assinatura')
-    plt.ylabel('Valor')
-    plt.title('Comparação de Valores de Convênios por Ano')
-    plt.legend()
-    plt.xticks(df.index)
-    plt.tight_layout()
-
-    # Salvar o gráfico em um buffer de bytes
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    plt.close()
-    buf.seek(0)
+    series = serie_comparacao_valores(result)
 
     # Retornar o gráfico como uma imagem PNG
-    return Response(content=buf.getvalue(), media_type="image/png")
+    return await run_in_executor("charts", render_chart, request, "agreements/comparison-original-updated", series, grafico_comparacao_valores, spec=SPEC_COMPARACAO_VALORES, figsize=(12, 6), format=format)
 
-@router.get("/evolution-value-paid")
-def evolucao_valores_pagos(db: Session = Depends(get_db)):
+@router.get("/evolution-value-paid", dependencies=[Depends(admit("charts"))])
+async def evolucao_valores_pagos(request: Request, format: ChartFormat = Query(default="png", description="Formato do gráfico: png, svg ou json"), db: AsyncSession = Depends(get_read_db)):
     # Consulta ao banco de dados
     stmt = (
         select(
-            func.strftime('%Y', Agreement.dates[0].data_assinatura).label('Ano de Assinatura'),
-            func.sum(Agreement.values[0].valor_pago).label('Valor Pago')
+            extract('year', AgreementDates.data_assinatura).label('ano'),
+            func.sum(AgreementValues.valor_pago)
         )
-        .group_by('Ano de Assinatura')
-        .order_by('Ano de Assinatura')
+        .join(AgreementDates, AgreementDates.agreement_id == AgreementValues.agreement_id)
+        .where(AgreementDates.data_assinatura.is_not(None))
+        .group_by('ano')
+        .order_by('ano')
     )
 
-    result = db.exec(stmt).all()
+    result = await analytics_exec(db, stmt)
 
     if not result:
         return {"message": "Nenhum convênio encontrado"}
     
-    df = pd.DataFrame(result)
-    df['Ano de Assinatura'] = pd.to_numeric(df['Ano de Assinatura'], errors='coerce').fillna(0) # Tratar valores não numéricos
-    df['Ano de Assinatura'] = df['Ano de Assinatura'].astype(int) # transforma para inteiro
-    df = df.set_index('Ano de Assinatura')
-
-    # Geração do gráfico de linhas
-    plt.figure(figsize=(12, 6))
-    plt.plot(df.index, df['Valor Pago'], marker='o')
-    plt.title('Evolução dos Valores Totais Pagos de Convênios por Ano')
-    plt.xlabel('Ano de Assinatura')
-    plt.ylabel('Valor Pago')
-    plt.grid(True)
-
-    # Salvar o gráfico em um buffer de bytes
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    plt.close()
-    buf.seek(0)
+    series = serie_evolucao_valor_pago(result)
 
     # Retornar o gráfico como uma imagem PNG
-    return Response(content=buf.getvalue(), media_type="image/png")
+    return await run_in_executor("charts", render_chart, request, "agreements/evolution-value-paid", series, grafico_evolucao_valor_pago, spec=SPEC_EVOLUCAO_VALOR_PAGO, figsize=(12, 6), format=format)
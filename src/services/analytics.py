@@ -0,0 +1,187 @@
+from datetime import date
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import Date, DateTime, Float, Integer, Numeric, extract, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.sql import func
+from database import get_read_db
+from models import *
+from utils.admission import admit
+from utils.analytics_engine import analytics_enabled, analytics_exec, get_analytics_engine
+from utils.column_store import column_store_enabled, get_column_store
+from utils.executors import run_in_executor
+from services.configs import analytics_logger as logger
+
+# Criar roteador
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+'''
+Conjuntos de dados da consulta genérica: tabelas unidas pela chave do contrato ou do convênio
+'''
+DATASETS = {
+    "contracts": (
+        [Contract, ContractValues, ContractDates, AdministrativeProcess],
+        lambda: select().select_from(Contract)
+            .outerjoin(ContractValues, ContractValues.contract_id == Contract.id)
+            .outerjoin(ContractDates, ContractDates.contract_id == Contract.id)
+            .outerjoin(AdministrativeProcess, AdministrativeProcess.contract_id == Contract.id),
+    ),
+    "agreements": (
+        [Agreement, AgreementValues, AgreementDates],
+        lambda: select().select_from(Agreement)
+            .outerjoin(AgreementValues, AgreementValues.agreement_id == Agreement.id)
+            .outerjoin(AgreementDates, AgreementDates.agreement_id == Agreement.id),
+    ),
+}
+
+AGGREGATES = {"sum": func.sum, "avg": func.avg, "min": func.min, "max": func.max, "count": func.count}
+DATE_PARTS = {"ano": "year", "mes": "month"}
+OPERATORS = {
+    "eq": lambda column, value: column == value,
+    "ne": lambda column, value: column != value,
+    "gt": lambda column, value: column > value,
+    "gte": lambda column, value: column >= value,
+    "lt": lambda column, value: column < value,
+    "lte": lambda column, value: column <= value,
+    "like": lambda column, value: column.ilike(f"%{value}%"),
+}
+
+# Colunas disponíveis em um conjunto de dados (sem os identificadores e chaves estrangeiras)
+def dataset_columns(dataset):
+    models, _ = DATASETS[dataset]
+    return {
+        column.name: column
+        for model in models
+        for column in model.__table__.columns
+        if column.name != "id" and not column.name.endswith("_id")
+    }
+
+def get_column(columns, name):
+    if name not in columns:
+        raise HTTPException(status_code=400, detail=f"Coluna '{name}' não encontrada. Colunas disponíveis: {', '.join(columns)}")
+    return columns[name]
+
+# Converte o valor de um filtro para o tipo da coluna
+def typed_value(column, value):
+    try:
+        if isinstance(column.type, (DateTime, Date)):
+            return date.fromisoformat(value)
+        if isinstance(column.type, Integer):
+            return int(value)
+        if isinstance(column.type, Float):
+            return float(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Valor inválido para a coluna '{column.name}': {value}")
+    return value
+
+# Dimensão de agrupamento: "coluna" ou "ano:coluna" / "mes:coluna" para colunas de data
+def group_expression(columns, spec):
+    part, _, name = spec.rpartition(":")
+    column = get_column(columns, name)
+    if not part:
+        return column.label(name)
+    if part not in DATE_PARTS or not isinstance(column.type, (DateTime, Date)):
+        raise HTTPException(status_code=400, detail=f"Agrupamento inválido: '{spec}'. Use 'ano:coluna' ou 'mes:coluna' para colunas de data")
+    return extract(DATE_PARTS[part], column).label(f"{part}_{name}")
+
+# Métrica: "count" ou "funcao:coluna" (sum, avg, min, max, count, count_distinct)
+def metric_expression(columns, spec):
+    if spec == "count":
+        return func.count().label("count")
+    aggregate, _, name = spec.partition(":")
+    column = get_column(columns, name)
+    if aggregate == "count_distinct":
+        return func.count(column.distinct()).label(f"count_distinct_{name}")
+    if aggregate not in AGGREGATES:
+        raise HTTPException(status_code=400, detail=f"Métrica inválida: '{spec}'. Use count ou sum/avg/min/max/count/count_distinct:coluna")
+    if aggregate in ("sum", "avg") and not isinstance(column.type, (Integer, Numeric)):
+        raise HTTPException(status_code=400, detail=f"A métrica '{aggregate}' exige uma coluna numérica: '{name}'")
+    return AGGREGATES[aggregate](column).label(f"{aggregate}_{name}")
+
+# Filtro: "coluna:operador:valor" (eq, ne, gt, gte, lt, lte, like)
+def filter_expression(columns, spec):
+    name, operator, value = (spec.split(":", 2) + [None, None])[:3]
+    column = get_column(columns, name)
+    if operator not in OPERATORS or value is None:
+        raise HTTPException(status_code=400, detail=f"Filtro inválido: '{spec}'. Use coluna:operador:valor com o operador em {', '.join(OPERATORS)}")
+    if operator == "like":
+        return OPERATORS[operator](column, value)
+    return OPERATORS[operator](column, typed_value(column, value))
+
+'''
+Monta a consulta de agregação (SELECT ... GROUP BY) a partir dos parâmetros da rota
+'''
+def build_query(dataset, group_by, metrics, filters, order_by, limit):
+    columns = dataset_columns(dataset)
+    groups = [group_expression(columns, spec) for spec in group_by]
+    aggregates = [metric_expression(columns, spec) for spec in metrics]
+    labels = {expression.name: expression for expression in groups + aggregates}
+
+    stmt = DATASETS[dataset][1]().add_columns(*groups, *aggregates)
+    for spec in filters:
+        stmt = stmt.where(filter_expression(columns, spec))
+    if groups:
+        stmt = stmt.group_by(*groups)
+
+    if order_by:
+        name = order_by.lstrip("-")
+        if name not in labels:
+            raise HTTPException(status_code=400, detail=f"Ordenação inválida: '{order_by}'. Use uma das colunas do resultado: {', '.join(labels)}")
+        stmt = stmt.order_by(labels[name].desc() if order_by.startswith("-") else labels[name])
+    elif groups:
+        stmt = stmt.order_by(*groups)
+
+    return stmt.limit(limit), list(labels)
+
+# Consulta genérica de agregação
+@router.get("/query", description="Agrega um conjunto de dados (contratos ou convênios) por dimensões, com métricas e filtros", dependencies=[Depends(admit("charts"))])
+async def analytics_query(
+    dataset: Literal["contracts", "agreements"],
+    group_by: list[str] = Query([], description="Dimensões: coluna, ano:coluna_data ou mes:coluna_data"),
+    metrics: list[str] = Query(["count"], description="Métricas: count ou sum/avg/min/max/count/count_distinct:coluna"),
+    filter: list[str] = Query([], description="Filtros: coluna:operador:valor (eq, ne, gt, gte, lt, lte, like)"),
+    order_by: Optional[str] = Query(None, description="Coluna do resultado; prefixo '-' para ordem decrescente"),
+    limit: int = Query(1000, gt=0, le=100_000),
+    db: AsyncSession = Depends(get_read_db),
+):
+    stmt, labels = build_query(dataset, group_by, metrics, filter, order_by, limit)
+    try:
+        rows = await analytics_exec(db, stmt)
+    except Exception as e:
+        logger.error(f"Erro na consulta analítica de {dataset}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro na consulta analítica. Erro: {str(e)}")
+
+    logger.info(f"consulta analítica de {dataset} agrupada por {group_by} com {metrics}: {len(rows)} linhas")
+    return {
+        "engine": "duckdb" if analytics_enabled() else "database",
+        "columns": labels,
+        "rows": [dict(zip(labels, row)) for row in rows],
+    }
+
+# Situação do snapshot usado pelo motor analítico
+@router.get("/snapshot", description="Exibe a situação do snapshot do motor analítico")
+def analytics_snapshot():
+    if not analytics_enabled():
+        return {"engine": "database"}
+    return get_analytics_engine().stats()
+
+# Atualização manual do snapshot
+@router.post("/refresh", description="Gera um novo snapshot das tabelas para o motor analítico")
+async def analytics_refresh():
+    if not analytics_enabled():
+        raise HTTPException(status_code=409, detail="O motor analítico não está habilitado (analytics.engine: duckdb)")
+    try:
+        snapshot = await run_in_executor("analytics", get_analytics_engine().refresh)
+    except Exception as e:
+        logger.error(f"Erro ao gerar o snapshot analítico: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao gerar o snapshot analítico. Erro: {str(e)}")
+
+    logger.info(f"snapshot analítico gerado em {snapshot['duration_s']} s: {snapshot['tables']}")
+    return get_analytics_engine().stats()
+
+# Situação do armazenamento colunar em memória (versão do conjunto de dados, linhas e memória)
+@router.get("/column_store", description="Exibe a situação do armazenamento colunar em memória")
+def analytics_column_store():
+    if not column_store_enabled():
+        return {"enabled": False}
+    return {"enabled": True, **get_column_store().stats()}
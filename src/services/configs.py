@@ -23,3 +23,5 @@ agreements_logger = logging.getLogger("agreements")
 agreement_values_logger = logging.getLogger("agreement_values")
 agreement_dates_logger = logging.getLogger("agreement_dates")
 accountability_logger = logging.getLogger("accountability")
+export_logger = logging.getLogger("export")
+analytics_logger = logging.getLogger("analytics")
@@ -2,7 +2,9 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, and_, select
 from sqlalchemy.sql import func
-from database import get_db
+from database import get_db, get_read_db
+from sqlmodel.ext.asyncio.session import AsyncSession
+from utils.admission import admit
 from models.contract_dates import ContractDates
 from services.configs import contract_dates_logger as logger
 
@@ -12,16 +14,16 @@ router = APIRouter(prefix="/contract_dates", tags=["Contract Dates"])
 
 
 # Listar datas de contrato paginado
-@router.get("/")
-def list_contract_dates(page: Optional[int] = Query(1, gt=0), length: Optional[int] = Query(100, gt=0), db: Session = Depends(get_db)):
+@router.get("/", dependencies=[Depends(admit("listing"))])
+async def list_contract_dates(page: Optional[int] = Query(1, gt=0), length: Optional[int] = Query(100, gt=0), db: AsyncSession = Depends(get_read_db)):
     try:
-        contract_dates = db.exec(select(ContractDates).offset((page - 1) * length).limit(length)).all()
+        contract_dates = (await db.exec(select(ContractDates).offset((page - 1) * length).limit(length))).all()
     except Exception as e:
         logger.error(f"Erro ao listar datas dos contratos: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao listar datas dos contratos")
 
-    total = db.exec(select(func.count(ContractDates.id))).one()
+    total = (await db.exec(select(func.count(ContractDates.id)))).one()
     total_pages = (total // length) + (1 if total % length > 0 else 0)
     pagination = {
         "page": page,
@@ -35,12 +37,12 @@ def list_contract_dates(page: Optional[int] = Query(1, gt=0), length: Optional[i
 
 # Obter data de contrato por id
 @router.get("/{contract_date_id}")
-def get_contract_date_by_id(contract_date_id: int, db: Session = Depends(get_db)):
+async def get_contract_date_by_id(contract_date_id: int, db: AsyncSession = Depends(get_read_db)):
     try:
-        contract_date = db.get(ContractDates, contract_date_id)
+        contract_date = await db.get(ContractDates, contract_date_id)
     except Exception as e:
         logger.error(f"Erro ao obter data de contrato: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao obter data de contrato")
 
     if contract_date is None:
@@ -92,16 +94,16 @@ def delete_contract_date(contract_date_id: int, db: Session = Depends(get_db)):
     return {"message": f"Data de contrato {contract_date_id} deletada com sucesso"}
 
 @router.get('/atributos')
-def get_contract_dates_by_attributes(contract_id: Optional[int] = None, db: Session = Depends(get_db)):
+async def get_contract_dates_by_attributes(contract_id: Optional[int] = None, db: AsyncSession = Depends(get_read_db)):
     try:
         query = select(ContractDates)
         if contract_id is not None:
             query = query.where(ContractDates.contract_id == contract_id)
 
-        contract_dates = db.exec(query).all()
+        contract_dates = (await db.exec(query)).all()
     except Exception as e:
         logger.error(f"Erro ao buscar datas dos contratos: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao buscar datas dos contratos")
 
     logger.info('buscando datas dos contratos com os atributos fornecidos')
@@ -109,12 +111,12 @@ def get_contract_dates_by_attributes(contract_id: Optional[int] = None, db: Sess
     return result
 
 @router.get('/quantidade')
-def get_contract_dates_quantity(db: Session = Depends(get_db)):
+async def get_contract_dates_quantity(db: AsyncSession = Depends(get_read_db)):
     try:
-        quantity = db.exec(select(func.count(ContractDates.id))).one()
+        quantity = (await db.exec(select(func.count(ContractDates.id)))).one()
     except Exception as e:
         logger.error(f"Erro ao buscar quantidade de datas dos contratos: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao buscar quantidade de datas dos contratos")
 
     logger.info('buscando quantidade de datas dos contratos')
@@ -3,7 +3,9 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, and_, select
 from sqlalchemy.sql import func
-from database import get_db
+from database import get_db, get_read_db
+from sqlmodel.ext.asyncio.session import AsyncSession
+from utils.admission import admit
 from models.contract_values import ContractValues
 from services.configs import contract_values_logger as logger
 
@@ -58,10 +60,10 @@ def delete_contract_value(contract_value_id: int, db: Session = Depends(get_db))
     
 # Busca um valor de contrato pelo id
 @router.get("/{contract_value_id}", response_model=ContractValues, description="Busca um valor de contrato pelo id")
-def get_contract_value(contract_value_id: int, db: Session = Depends(get_db)):
+async def get_contract_value(contract_value_id: int, db: AsyncSession = Depends(get_read_db)):
     try:
         logger.info(f'Buscando valores de contrato pelo id {contract_value_id}')
-        contract_value = db.get(ContractValues, contract_value_id)
+        contract_value = await db.get(ContractValues, contract_value_id)
         if contract_value is None:
             logger.error(f"Valores de contrato não encontrados: {contract_value_id}")
             raise HTTPException(status_code=404, detail="Valores de contrato não encontrados")
@@ -70,13 +72,13 @@ def get_contract_value(contract_value_id: int, db: Session = Depends(get_db)):
         return contract_value
     except Exception as e:
         logger.error(f"Erro ao obter valores de contrato: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao obter valores de contrato")
     
 # Listagem dos valores de contratos com paginação e filtros
-@router.get("/", description="Lista os valores de contratos")
-def list_contract_values(
-    db: Session = Depends(get_db),
+@router.get("/", description="Lista os valores de contratos", dependencies=[Depends(admit("listing"))])
+async def list_contract_values(
+    db: AsyncSession = Depends(get_read_db),
     page: Optional[int] = Query(default=1, ge=0, description="Página de valores de contratos"),
     limit: Optional[int] = Query(default=100, ge=0, le=100, description="Quantidade de valores de contratos a serem retornados"),
     min_valor_original: Optional[float] = Query(default=None, ge=0, description="Valor original mínimo"),
@@ -117,9 +119,9 @@ def list_contract_values(
         
         offset = (page - 1) * limit
         stmt = select(ContractValues).where(and_(*filters)).offset(offset).limit(limit) if filters else select(ContractValues).offset(offset).limit(limit)
-        contract_values = db.exec(stmt).all()
+        contract_values = (await db.exec(stmt)).all()
 
-        total_contract_values = db.exec(select(func.count()).select_from(ContractValues).where(and_(*filters))).first() if filters else db.exec(select(func.count()).select_from(ContractValues)).first()
+        total_contract_values = (await db.exec(select(func.count()).select_from(ContractValues).where(and_(*filters)))).first() if filters else (await db.exec(select(func.count()).select_from(ContractValues))).first()
         total_pages = ceil(total_contract_values / limit)
         
         if total_contract_values > 0:
@@ -138,5 +140,5 @@ def list_contract_values(
         
     except Exception as e:
         logger.error(f"Erro ao listar valores de contratos: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao listar valores de contratos")
\ No newline at end of file
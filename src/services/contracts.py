@@ -1,37 +1,48 @@
 from math import ceil
 import os
-import pandas as pd
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, Response
-from pandas import read_excel
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlmodel import Session, and_, extract, select
 from sqlalchemy.sql import func
-from unidecode import unidecode
-from database import get_db
+from database import get_db, get_read_db
+from sqlmodel.ext.asyncio.session import AsyncSession
 from models.administrative_process import AdministrativeProcess
 from models.contract import Contract
+from models.contract_anomaly import ContractAnomaly
 from models.contract_dates import ContractDates
 from models.contract_values import ContractValues
 from services.configs import contracts_logger as logger
 from services.configs import contract_values_logger as logger_values
 from services.configs import contract_dates_logger as logger_dates
 from services.configs import administrative_processes_logger as logger_processes
-from utils.convert_date import convert_date
-import matplotlib.pyplot as plt
-import io
-import base64
+from utils.admission import admit
+from utils.analytics_engine import analytics_exec
+from utils.after_ingestion import after_ingestion, refresh_if_outdated
+from utils.anomalies import update_contract_anomalies
+from utils.executors import run_in_executor
+from utils.render_chart import ChartFormat, render_chart
+from utils.vega_lite import grouped_bar_spec, line_spec, pie_spec
 
 # Criar roteador
 router = APIRouter(prefix="/contracts", tags=["Contracts"])
 
-# Cria os contratos
-@router.post("/", description="Cria todos os contratos e valores de contratos")
-def create_contracts(db: Session = Depends(get_db)):
+# Lê a planilha e grava os contratos (bloqueante: executado no executor de ingestão)
+def ingest_contracts(db: Session):
     columns_contracts = ['numero_contrato', 'cpf/cnpj', 'contratante', 'contratado', 'tipo_objeto', 'objeto']
     columns_values = ['valor_original', 'valor_aditivo', 'valor_atualizado', 'valor_empenhado', 'valor_pago']
     columns_dates = ['data_de_assinatura', 'data_de_termino_original', 'data_de_termino_apos_aditivo', 'data_de_rescisao', 'data_publicacao_no_doe']
     columns_admnistrative_process = ['no_do_processo_-_spu', 'modalidade_de_licitacao', 'justificativa', 'status_str', 'situacao_fisica']
     
+    # Importações pesadas carregadas apenas quando a ingestão é executada
+    import pandas as pd
+    from pandas import read_excel
+    from unidecode import unidecode
+    from utils.convert_date import convert_date
+    from utils.ingestion_report import IngestionReport
+    
+    # Tempo, CPU, linhas e memória de cada etapa da ingestão
+    report = IngestionReport("contracts")
+    
     try:
         curr_dir = os.path.dirname(os.path.abspath(__file__))
         data_dir = os.path.join(curr_dir, "../data")
@@ -45,9 +56,14 @@ def create_contracts(db: Session = Depends(get_db)):
         logger.info('Criando contratos')
         for file in files:
             excel_file = os.path.join(data_dir, file)
-            df = read_excel(excel_file)
-            df.columns = [unidecode(col.lower().replace(' ', '_')) for col in df.columns]
-            df = df.where(pd.notna(df), None)
+            with report.stage("leitura_excel") as stage:
+                df = read_excel(excel_file)
+                stage["rows"] += len(df)
+            with report.stage("normalizacao_colunas"):
+                df.columns = [unidecode(col.lower().replace(' ', '_')) for col in df.columns]
+            with report.stage("limpeza_nan") as stage:
+                df = df.where(pd.notna(df), None)
+                stage["rows"] += len(df)
             
             data_contract = [df[col] for col in columns_contracts if col in df.columns]
             data_values = [df[col] for col in columns_values if col in df.columns]
@@ -55,49 +71,63 @@ def create_contracts(db: Session = Depends(get_db)):
             data_admnistrative_process = [df[col] for col in columns_admnistrative_process if col in df.columns]
             
             for num, cpf_cnpj, cont, cond, tip, obj, vo, va, vat, ve, vp, da, dto, dta, dr, dp, np, ml, j, si, sf in zip(*data_contract, *data_values, *data_dates, *data_admnistrative_process):
-                # Cria os contratos
-                contract = Contract(numero_contrato=num, cpf_cnpj=cpf_cnpj, contratante=cont, contratado=cond, tipo_objeto=tip, objeto=obj)
-                db.add(contract)
-                db.commit()
-                db.refresh(contract)
-                logger.info(f'Criando contrato {contract.id}')
-                
-                # Cria os valores dos contratos
-                contract_value = ContractValues(contract_id=contract.id, valor_original=vo, valor_aditivo=va, valor_atualizado=vat, valor_empenhado=ve, valor_pago=vp)
-                db.add(contract_value)
-                db.commit()
-                db.refresh(contract_value)
-                logger_values.info(f'Criando valor de contrato {contract_value.id}')
+                with report.stage("gravacao_banco") as stage:
+                    # Cria os contratos
+                    contract = Contract(numero_contrato=num, cpf_cnpj=cpf_cnpj, contratante=cont, contratado=cond, tipo_objeto=tip, objeto=obj)
+                    db.add(contract)
+                    db.commit()
+                    db.refresh(contract)
+                    logger.info(f'Criando contrato {contract.id}')
+                    
+                    # Cria os valores dos contratos
+                    contract_value = ContractValues(contract_id=contract.id, valor_original=vo, valor_aditivo=va, valor_atualizado=vat, valor_empenhado=ve, valor_pago=vp)
+                    db.add(contract_value)
+                    db.commit()
+                    db.refresh(contract_value)
+                    logger_values.info(f'Criando valor de contrato {contract_value.id}')
+                    stage["rows"] += 2
                 
                 # Converte datas
-                da = convert_date(da) if da else None
-                dto = convert_date(dto) if dto else None
-                dta = convert_date(dta) if dta else None
-                dr = convert_date(dr) if dr else None
-                dp = convert_date(dp) if dp else None
-                
-                # Cria as datas dos contratos
-                contract_date = ContractDates(contract_id=contract.id, data_de_assinatura=da, data_de_termino_original=dto, data_de_termino_apos_aditivo=dta, data_de_rescisao=dr, data_publicacao_no_doe=dp)
-                db.add(contract_date)
-                db.commit()
-                db.refresh(contract_date)
-                logger_dates.info(f'Criando data de contrato {contract_date.id}')
+                with report.stage("conversao_datas") as stage:
+                    da = convert_date(da) if da else None
+                    dto = convert_date(dto) if dto else None
+                    dta = convert_date(dta) if dta else None
+                    dr = convert_date(dr) if dr else None
+                    dp = convert_date(dp) if dp else None
+                    stage["rows"] += 1
                 
-                # Cria os processos administrativos dos contratos
-                contract_process = AdministrativeProcess(contract_id=contract.id, n_do_processo_spu=np, modalidade_de_licitacao=ml, justificativa=j, status_do_instrumento=si, situacao_fisica=sf)
-                db.add(contract_process)
-                db.commit()
-                db.refresh(contract_process)
-                logger_processes.info(f'Criando processo administrativo de contrato {contract_process.id}')
+                with report.stage("gravacao_banco") as stage:
+                    # Cria as datas dos contratos
+                    contract_date = ContractDates(contract_id=contract.id, data_de_assinatura=da, data_de_termino_original=dto, data_de_termino_apos_aditivo=dta, data_de_rescisao=dr, data_publicacao_no_doe=dp)
+                    db.add(contract_date)
+                    db.commit()
+                    db.refresh(contract_date)
+                    logger_dates.info(f'Criando data de contrato {contract_date.id}')
+                    
+                    # Cria os processos administrativos dos contratos
+                    contract_process = AdministrativeProcess(contract_id=contract.id, n_do_processo_spu=np, modalidade_de_licitacao=ml, justificativa=j, status_do_instrumento=si, situacao_fisica=sf)
+                    db.add(contract_process)
+                    db.commit()
+                    db.refresh(contract_process)
+                    logger_processes.info(f'Criando processo administrativo de contrato {contract_process.id}')
+                    stage["rows"] += 2
         
         logger.info('Contratos criados com sucesso')
-        return {"message": "Contratos criados com sucesso"}
+        return {"message": "Contratos criados com sucesso", "report": report.finish()}
         
     except Exception as e:
         logger.error(f"Erro ao criar contratos: {str(e)}")
         db.rollback()
+        report.finish(error=e)
         raise HTTPException(status_code=500, detail=f"Erro ao criar contratos. Erro: {str(e)}")
 
+# Cria os contratos
+@router.post("/", description="Cria todos os contratos e valores de contratos", dependencies=[Depends(admit("ingestion"))])
+async def create_contracts(db: Session = Depends(get_db)):
+    result = await run_in_executor("ingestion", ingest_contracts, db)
+    after_ingestion()
+    return result
+
 # Atualiza um contrato
 @router.put("/{contract_id}", description="Atualiza um contrato")
 def update_contract(contract_id: int, new_contract: Contract, db: Session = Depends(get_db)):
@@ -146,10 +176,10 @@ def delete_contract(contract_id: int, db: Session = Depends(get_db)):
     
 # Busca um contrato pelo id
 @router.get("/contract/{contract_id}", response_model=Contract, description="Obtém um contrato")
-def get_contract(contract_id: int, db: Session = Depends(get_db)):
+async def get_contract(contract_id: int, db: AsyncSession = Depends(get_read_db)):
     try:
         logger.info(f'Buscando contrato pelo id {contract_id}')
-        contract = db.get(Contract, contract_id)
+        contract = await db.get(Contract, contract_id)
         if contract is None:
             logger.error(f"Contrato não encontrado: {contract_id}")
             raise HTTPException(status_code=404, detail="Contrato não encontrado")
@@ -158,13 +188,13 @@ def get_contract(contract_id: int, db: Session = Depends(get_db)):
         return contract
     except Exception as e:
         logger.error(f"Erro ao obter contrato: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao obter contrato")
     
 # Listagem dos contratos com paginação e filtros
-@router.get("/", description="Lista os contratos")
-def list_contracts(
-    db: Session = Depends(get_db),
+@router.get("/", description="Lista os contratos", dependencies=[Depends(admit("listing"))])
+async def list_contracts(
+    db: AsyncSession = Depends(get_read_db),
     page: Optional[int] = Query(default=1, ge=0, description="Página de contratos"),
     limit: Optional[int] = Query(default=100, ge=0, le=100, description="Quantidade de contratos a serem retornados"),
     cpf_cnpj: Optional[str] = Query(default=None, description="CPF/CNPJ do contratante"),
@@ -190,9 +220,9 @@ def list_contracts(
         
         offset = (page - 1) * limit
         stmt = select(Contract).where(and_(*filters)).offset(offset).limit(limit) if filters else select(Contract).offset(offset).limit(limit)
-        contracts = db.exec(stmt).all()
+        contracts = (await db.exec(stmt)).all()
 
-        total_contracts = db.exec(select(func.count()).select_from(Contract).where(and_(*filters))).first() if filters else db.exec(select(func.count()).select_from(Contract)).first()
+        total_contracts = (await db.exec(select(func.count()).select_from(Contract).where(and_(*filters)))).first() if filters else (await db.exec(select(func.count()).select_from(Contract))).first()
         total_pages = ceil(total_contracts / limit)
         
         if total_contracts > 0:
@@ -211,16 +241,151 @@ def list_contracts(
         
     except Exception as e:
         logger.error(f"Erro ao listar contratos: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Erro ao listar contratos")
 
+# Responde com as anomalias gravadas; se a tabela de valores tem linhas ainda não avaliadas, agenda o recálculo em segundo plano
+async def check_anomalies(db: AsyncSession):
+    if await refresh_if_outdated(db, "contract_anomalies", [ContractValues], "anomalias de contratos", update_contract_anomalies):
+        logger.info("anomalias de contratos desatualizadas: recálculo agendado em segundo plano")
+
+# Listagem dos valores de contratos atípicos (z robusto dentro do grupo modalidade/ano), do mais ao menos atípico
+@router.get("/anomalies", description="Lista os contratos com valores atípicos em relação à sua modalidade e ano", dependencies=[Depends(admit("listing"))])
+async def list_contract_anomalies(
+    db: AsyncSession = Depends(get_read_db),
+    page: Optional[int] = Query(default=1, ge=1, description="Página de anomalias"),
+    limit: Optional[int] = Query(default=100, ge=1, le=100, description="Quantidade de anomalias a serem retornadas"),
+    metrica: Optional[Literal["razao_aditivo", "razao_pago_empenhado", "excesso_pago_atualizado"]] = Query(default=None, description="Métrica avaliada"),
+    ano: Optional[int] = Query(default=None, description="Ano de assinatura"),
+    modalidade: Optional[str] = Query(default=None, description="Modalidade de licitação"),
+    min_score: Optional[float] = Query(default=None, ge=0, description="|z robusto| mínimo"),
+):
+    try:
+        await check_anomalies(db)
+        filters = []
+        
+        if metrica:
+            filters.append(ContractAnomaly.metrica == metrica)
+        if ano is not None:
+            filters.append(ContractAnomaly.ano == ano)
+        if modalidade:
+            filters.append(ContractAnomaly.modalidade == modalidade)
+        if min_score is not None:
+            filters.append(ContractAnomaly.score >= min_score)
+        
+        offset = (page - 1) * limit
+        stmt = select(ContractAnomaly, Contract).join(Contract, Contract.id == ContractAnomaly.contract_id).where(*filters)
+        rows = (await db.exec(stmt.order_by(ContractAnomaly.score.desc(), ContractAnomaly.id).offset(offset).limit(limit))).all()
+
+        total_anomalies = (await db.exec(select(func.count()).select_from(ContractAnomaly).where(*filters))).first()
+        total_pages = ceil(total_anomalies / limit)
+        logger.info(f"{total_anomalies} anomalias de contratos encontradas")
+
+        return {
+            "message": "Anomalias encontradas com sucesso",
+            "data": [{**anomaly.model_dump(), "contract": contract} for anomaly, contract in rows],
+            "page": page,
+            "limit": limit,
+            "total_anomalies": total_anomalies,
+            "total_pages": total_pages
+        }
+        
+    except Exception as e:
+        logger.error(f"Erro ao listar anomalias de contratos: {str(e)}")
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Erro ao listar anomalias de contratos")
+
+# Recalcula as anomalias (necessário após edições de valores, datas ou modalidades)
+@router.post("/anomalies/refresh", description="Recalcula as anomalias de valores de contratos", dependencies=[Depends(admit("ingestion"))])
+async def refresh_contract_anomalies():
+    try:
+        summary = await run_in_executor("analytics", update_contract_anomalies, full=True)
+    except Exception as e:
+        logger.error(f"Erro ao recalcular as anomalias de contratos: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao recalcular as anomalias de contratos. Erro: {str(e)}")
+
+    logger.info(f"anomalias de contratos recalculadas: {summary}")
+    return summary
+
 '''
     Rotas complexas de contratos
 '''
 
+
+# Especificações Vega-Lite dos gráficos (formato json)
+SPEC_DISTRIBUICAO_MODALIDADE = pie_spec("Distribuição dos Contratos por Modalidade de Licitação", theta="contagens", color="modalidades")
+SPEC_EVOLUCAO_VALOR_PAGO = line_spec("Evolução da Média do Valor Pago de Contratos ao Longo dos Anos", x="anos", y="valores", x_title="Ano", y_title="Média do Valor Pago")
+SPEC_COMPARACAO_VALORES = grouped_bar_spec("Comparação entre Valores Originais e Atualizados de Contratos", x="anos", fields={"valores_originais": "Valor Original", "valores_atualizados": "Valor Atualizado"}, x_title="Ano", y_title="Valores (R$)")
+SPEC_SITUACAO_FISICA = pie_spec("Distribuição dos Contratos por Situação Física dos Processos Administrativos", theta="contagens", color="situacoes")
+
+# Gráfico de pizza da distribuição de contratos por modalidade
+def grafico_distribuicao_modalidade(ax, series):
+    ax.pie(series["contagens"], labels=series["modalidades"], autopct="%1.1f%%", startangle=140)
+    ax.set_title("Distribuição dos Contratos por Modalidade de Licitação")
+
+# Gráfico de linha da evolução da média de valor pago
+def grafico_evolucao_valor_pago(ax, series):
+    ax.plot(series["anos"], series["valores"], marker='o', linestyle='-', color='blue')
+    ax.set_xlabel("Ano")
+    ax.set_ylabel("Média do Valor Pago")
+    ax.set_title("Evolução da Média do Valor Pago de Contratos ao Longo dos Anos")
+
+# Gráfico de barras comparando valores originais e atualizados
+def grafico_comparacao_valores(ax, series):
+    width = 0.4
+    indices = range(len(series["anos"]))
+    
+    ax.bar(indices, series["valores_originais"], width=width, label="Valor Original", color='blue', alpha=0.7)
+    ax.bar([i + width for i in indices], series["valores_atualizados"], width=width, label="Valor Atualizado", color='red', alpha=0.7)
+    
+    ax.set_xlabel("Ano")
+    ax.set_ylabel("Valores (R$)")
+    ax.set_title("Comparação entre Valores Originais e Atualizados de Contratos")
+    ax.set_xticks([i + width / 2 for i in indices], series["anos"])
+    ax.legend()
+
+# Gráfico de pizza da distribuição de contratos por situação física
+def grafico_situacao_fisica(ax, series):
+    ax.pie(series["contagens"], labels=series["situacoes"], autopct="%1.1f%%", startangle=140)
+    ax.set_title("Distribuição dos Contratos por Situação Física dos Processos Administrativos")
+    ax.figure.tight_layout()
+
+# Agrupa as categorias menos frequentes em "Outras", mantendo as n maiores
+def top_categorias(result, n):
+    categorias, contagens = zip(*result)
+    top_categorias = list(categorias[:n])
+    top_contagens = list(contagens[:n])
+    
+    if len(categorias) > n:
+        outras_contagens = sum(contagens[n:])
+        top_categorias.append("Outras")
+        top_contagens.append(outras_contagens)
+    
+    return top_categorias, top_contagens
+
+# Série do gráfico de distribuição por modalidade (linhas ordenadas pela contagem)
+def serie_distribuicao_modalidade(result):
+    modalidades, contagens = top_categorias(result, 5)
+    return {"modalidades": modalidades, "contagens": contagens}
+
+# Série do gráfico de evolução do valor pago (linhas: ano, média do valor pago)
+def serie_evolucao_valor_pago(result):
+    anos, valores = zip(*result)
+    return {"anos": [str(ano) for ano in anos], "valores": list(valores)}
+
+# Série do gráfico de comparação de valores (linhas: ano, média original, média atualizada)
+def serie_comparacao_valores(result):
+    anos, valores_originais, valores_atualizados = zip(*result)
+    return {"anos": list(anos), "valores_originais": list(valores_originais), "valores_atualizados": list(valores_atualizados)}
+
+# Série do gráfico de situação física (linhas ordenadas pela contagem)
+def serie_situacao_fisica(result):
+    situacoes, contagens = top_categorias(result, 3)
+    return {"situacoes": situacoes, "contagens": contagens}
+
 # Distribuição de contratos por modalidade
-@router.get("/distribution-modality")
-def distribuicao_contratos_por_modalidade(db: Session = Depends(get_db)):
+@router.get("/distribution-modality", dependencies=[Depends(admit("charts"))])
+async def distribuicao_contratos_por_modalidade(request: Request, format: ChartFormat = Query(default="png", description="Formato do gráfico: png, svg ou json"), db: AsyncSession = Depends(get_read_db)):
     stmt = (
         select(AdministrativeProcess.modalidade_de_licitacao, 
                func.count(Contract.id))
@@ -229,34 +394,17 @@ def distribuicao_contratos_por_modalidade(db: Session = Depends(get_db)):
         .order_by(func.count(Contract.id).desc())
     )
     
-    result = db.exec(stmt).all()
+    result = await analytics_exec(db, stmt)
     
     if not result:
         return {"message": "Nenhum contrato encontrado"}
     
-    modalidades, contagens = zip(*result)
-    top_modalidades = list(modalidades[:5])
-    top_contagens = list(contagens[:5])
-    
-    if len(modalidades) > 5:
-        outras_contagens = sum(contagens[5:])
-        top_modalidades.append("Outras")
-        top_contagens.append(outras_contagens)
-    
-    plt.figure(figsize=(8, 8))
-    plt.pie(top_contagens, labels=top_modalidades, autopct="%1.1f%%", startangle=140)
-    plt.title("Distribuição dos Contratos por Modalidade de Licitação")
-    
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    plt.close()
-    buf.seek(0)
-    
-    return Response(content=buf.getvalue(), media_type="image/png")
+    series = serie_distribuicao_modalidade(result)
+    return await run_in_executor("charts", render_chart, request, "contracts/distribution-modality", series, grafico_distribuicao_modalidade, spec=SPEC_DISTRIBUICAO_MODALIDADE, figsize=(8, 8), format=format)
 
 # Evolução da média de valor pago ao longo dos anos
-@router.get("/contract-payment-evolution")
-def evolucao_valor_pago(db: Session = Depends(get_db)):
+@router.get("/contract-payment-evolution", dependencies=[Depends(admit("charts"))])
+async def evolucao_valor_pago(request: Request, format: ChartFormat = Query(default="png", description="Formato do gráfico: png, svg ou json"), db: AsyncSession = Depends(get_read_db)):
     stmt = (
         select(extract('year', ContractDates.data_de_assinatura).label("ano"), 
                func.avg(ContractValues.valor_pago))
@@ -266,30 +414,17 @@ def evolucao_valor_pago(db: Session = Depends(get_db)):
         .order_by("ano")
     )
     
-    result = db.exec(stmt).all()
+    result = await analytics_exec(db, stmt)
     
     if not result:
         return {"message": "Nenhum dado encontrado"}
     
-    anos, valores = zip(*result)
-    anos = [str(ano) for ano in anos]
-    
-    plt.figure(figsize=(10, 6))
-    plt.plot(anos, valores, marker='o', linestyle='-', color='blue')
-    plt.xlabel("Ano")
-    plt.ylabel("Média do Valor Pago")
-    plt.title("Evolução da Média do Valor Pago de Contratos ao Longo dos Anos")
-    
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    plt.close()
-    buf.seek(0)
-    
-    return Response(content=buf.getvalue(), media_type="image/png")
+    series = serie_evolucao_valor_pago(result)
+    return await run_in_executor("charts", render_chart, request, "contracts/contract-payment-evolution", series, grafico_evolucao_valor_pago, spec=SPEC_EVOLUCAO_VALOR_PAGO, figsize=(10, 6), format=format)
 
 # Comparação da média de valores originais e atualizados ao longo dos anos
-@router.get("/contract-values-comparison")
-def comparacao_valores_contratos(db: Session = Depends(get_db)):
+@router.get("/contract-values-comparison", dependencies=[Depends(admit("charts"))])
+async def comparacao_valores_contratos(request: Request, format: ChartFormat = Query(default="png", description="Formato do gráfico: png, svg ou json"), db: AsyncSession = Depends(get_read_db)):
     stmt = (
         select(extract('year', ContractDates.data_de_assinatura).label("ano"), 
                func.avg(ContractValues.valor_original), 
@@ -300,36 +435,17 @@ def comparacao_valores_contratos(db: Session = Depends(get_db)):
         .order_by("ano")
     )
     
-    result = db.exec(stmt).all()
+    result = await analytics_exec(db, stmt)
     
     if not result:
         return {"message": "Nenhum dado encontrado"}
     
-    anos, valores_originais, valores_atualizados = zip(*result)
-    
-    plt.figure(figsize=(10, 6))
-    width = 0.4
-    indices = range(len(anos))
-    
-    plt.bar(indices, valores_originais, width=width, label="Valor Original", color='blue', alpha=0.7)
-    plt.bar([i + width for i in indices], valores_atualizados, width=width, label="Valor Atualizado", color='red', alpha=0.7)
-    
-    plt.xlabel("Ano")
-    plt.ylabel("Valores (R$)")
-    plt.title("Comparação entre Valores Originais e Atualizados de Contratos")
-    plt.xticks([i + width / 2 for i in indices], anos)
-    plt.legend()
-    
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    plt.close()
-    buf.seek(0)
-    
-    return Response(content=buf.getvalue(), media_type="image/png")
+    series = serie_comparacao_valores(result)
+    return await run_in_executor("charts", render_chart, request, "contracts/contract-values-comparison", series, grafico_comparacao_valores, spec=SPEC_COMPARACAO_VALORES, figsize=(10, 6), format=format)
 
 # Distribuição de contratos por situação física dos processos administrativos
-@router.get("/regularized-contracts")
-def percentual_contratos_regularizados(db: Session = Depends(get_db)):
+@router.get("/regularized-contracts", dependencies=[Depends(admit("charts"))])
+async def percentual_contratos_regularizados(request: Request, format: ChartFormat = Query(default="png", description="Formato do gráfico: png, svg ou json"), db: AsyncSession = Depends(get_read_db)):
     stmt = (
         select(AdministrativeProcess.situacao_fisica, func.count(Contract.id))
         .join(Contract, Contract.id == AdministrativeProcess.contract_id)
@@ -337,28 +453,10 @@ def percentual_contratos_regularizados(db: Session = Depends(get_db)):
         .order_by(func.count(Contract.id).desc())
     )
     
-    result = db.exec(stmt).all()
+    result = await analytics_exec(db, stmt)
     
     if not result:
         return {"message": "Nenhum dado encontrado"}
     
-    situacoes, contagens = zip(*result)
-    top_situacoes = list(situacoes[:3])
-    top_contagens = list(contagens[:3])
-    
-    if len(situacoes) > 3:
-        outras_contagens = sum(contagens[3:])
-        top_situacoes.append("Outras")
-        top_contagens.append(outras_contagens)
-    
-    plt.figure(figsize=(8, 8))
-    plt.pie(top_contagens, labels=top_situacoes, autopct="%1.1f%%", startangle=140)
-    plt.title("Distribuição dos Contratos por Situação Física dos Processos Administrativos")
-    plt.tight_layout()
-    
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    plt.close()
-    buf.seek(0)
-    
-    return Response(content=buf.getvalue(), media_type="image/png")
\ No newline at end of file
+    series = serie_situacao_fisica(result)
+    return await run_in_executor("charts", render_chart, request, "contracts/regularized-contracts", series, grafico_situacao_fisica, spec=SPEC_SITUACAO_FISICA, figsize=(8, 8), format=format)
@@ -0,0 +1,148 @@
+import asyncio
+from itertools import combinations
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import literal, union_all
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.sql import func
+from database import get_async_session_factory, get_read_db, get_replica_router
+from services.analytics import DATASETS, dataset_columns, filter_expression, group_expression, metric_expression
+from utils.admission import admit
+from utils.analytics_engine import analytics_dialect, analytics_enabled, analytics_exec
+from utils.cube_cache import CubeEntry, get_cube_cache, get_cube_config
+from services.configs import analytics_logger as logger
+
+# Criar roteador
+router = APIRouter(prefix="/cube", tags=["Cube"])
+
+'''
+Monta a consulta do cubo: todas as combinações das dimensões (GROUP BY CUBE) com as métricas.
+No PostgreSQL e no DuckDB usa CUBE e GROUPING (uma só varredura); nos demais bancos, UNION ALL
+de um GROUP BY por subconjunto, com as flags de grouping como constantes.
+Linhas: (flags de grouping..., valores das dimensões..., métricas...)
+'''
+def build_cube(dataset, dimensions, measures, filters, dialect):
+    columns = dataset_columns(dataset)
+    groups = [group_expression(columns, spec) for spec in dimensions]
+    aggregates = [metric_expression(columns, spec) for spec in measures]
+    conditions = [filter_expression(columns, spec) for spec in filters]
+
+    def grouped_select(*selected):
+        stmt = DATASETS[dataset][1]().add_columns(*selected)
+        for condition in conditions:
+            stmt = stmt.where(condition)
+        return stmt
+
+    if dialect in ("postgresql", "duckdb"):
+        stmt = grouped_select(*[func.grouping(group) for group in groups], *groups, *aggregates)
+        return stmt.group_by(func.cube(*groups)) if groups else stmt
+
+    subsets = [subset for size in range(len(groups), -1, -1) for subset in combinations(range(len(groups)), size)]
+    return union_all(*[
+        grouped_select(
+            *[literal(0 if index in subset else 1) for index in range(len(groups))],
+            *[groups[index] if index in subset else literal(None).label(groups[index].name) for index in range(len(groups))],
+            *aggregates,
+        ).group_by(*[groups[index] for index in subset])
+        for subset in subsets
+    ])
+
+# Calcula o cubo no banco (ou no DuckDB) e guarda no cache
+async def compute_cube(db, key):
+    dataset, filters, dimensions, measures = key
+    stmt = build_cube(dataset, list(dimensions), list(measures), list(filters), analytics_dialect(db))
+    rows = await analytics_exec(db, stmt)
+    entry = CubeEntry(key, list(dimensions), list(measures), [tuple(row) for row in rows])
+    get_cube_cache().set(entry)
+    logger.info(f"cubo de {dataset} por {list(dimensions)} com {list(measures)}: {len(rows)} células")
+    return entry
+
+# Recalcula em segundo plano um cubo muito pedido, com uma sessão própria
+async def refresh_cube(key):
+    cache = get_cube_cache()
+    try:
+        session_factory = await get_replica_router().pick() or get_async_session_factory()
+        async with session_factory() as session:
+            await compute_cube(session, key)
+    except Exception as e:
+        logger.error(f"Erro ao recalcular o cubo de {key[0]} por {list(key[2])}: {str(e)}")
+    finally:
+        cache.refreshing.pop(key, None)
+
+# Ordena as células: dimensões agrupadas primeiro (mais detalhadas), depois pelos valores, com nulos por último
+def cell_order(dimensions):
+    def key(cell):
+        grouped, values, _ = cell
+        return [dimension not in grouped for dimension in dimensions], [(value is None, value) for value in values]
+    return key
+
+# Cubo multidimensional
+@router.get("/", description="Agrega um conjunto de dados por todas as combinações das dimensões (GROUP BY CUBE), com métricas e filtros", dependencies=[Depends(admit("charts"))])
+async def cube(
+    dataset: Literal["contracts", "agreements"],
+    dimensions: list[str] = Query([], description="Dimensões: coluna, ano:coluna_data ou mes:coluna_data"),
+    measures: list[str] = Query(["count"], description="Métricas: count ou sum/avg/min/max/count/count_distinct:coluna"),
+    filter: list[str] = Query([], description="Filtros: coluna:operador:valor (eq, ne, gt, gte, lt, lte, like)"),
+    rollup: Literal["cube", "none"] = Query("cube", description="cube: todos os subtotais; none: apenas o agrupamento por todas as dimensões"),
+    limit: int = Query(10_000, gt=0, le=100_000),
+    refresh: bool = Query(False, description="Ignora o cache e recalcula o cubo"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    config = get_cube_config()
+    if len(set(dimensions)) != len(dimensions) or len(set(measures)) != len(measures):
+        raise HTTPException(status_code=400, detail="Dimensões e métricas não podem se repetir")
+    if len(dimensions) > config["max_dimensions"]:
+        raise HTTPException(status_code=400, detail=f"O cubo aceita no máximo {config['max_dimensions']} dimensões")
+
+    # Valida os parâmetros e obtém os nomes das colunas do resultado
+    columns = dataset_columns(dataset)
+    dimension_labels = [group_expression(columns, spec).name for spec in dimensions]
+    measure_labels = [metric_expression(columns, spec).name for spec in measures]
+    for spec in filter:
+        filter_expression(columns, spec)
+
+    cache = get_cube_cache()
+    filters = tuple(sorted(filter))
+    key = (dataset, filters, tuple(sorted(dimensions)), tuple(sorted(measures)))
+    entry, fresh = (None, False) if refresh else cache.find(dataset, filters, dimensions, measures)
+
+    try:
+        if entry is not None and not fresh and cache.is_hot(entry.key):
+            # Cubo muito pedido: responde com o resultado anterior e recalcula em segundo plano
+            cache.count_stale_hit()
+            if entry.key not in cache.refreshing:
+                cache.refreshing[entry.key] = asyncio.create_task(refresh_cube(entry.key))
+            cached = "stale"
+        elif entry is None or not fresh:
+            entry = await compute_cube(db, key if entry is None else entry.key)
+            cached = "miss"
+        else:
+            cached = "hit"
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao calcular o cubo de {dataset}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao calcular o cubo. Erro: {str(e)}")
+
+    cells = sorted(entry.cells(dimensions, measures, rollup == "cube"), key=cell_order(dimensions))
+    labels = dict(zip(dimensions, dimension_labels))
+    return {
+        "engine": "duckdb" if analytics_enabled() else "database",
+        "cache": cached,
+        "dimensions": dimension_labels,
+        "measures": measure_labels,
+        "total_cells": len(cells),
+        "cells": [
+            {
+                **dict(zip(dimension_labels, values)),
+                **dict(zip(measure_labels, measured)),
+                "grouping": [labels[dimension] for dimension in grouped],
+            }
+            for grouped, values, measured in cells[:limit]
+        ],
+    }
+
+# Situação do cache de cubos (acertos e cubos mais pedidos)
+@router.get("/stats", description="Exibe a situação do cache de cubos e os cubos mais pedidos")
+def cube_stats():
+    return get_cube_cache().stats()
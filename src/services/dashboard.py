@@ -0,0 +1,204 @@
+import asyncio
+import base64
+import hashlib
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import literal, tuple_, union_all
+from sqlmodel import extract, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.sql import func
+from database import get_read_db
+from models.administrative_process import AdministrativeProcess
+from models.agreement_dates import AgreementDates
+from models.agreement_values import AgreementValues
+from models.contract_dates import ContractDates
+from models.contract_values import ContractValues
+from services import administrative_processes, agreements, contracts
+from utils.admission import admit
+from utils.analytics_engine import analytics_dialect, analytics_exec
+from utils.column_store import column_store_enabled, get_column_store
+from utils.executors import run_in_executor
+from utils.render_chart import MEDIA_TYPES, ChartFormat, chart_data, chart_key, etag_matches, render_image
+
+# Criar roteador
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+'''
+Ano de assinatura de cada contrato, compartilhado pelas consultas de valores e de processos
+'''
+def contract_years_cte():
+    return (
+        select(ContractDates.contract_id, func.min(extract('year', ContractDates.data_de_assinatura)).label("ano"))
+        .group_by(ContractDates.contract_id)
+        .cte("contract_years")
+    )
+
+'''
+Médias anuais dos valores de contratos (uma única consulta para os dois gráficos anuais).
+Junção externa, com os contratos sem ano descartados no HAVING: com a junção interna (ou com o filtro
+no WHERE, que a torna interna) o SQLite varre contract_values para cada linha da CTE; com a externa ele
+cria um índice automático na CTE, como em process_counts.
+'''
+async def contract_yearly_values(db: AsyncSession, contract_years):
+    stmt = (
+        select(contract_years.c.ano,
+               func.avg(ContractValues.valor_pago),
+               func.avg(ContractValues.valor_original),
+               func.avg(ContractValues.valor_atualizado))
+        .select_from(ContractValues)
+        .outerjoin(contract_years, contract_years.c.contract_id == ContractValues.contract_id)
+        .group_by(contract_years.c.ano)
+        .having(contract_years.c.ano.is_not(None))
+        .order_by(contract_years.c.ano)
+    )
+    return await analytics_exec(db, stmt)
+
+'''
+Contagens dos processos por modalidade, situação física, status e ano em uma única consulta.
+No PostgreSQL e no DuckDB usa GROUPING SETS (uma só varredura); nos demais bancos, UNION ALL.
+'''
+async def process_counts(db: AsyncSession, contract_years):
+    dimensions = {
+        "modalidade": AdministrativeProcess.modalidade_de_licitacao,
+        "situacao": AdministrativeProcess.situacao_fisica,
+        "status": AdministrativeProcess.status_do_instrumento,
+        "ano": contract_years.c.ano,
+    }
+    counts = {name: [] for name in dimensions}
+
+    if analytics_dialect(db) in ("postgresql", "duckdb"):
+        columns = list(dimensions.values())
+        stmt = (
+            select(*[func.grouping(column) for column in columns], *columns, func.count())
+            .select_from(AdministrativeProcess)
+            .outerjoin(contract_years, contract_years.c.contract_id == AdministrativeProcess.contract_id)
+            .group_by(func.grouping_sets(*[tuple_(column) for column in columns]))
+        )
+        for row in await analytics_exec(db, stmt):
+            flags, values, count = row[:4], row[4:8], row[8]
+            # A dimensão do conjunto é a única coluna não agregada (grouping = 0)
+            index = flags.index(0)
+            counts[list(dimensions)[index]].append((values[index], count))
+    else:
+        stmt = union_all(*[
+            select(literal(name).label("dimensao"), column.label("valor"), func.count().label("contagem"))
+            .select_from(AdministrativeProcess)
+            .outerjoin(contract_years, contract_years.c.contract_id == AdministrativeProcess.contract_id)
+            .group_by(column)
+            for name, column in dimensions.items()
+        ])
+        for name, value, count in await analytics_exec(db, stmt):
+            counts[name].append((value, count))
+
+    # A ordem das linhas depende do banco e do plano: ordena pelo valor (nulos por último), como o armazenamento colunar
+    return {name: sorted(rows, key=lambda row: (row[0] is None, row[0])) for name, rows in counts.items()}
+
+'''
+Somas anuais dos valores de convênios (uma única consulta para os dois gráficos de convênios)
+'''
+async def agreement_yearly_values(db: AsyncSession):
+    ano = extract('year', AgreementDates.data_assinatura).label('ano')
+    stmt = (
+        select(ano,
+               func.sum(AgreementValues.valor_inicial_total),
+               func.sum(AgreementValues.valor_atualizado_total),
+               func.sum(AgreementValues.valor_pago))
+        .join(AgreementDates, AgreementDates.agreement_id == AgreementValues.agreement_id)
+        .where(AgreementDates.data_assinatura.is_not(None))
+        .group_by('ano')
+        .order_by('ano')
+    )
+    return await analytics_exec(db, stmt)
+
+'''
+Os mesmos agregados calculados no armazenamento colunar em memória (utils/column_store.py)
+'''
+async def column_store_aggregates():
+    store = get_column_store()
+    if store.needs_check():
+        await run_in_executor("analytics", store.refresh)
+
+    contract_rows = [
+        row for row in store.aggregate("contract_values", ["ano"], [("avg", "valor_pago"), ("avg", "valor_original"), ("avg", "valor_atualizado")])
+        if row[0] is not None
+    ]
+    process_rows = {
+        name: store.aggregate("administrative_processes", [dimension], [("count", None)])
+        for name, dimension in [("modalidade", "modalidade_de_licitacao"), ("situacao", "situacao_fisica"), ("status", "status_do_instrumento"), ("ano", "ano")]
+    }
+    agreement_rows = [
+        row for row in store.aggregate("agreement_values", ["ano"], [("sum", "valor_inicial_total"), ("sum", "valor_atualizado_total"), ("sum", "valor_pago")])
+        if row[0] is not None
+    ]
+    return contract_rows, process_rows, agreement_rows
+
+'''
+Reúne as séries de todos os gráficos do painel: (nome, série, desenho, especificação, tamanho)
+'''
+async def dashboard_charts(db: AsyncSession):
+    if column_store_enabled():
+        contract_rows, process_rows, agreement_rows = await column_store_aggregates()
+    else:
+        contract_years = contract_years_cte()
+        contract_rows = await contract_yearly_values(db, contract_years)
+        process_rows = await process_counts(db, contract_years)
+        agreement_rows = await agreement_yearly_values(db)
+
+    by_count = lambda rows: sorted(rows, key=lambda row: row[1], reverse=True)
+    years = sorted((ano, count) for ano, count in process_rows["ano"] if ano is not None)
+    charts = []
+
+    if process_rows["modalidade"]:
+        charts.append(("contracts/distribution-modality", contracts.serie_distribuicao_modalidade(by_count(process_rows["modalidade"])),
+                       contracts.grafico_distribuicao_modalidade, contracts.SPEC_DISTRIBUICAO_MODALIDADE, (8, 8)))
+    if contract_rows:
+        charts.append(("contracts/contract-payment-evolution", contracts.serie_evolucao_valor_pago([(row[0], row[1]) for row in contract_rows]),
+                       contracts.grafico_evolucao_valor_pago, contracts.SPEC_EVOLUCAO_VALOR_PAGO, (10, 6)))
+        charts.append(("contracts/contract-values-comparison", contracts.serie_comparacao_valores([(row[0], row[2], row[3]) for row in contract_rows]),
+                       contracts.grafico_comparacao_valores, contracts.SPEC_COMPARACAO_VALORES, (10, 6)))
+    if process_rows["situacao"]:
+        charts.append(("contracts/regularized-contracts", contracts.serie_situacao_fisica(by_count(process_rows["situacao"])),
+                       contracts.grafico_situacao_fisica, contracts.SPEC_SITUACAO_FISICA, (8, 8)))
+    if agreement_rows:
+        charts.append(("agreements/comparison-original-updated", agreements.serie_comparacao_valores([(row[0], row[1], row[2]) for row in agreement_rows]),
+                       agreements.grafico_comparacao_valores, agreements.SPEC_COMPARACAO_VALORES, (12, 6)))
+        charts.append(("agreements/evolution-value-paid", agreements.serie_evolucao_valor_pago([(row[0], row[3]) for row in agreement_rows]),
+                       agreements.grafico_evolucao_valor_pago, agreements.SPEC_EVOLUCAO_VALOR_PAGO, (12, 6)))
+
+    charts.append(("administrative_processes/chart/status", administrative_processes.serie_categorias(process_rows["status"]),
+                   administrative_processes.grafico_status, administrative_processes.SPEC_STATUS, (6, 6)))
+    charts.append(("administrative_processes/chart/evolution", administrative_processes.serie_evolucao(years),
+                   administrative_processes.grafico_evolucao, administrative_processes.SPEC_EVOLUCAO, (8, 5)))
+    charts.append(("administrative_processes/chart/modalidade", administrative_processes.serie_categorias(process_rows["modalidade"]),
+                   administrative_processes.grafico_modalidade, administrative_processes.SPEC_MODALIDADE, (10, 5)))
+    return charts
+
+# Renderiza um gráfico do painel e o codifica em base64
+def render_encoded(name, series, draw, figsize, format):
+    content = render_image(name, series, draw, figsize=figsize, format=format)
+    return {"media_type": MEDIA_TYPES[format], "content": base64.b64encode(content).decode("ascii")}
+
+# Painel com todos os gráficos em uma única resposta
+@router.get("/", description="Retorna todos os gráficos do painel em uma única resposta", dependencies=[Depends(admit("charts"))])
+async def get_dashboard(request: Request, format: ChartFormat = Query(default="json", description="Formato dos gráficos: json, png ou svg"), db: AsyncSession = Depends(get_read_db)):
+    charts = await dashboard_charts(db)
+
+    # ETag do painel derivado das chaves de cada gráfico
+    keys = "".join(chart_key(name, series, figsize, format, 100) for name, series, _, _, figsize in charts)
+    etag = f'"{hashlib.sha256(keys.encode("utf-8")).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    if format == "json":
+        content = {name: chart_data(name, series, spec) for name, series, _, spec, _ in charts}
+    else:
+        # Renderização em paralelo no executor de gráficos, separado do threadpool das rotas leves
+        images = await asyncio.gather(*[
+            run_in_executor("charts", render_encoded, name, series, draw, figsize, format)
+            for name, series, draw, _, figsize in charts
+        ])
+        content = {chart[0]: image for chart, image in zip(charts, images)}
+
+    return JSONResponse(content={"charts": content}, headers=headers)
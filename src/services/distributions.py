@@ -0,0 +1,137 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.sql import func
+from database import get_read_db
+from models import *
+from utils.admission import admit
+from utils.after_ingestion import refresh_if_outdated
+from utils.executors import run_in_executor
+from utils.quantile_sketch import QuantileSketch
+from utils.value_sketches import SKETCH_COLUMNS, SOURCES, update_value_sketches
+from services.configs import analytics_logger as logger
+
+# Criar roteador
+router = APIRouter(prefix="/distributions", tags=["Distributions"])
+
+Dataset = Literal["contracts", "agreements"]
+GroupBy = Literal["total", "ano", "modalidade"]
+
+'''
+Os sketches são atualizados após cada ingestão; se alguma tabela de valores tem ids além do último
+processado, a leitura usa os sketches gravados e a atualização é agendada em segundo plano
+'''
+async def check_sketches(db: AsyncSession):
+    if await refresh_if_outdated(db, "value_sketches", [model for model, _ in SOURCES.values()], "sketches de quantis", update_value_sketches):
+        logger.info("sketches de quantis desatualizados: atualização agendada em segundo plano")
+
+'''
+Combina os sketches das partições de uma coluna pelo agrupamento pedido (total, ano ou modalidade),
+opcionalmente restritos a um ano e/ou a uma modalidade. O custo depende do número de partições,
+não do número de linhas.
+'''
+async def grouped_sketches(db, dataset, coluna, by, ano, modalidade):
+    if coluna not in SKETCH_COLUMNS[dataset]:
+        raise HTTPException(status_code=400, detail=f"Coluna '{coluna}' sem sketch. Colunas disponíveis: {', '.join(SKETCH_COLUMNS[dataset])}")
+    if dataset == "agreements" and (by == "modalidade" or modalidade is not None):
+        raise HTTPException(status_code=400, detail="Convênios não têm modalidade de licitação")
+
+    await check_sketches(db)
+    stmt = select(ValueSketch).where(ValueSketch.dataset == dataset, ValueSketch.coluna == coluna)
+    if ano is not None:
+        stmt = stmt.where(ValueSketch.ano == ano)
+    if modalidade is not None:
+        stmt = stmt.where(ValueSketch.modalidade == modalidade)
+
+    groups = {}
+    for record in (await db.exec(stmt)).all():
+        key = None if by == "total" else getattr(record, by)
+        sketch = QuantileSketch.from_json(record.sketch)
+        groups[key] = groups[key].merge(sketch) if key in groups else sketch
+    return sorted(groups.items(), key=lambda item: (item[0] is None, item[0]))
+
+# Nome de um quantil na resposta (ex.: 0.5 -> p50, 0.999 -> p99.9)
+def quantile_label(quantile):
+    return f"p{quantile * 100:g}"
+
+# Quantis dos valores
+@router.get("/{dataset}/{coluna}/quantiles", description="Mediana e percentis de uma coluna de valores, no total, por ano ou por modalidade", dependencies=[Depends(admit("charts"))])
+async def value_quantiles(
+    dataset: Dataset,
+    coluna: str,
+    by: GroupBy = Query("total", description="Agrupamento: total, ano ou modalidade (apenas contratos)"),
+    q: list[float] = Query([0.5, 0.9, 0.99], description="Quantis entre 0 e 1"),
+    ano: Optional[int] = None,
+    modalidade: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    if any(quantile < 0 or quantile > 1 for quantile in q):
+        raise HTTPException(status_code=400, detail="Os quantis devem estar entre 0 e 1")
+
+    groups = await grouped_sketches(db, dataset, coluna, by, ano, modalidade)
+    return {
+        "dataset": dataset,
+        "coluna": coluna,
+        "by": by,
+        "erro_relativo": groups[0][1].alpha if groups else None,
+        "grupos": [
+            {
+                **({} if by == "total" else {by: key}),
+                "quantidade": sketch.count,
+                "media": sketch.sum / sketch.count if sketch.count else None,
+                "minimo": sketch.min,
+                "maximo": sketch.max,
+                "quantis": dict(zip(map(quantile_label, q), sketch.quantiles(q))),
+            }
+            for key, sketch in groups
+        ],
+    }
+
+# Histograma em escala logarítmica dos valores
+@router.get("/{dataset}/{coluna}/histogram", description="Histograma em escala logarítmica de uma coluna de valores, no total, por ano ou por modalidade", dependencies=[Depends(admit("charts"))])
+async def value_histogram(
+    dataset: Dataset,
+    coluna: str,
+    by: GroupBy = Query("total", description="Agrupamento: total, ano ou modalidade (apenas contratos)"),
+    bins_per_decade: int = Query(1, ge=1, le=10, description="Faixas por potência de 10"),
+    ano: Optional[int] = None,
+    modalidade: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    groups = await grouped_sketches(db, dataset, coluna, by, ano, modalidade)
+    return {
+        "dataset": dataset,
+        "coluna": coluna,
+        "by": by,
+        "grupos": [
+            {
+                **({} if by == "total" else {by: key}),
+                "quantidade": sketch.count,
+                "faixas": [{"de": lower, "ate": upper, "quantidade": count} for lower, upper, count in sketch.histogram(bins_per_decade)],
+            }
+            for key, sketch in groups
+        ],
+    }
+
+# Situação dos sketches (último id processado de cada tabela e partições)
+@router.get("/status", description="Exibe a situação dos sketches de quantis")
+async def sketches_status(db: AsyncSession = Depends(get_read_db)):
+    states = (await db.exec(select(SummaryState).where(SummaryState.name == "value_sketches"))).all()
+    partitions = (await db.exec(select(ValueSketch.dataset, func.count(ValueSketch.id)).group_by(ValueSketch.dataset))).all()
+    return {
+        "tabelas": {state.source: {"ultimo_id": state.last_id, "linhas": state.row_count, "atualizado_em": state.updated_at} for state in states},
+        "particoes": dict(partitions),
+    }
+
+# Reconstrução dos sketches (necessária após edições de valores)
+@router.post("/rebuild", description="Reconstrói os sketches de quantis a partir das tabelas de valores", dependencies=[Depends(admit("ingestion"))])
+async def rebuild_sketches():
+    try:
+        summary = await run_in_executor("analytics", update_value_sketches, full=True)
+    except Exception as e:
+        logger.error(f"Erro ao reconstruir os sketches de quantis: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao reconstruir os sketches de quantis. Erro: {str(e)}")
+
+    logger.info(f"sketches de quantis reconstruídos: {summary}")
+    return summary
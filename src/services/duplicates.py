@@ -0,0 +1,153 @@
+from math import ceil
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.sql import func
+from database import get_read_db
+from models import *
+from utils.admission import admit
+from utils.after_ingestion import after_ingestion, refresh_if_outdated
+from utils.duplicates import SOURCES, merge_duplicates, repeated_keys, update_duplicates
+from utils.executors import run_in_executor
+from services.configs import analytics_logger as logger
+
+# Criar roteador
+router = APIRouter(prefix="/duplicates", tags=["Duplicates"])
+
+Dataset = Literal["contracts", "agreements"]
+ClusterType = Literal["exato", "similar"]
+
+# Responde com os grupos gravados; se contratos ou convênios têm registros ainda não processados, agenda a atualização em segundo plano
+async def check_fingerprints(db: AsyncSession):
+    if await refresh_if_outdated(db, "duplicates", [model for model, _, _, _ in SOURCES.values()], "índice de duplicatas", update_duplicates):
+        logger.info("índice de duplicatas desatualizado: atualização agendada em segundo plano")
+
+# Grupos de registros com a mesma chave natural, lidos pelo índice (dataset, chave): [(id do grupo, chave, tamanho)] e total
+async def exact_clusters(db, dataset, offset, limit):
+    size = func.count().label("tamanho")
+    first = func.min(RecordFingerprint.record_id).label("cluster")
+    stmt = (
+        select(first, RecordFingerprint.chave, size)
+        .where(RecordFingerprint.dataset == dataset, RecordFingerprint.chave.is_not(None))
+        .group_by(RecordFingerprint.chave).having(func.count() > 1)
+        .order_by(size.desc(), first)
+        .offset(offset).limit(limit)
+    )
+    total = (await db.exec(select(func.count()).select_from(repeated_keys(dataset)))).one()
+    return (await db.exec(stmt)).all(), total
+
+# Grupos de duplicatas e quase duplicatas (coluna cluster): [(id do grupo, id do grupo, tamanho)] e total
+async def similar_clusters(db, dataset, offset, limit):
+    size = func.count().label("tamanho")
+    filters = [RecordFingerprint.dataset == dataset, RecordFingerprint.cluster.is_not(None)]
+    stmt = (
+        select(RecordFingerprint.cluster, RecordFingerprint.cluster, size)
+        .where(*filters)
+        .group_by(RecordFingerprint.cluster)
+        .order_by(size.desc(), RecordFingerprint.cluster)
+        .offset(offset).limit(limit)
+    )
+    total = (await db.exec(select(func.count(func.distinct(RecordFingerprint.cluster))).where(*filters))).one()
+    return (await db.exec(stmt)).all(), total
+
+# Grupos de duplicatas, dos maiores para os menores, com os registros de cada grupo
+@router.get("/{dataset}/clusters", description="Lista os grupos de contratos ou convênios duplicados (mesma chave natural) ou quase duplicados (nome e objeto similares)", dependencies=[Depends(admit("listing"))])
+async def list_clusters(
+    dataset: Dataset,
+    db: AsyncSession = Depends(get_read_db),
+    page: Optional[int] = Query(default=1, ge=1, description="Página de grupos"),
+    limit: Optional[int] = Query(default=20, ge=1, le=100, description="Quantidade de grupos a serem retornados"),
+    tipo: ClusterType = Query(default="similar", description="exato: mesma chave natural; similar: nome e objeto similares ou mesma chave natural"),
+):
+    try:
+        await check_fingerprints(db)
+        model, _, _, _ = SOURCES[dataset]
+        clusters, total_clusters = await (exact_clusters if tipo == "exato" else similar_clusters)(db, dataset, (page - 1) * limit, limit)
+
+        members = {}
+        if clusters:
+            group = RecordFingerprint.chave if tipo == "exato" else RecordFingerprint.cluster
+            ids = {key: cluster for cluster, key, _ in clusters}
+            stmt = (
+                select(RecordFingerprint, model)
+                .join(model, model.id == RecordFingerprint.record_id)
+                .where(RecordFingerprint.dataset == dataset, group.in_(list(ids)))
+                .order_by(RecordFingerprint.record_id)
+            )
+            for fingerprint, record in (await db.exec(stmt)).all():
+                cluster = ids[getattr(fingerprint, group.key)]
+                members.setdefault(cluster, []).append({**record.model_dump(), "similaridade": 1.0 if tipo == "exato" else fingerprint.similaridade})
+
+        total_pages = ceil(total_clusters / limit)
+        logger.info(f"{total_clusters} grupos de duplicatas de {dataset} ({tipo}) encontrados")
+
+        return {
+            "message": "Grupos de duplicatas encontrados com sucesso",
+            "data": [
+                {"cluster": cluster, "tipo": tipo, "tamanho": tamanho, "registros": members.get(cluster, [])}
+                for cluster, _, tamanho in clusters
+            ],
+            "page": page,
+            "limit": limit,
+            "total_clusters": total_clusters,
+            "total_pages": total_pages
+        }
+
+    except Exception as e:
+        logger.error(f"Erro ao listar duplicatas de {dataset}: {str(e)}")
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Erro ao listar duplicatas")
+
+# Situação das impressões digitais (último id processado de cada tabela e grupos encontrados)
+@router.get("/status", description="Exibe a situação do índice de duplicatas")
+async def duplicates_status(db: AsyncSession = Depends(get_read_db)):
+    states = (await db.exec(select(SummaryState).where(SummaryState.name == "duplicates"))).all()
+    groups = {}
+    for dataset in SOURCES:
+        _, exact = await exact_clusters(db, dataset, 0, 0)
+        _, similar = await similar_clusters(db, dataset, 0, 0)
+        groups[dataset] = {"exato": exact, "similar": similar}
+    return {
+        "tabelas": {state.source: {"ultimo_id": state.last_id, "linhas": state.row_count, "atualizado_em": state.updated_at} for state in states},
+        "grupos": groups,
+    }
+
+'''
+Mescla os grupos de duplicatas no registro de menor id de cada grupo. Sem clusters, mescla todos os grupos
+exatos (mesma chave natural); grupos similares só são mesclados quando escolhidos, pois nome e objeto
+parecidos não garantem que os registros sejam o mesmo contrato ou convênio.
+'''
+@router.post("/{dataset}/merge", description="Mescla os grupos de duplicatas, mantendo o registro de menor id de cada grupo", dependencies=[Depends(admit("ingestion"))])
+async def merge_clusters(
+    dataset: Dataset,
+    tipo: ClusterType = Query(default="exato", description="exato: apenas grupos com a mesma chave natural; similar: também os quase duplicados"),
+    cluster: Optional[List[int]] = Query(default=None, description="Grupos a mesclar (todos, se omitido)"),
+):
+    if tipo == "similar" and not cluster:
+        raise HTTPException(status_code=400, detail="Informe os grupos similares a mesclar (parâmetro cluster)")
+
+    try:
+        await run_in_executor("analytics", update_duplicates)
+        summary = await run_in_executor("ingestion", merge_duplicates, dataset, tipo, cluster)
+    except Exception as e:
+        logger.error(f"Erro ao mesclar duplicatas de {dataset}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao mesclar duplicatas. Erro: {str(e)}")
+
+    # Registros removidos: os resumos derivados das tabelas são reconstruídos
+    if summary["removidos"]:
+        after_ingestion()
+    logger.info(f"duplicatas mescladas: {summary}")
+    return summary
+
+# Reconstrução do índice (necessária após edições de chaves, nomes ou objetos)
+@router.post("/rebuild", description="Reconstrói o índice de duplicatas", dependencies=[Depends(admit("ingestion"))])
+async def rebuild_fingerprints():
+    try:
+        summary = await run_in_executor("analytics", update_duplicates, full=True)
+    except Exception as e:
+        logger.error(f"Erro ao reconstruir o índice de duplicatas: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao reconstruir o índice de duplicatas. Erro: {str(e)}")
+
+    logger.info(f"índice de duplicatas reconstruído: {summary}")
+    return summary
@@ -0,0 +1,97 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from database import get_async_session_factory, get_replica_router
+from utils.admission import get_limiter
+from utils.arrow_export import EXPORT_TABLES, arrow_schema, arrow_writer, ChunkSink, close_writer, get_export_config, parquet_writer, stream_rows, write_rows
+from utils.executors import run_in_executor
+from services.configs import export_logger as logger
+
+# Criar roteador
+router = APIRouter(prefix="/export", tags=["Export"])
+
+# Tipos de mídia de cada formato
+MEDIA_TYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+'''
+Resposta em partes que devolve a vaga de admissão quando termina de qualquer forma: envio completo, erro,
+desconexão do cliente ou cancelamento antes da primeira parte (o finally do gerador só roda se ele chegou a começar)
+'''
+class AdmittedStreamingResponse(StreamingResponse):
+    def __init__(self, limiter, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.limiter.release()
+
+'''
+Exporta uma tabela inteira em formato colunar, em partes: as linhas são lidas em lotes por um cursor
+no servidor, convertidas em RecordBatches no executor "export" e enviadas à medida que são escritas.
+A vaga de admissão é mantida até o fim do envio (a resposta continua após o retorno da rota) e devolvida pela resposta.
+'''
+async def export_table(table_name, format, compression, batch_size):
+    table = EXPORT_TABLES.get(table_name)
+    if table is None:
+        raise HTTPException(status_code=404, detail=f"Tabela '{table_name}' não encontrada. Tabelas disponíveis: {', '.join(EXPORT_TABLES)}")
+
+    config = get_export_config()
+    batch_size = batch_size or config["batch_size"]
+    compression = compression or config[f"{format}_compression"]
+    create_writer = parquet_writer if format == "parquet" else arrow_writer
+    schema = arrow_schema(table)
+
+    limiter = get_limiter("export")
+    await limiter.acquire()
+
+    async def content():
+        rows_sent = 0
+        try:
+            sink = ChunkSink()
+            writer = create_writer(sink, schema, compression)
+            session_factory = await get_replica_router().pick() or get_async_session_factory()
+            async with session_factory() as session:
+                async for rows in stream_rows(session, table, batch_size):
+                    yield await run_in_executor("export", write_rows, writer, sink, rows, schema)
+                    rows_sent += len(rows)
+            yield await run_in_executor("export", close_writer, writer, sink)
+            logger.info(f"exportando {rows_sent} linhas de {table_name} em {format} ({compression})")
+        except Exception as e:
+            # O status 200 já foi enviado: o erro interrompe a resposta, que chega incompleta ao cliente
+            logger.error(f"Erro ao exportar {table_name} em {format} após {rows_sent} linhas: {str(e)}")
+            raise
+
+    try:
+        return AdmittedStreamingResponse(
+            limiter,
+            content(),
+            media_type=MEDIA_TYPES[format],
+            headers={"Content-Disposition": f'attachment; filename="{table_name}.{format}"'},
+        )
+    except Exception:
+        limiter.release()
+        raise
+
+# Exportar tabela em Parquet
+@router.get("/{table}.parquet", description="Exporta uma tabela inteira em Parquet (um row group por lote)")
+async def export_parquet(
+    table: str,
+    compression: Optional[Literal["zstd", "snappy", "gzip", "lz4", "none"]] = None,
+    batch_size: Optional[int] = Query(None, gt=0, le=1_000_000),
+):
+    return await export_table(table, "parquet", compression, batch_size)
+
+# Exportar tabela no formato de streaming do Arrow IPC
+@router.get("/{table}.arrow", description="Exporta uma tabela inteira no formato de streaming do Arrow IPC")
+async def export_arrow(
+    table: str,
+    compression: Optional[Literal["zstd", "lz4", "none"]] = None,
+    batch_size: Optional[int] = Query(None, gt=0, le=1_000_000),
+):
+    return await export_table(table, "arrow", compression, batch_size)
@@ -0,0 +1,124 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.sql import func
+from database import get_read_db
+from models import *
+from utils.admission import admit
+from utils.after_ingestion import refresh_if_outdated
+from utils.executors import run_in_executor
+from utils.supplier_totals import SOURCES, scope_name, update_supplier_totals
+from services.configs import analytics_logger as logger
+
+# Criar roteador
+router = APIRouter(prefix="/suppliers", tags=["Suppliers"])
+
+Dataset = Literal["contracts", "agreements"]
+Measure = Literal["valor_pago", "valor_atualizado"]
+
+# Responde com os totais gravados; se alguma tabela de valores tem linhas ainda não processadas, agenda a atualização em segundo plano
+async def check_totals(db: AsyncSession):
+    if await refresh_if_outdated(db, "supplier_totals", [model for model, _ in SOURCES.values()], "totais por fornecedor", update_supplier_totals):
+        logger.info("totais por fornecedor desatualizados: atualização agendada em segundo plano")
+
+'''
+Totais de um escopo: todos os anos ou um ano, todos os contratantes ou um contratante (concedente, nos convênios).
+Cada escopo tem as próprias linhas na tabela pré-agregada, lidas pelos índices (dataset, escopo, ano, contratante, valor).
+'''
+def scope_filter(dataset, ano, contratante):
+    return (
+        SupplierTotal.dataset == dataset,
+        SupplierTotal.escopo == scope_name(ano is not None, contratante is not None),
+        SupplierTotal.ano == ano,
+        SupplierTotal.contratante == contratante,
+    )
+
+def supplier_entry(total, measure, amount):
+    return {
+        "entidade": total.entidade,
+        "documento": total.documento,
+        "quantidade": total.quantidade,
+        "valor_pago": total.valor_pago,
+        "valor_atualizado": total.valor_atualizado,
+        "participacao": getattr(total, measure) / amount if amount else None,
+    }
+
+# Maiores fornecedores (contratados) ou convenentes
+@router.get("/{dataset}/top", description="Fornecedores (contratados) ou convenentes que mais receberam, por ano e/ou contratante (concedente)", dependencies=[Depends(admit("charts"))])
+async def top_suppliers(
+    dataset: Dataset,
+    ano: Optional[int] = None,
+    contratante: Optional[str] = Query(None, description="Contratante do contrato ou concedente do convênio"),
+    k: int = Query(10, ge=1, le=1000),
+    order_by: Measure = "valor_pago",
+    db: AsyncSession = Depends(get_read_db),
+):
+    await check_totals(db)
+    filters = scope_filter(dataset, ano, contratante)
+    measure = getattr(SupplierTotal, order_by)
+    top = (await db.exec(select(SupplierTotal).where(*filters).order_by(measure.desc()).limit(k))).all()
+    amount = (await db.exec(select(func.sum(measure)).where(*filters))).one()
+
+    logger.info(f"top {k} de {dataset} por {order_by} (ano={ano}, contratante={contratante})")
+    return {
+        "dataset": dataset,
+        "ano": ano,
+        "contratante": contratante,
+        "order_by": order_by,
+        "total": amount,
+        "fornecedores": [supplier_entry(total, order_by, amount) for total in top],
+    }
+
+'''
+Concentração dos valores entre os fornecedores: índice Herfindahl-Hirschman (HHI, soma dos quadrados
+das participações em pontos percentuais, de 0 a 10.000) e participação dos 10 maiores
+'''
+@router.get("/{dataset}/concentration", description="Concentração dos valores recebidos (HHI e participação dos 10 maiores), por ano e/ou contratante (concedente)", dependencies=[Depends(admit("charts"))])
+async def supplier_concentration(
+    dataset: Dataset,
+    ano: Optional[int] = None,
+    contratante: Optional[str] = Query(None, description="Contratante do contrato ou concedente do convênio"),
+    measure: Measure = "valor_pago",
+    db: AsyncSession = Depends(get_read_db),
+):
+    await check_totals(db)
+    filters = scope_filter(dataset, ano, contratante)
+    column = getattr(SupplierTotal, measure)
+    entities, amount, squares = (await db.exec(select(func.count(), func.sum(column), func.sum(column * column)).where(*filters))).one()
+    top = (await db.exec(select(SupplierTotal).where(*filters).order_by(column.desc()).limit(10))).all()
+    top_amount = sum(getattr(total, measure) for total in top)
+
+    return {
+        "dataset": dataset,
+        "ano": ano,
+        "contratante": contratante,
+        "measure": measure,
+        "entidades": entities,
+        "total": amount,
+        "hhi": 10_000 * squares / amount ** 2 if amount else None,
+        "participacao_top10": top_amount / amount if amount else None,
+        "top10": [supplier_entry(total, measure, amount) for total in top],
+    }
+
+# Situação dos totais pré-agregados (último id processado de cada tabela)
+@router.get("/status", description="Exibe a situação dos totais pré-agregados por fornecedor")
+async def suppliers_status(db: AsyncSession = Depends(get_read_db)):
+    states = (await db.exec(select(SummaryState).where(SummaryState.name == "supplier_totals"))).all()
+    rows = (await db.exec(select(SupplierTotal.dataset, SupplierTotal.escopo, func.count(SupplierTotal.id)).group_by(SupplierTotal.dataset, SupplierTotal.escopo))).all()
+    return {
+        "tabelas": {state.source: {"ultimo_id": state.last_id, "linhas": state.row_count, "atualizado_em": state.updated_at} for state in states},
+        "linhas": {f"{dataset}:{escopo}": count for dataset, escopo, count in rows},
+    }
+
+# Reconstrução dos totais (necessária após edições de valores, nomes ou datas)
+@router.post("/rebuild", description="Reconstrói os totais pré-agregados por fornecedor", dependencies=[Depends(admit("ingestion"))])
+async def rebuild_totals():
+    try:
+        summary = await run_in_executor("analytics", update_supplier_totals, full=True)
+    except Exception as e:
+        logger.error(f"Erro ao reconstruir os totais por fornecedor: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao reconstruir os totais por fornecedor. Erro: {str(e)}")
+
+    logger.info(f"totais por fornecedor reconstruídos: {summary}")
+    return summary
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+from fastapi import HTTPException
+from utils.load_config import load_config
+
+'''
+Limites padrão de cada classe de rota (sobrescritos pela seção admission do config.yaml):
+- max_concurrent: requisições executando ao mesmo tempo
+- max_queue: requisições aguardando uma vaga; acima disso a resposta é 429 imediatamente
+- queue_timeout: segundos máximos na fila antes de desistir com 429
+- retry_after: valor do cabeçalho Retry-After (segundos)
+'''
+DEFAULT_LIMITS = {
+    "ingestion": {"max_concurrent": 1, "max_queue": 0, "queue_timeout": 0, "retry_after": 60},
+    "listing": {"max_concurrent": 8, "max_queue": 32, "queue_timeout": 10, "retry_after": 5},
+    "charts": {"max_concurrent": 4, "max_queue": 16, "queue_timeout": 10, "retry_after": 5},
+    "export": {"max_concurrent": 2, "max_queue": 4, "queue_timeout": 30, "retry_after": 30},
+}
+
+'''
+Controle de admissão de uma classe de rota: semáforo de concorrência com fila limitada
+'''
+class AdmissionLimiter:
+    def __init__(self, name, max_concurrent, max_queue, queue_timeout, retry_after):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    def reject(self):
+        self.rejected += 1
+        return HTTPException(
+            status_code=429,
+            detail=f"Servidor ocupado com requisições do tipo '{self.name}', tente novamente mais tarde",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    async def acquire(self):
+        # Sem vaga livre e com a fila cheia, rejeita sem esperar
+        if self.semaphore.locked() and self.waiting >= self.max_queue:
+            raise self.reject()
+
+        self.waiting += 1
+        try:
+            if self.semaphore.locked():
+                await asyncio.wait_for(self.semaphore.acquire(), timeout=self.queue_timeout)
+            else:
+                await self.semaphore.acquire()
+        except asyncio.TimeoutError:
+            raise self.reject()
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        self.admitted += 1
+
+    def release(self):
+        self.active -= 1
+        self.semaphore.release()
+
+    def stats(self):
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+limiters = {}
+limiters_lock = threading.Lock()
+
+# Limitador da classe de rota, criado no primeiro uso a partir da configuração
+def get_limiter(name):
+    with limiters_lock:
+        if name not in limiters:
+            limits = {**DEFAULT_LIMITS.get(name, DEFAULT_LIMITS["listing"]), **load_config().get("admission", {}).get(name, {})}
+            limiters[name] = AdmissionLimiter(name, **limits)
+        return limiters[name]
+
+'''
+Dependência que reserva uma vaga da classe de rota durante a requisição.
+Uso: @router.get(..., dependencies=[Depends(admit("charts"))])
+'''
+def admit(name):
+    async def dependency():
+        limiter = get_limiter(name)
+        await limiter.acquire()
+        try:
+            yield
+        finally:
+            limiter.release()
+    return dependency
+
+# Estatísticas de todas as classes de rota já utilizadas
+def get_admission_stats():
+    with limiters_lock:
+        return {name: limiter.stats() for name, limiter in limiters.items()}
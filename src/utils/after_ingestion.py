@@ -0,0 +1,52 @@
+import logging
+import threading
+from utils.anomalies import update_contract_anomalies
+from utils.column_store import refresh_column_store_after_ingestion
+from utils.duplicates import update_duplicates
+from utils.executors import get_executor
+from utils.summaries import summary_outdated
+from utils.supplier_totals import update_supplier_totals
+from utils.value_sketches import update_value_sketches
+
+logger = logging.getLogger("analytics")
+
+# Atualizações na fila do executor que ainda não começaram (uma nova seria redundante: a da fila lê as linhas atuais)
+queued = set()
+queued_lock = threading.Lock()
+
+# Executa uma atualização em segundo plano, registrando os erros (o resultado não é aguardado)
+def submit(name, func):
+    with queued_lock:
+        if name in queued:
+            return
+        queued.add(name)
+
+    def run():
+        with queued_lock:
+            queued.discard(name)
+        try:
+            logger.info(f"{name} atualizado em segundo plano: {func()}")
+        except Exception as e:
+            logger.error(f"Erro ao atualizar {name} em segundo plano: {str(e)}")
+    get_executor("analytics").submit(run)
+
+'''
+Chamado pelas rotas de leitura dos resumos: se alguma tabela de origem tem ids além do último processado,
+agenda a atualização em segundo plano sem esperá-la (a leitura responde com o que está gravado).
+Retorna verdadeiro se o resumo está desatualizado.
+'''
+async def refresh_if_outdated(db, summary, models, name, func):
+    if await summary_outdated(db, summary, models):
+        submit(name, func)
+        return True
+    return False
+
+'''
+Chamado ao fim de cada ingestão (e da remoção em massa): atualiza os resumos derivados das tabelas
+'''
+def after_ingestion():
+    refresh_column_store_after_ingestion()
+    submit("sketches de quantis", update_value_sketches)
+    submit("totais por fornecedor", update_supplier_totals)
+    submit("anomalias de contratos", update_contract_anomalies)
+    submit("índice de duplicatas", update_duplicates)
@@ -0,0 +1,235 @@
+import os
+import shutil
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from functools import lru_cache
+from sqlalchemy.dialects import postgresql
+from sqlmodel import select
+from database import get_engine
+from utils.arrow_export import EXPORT_TABLES, arrow_schema, parquet_writer, rows_to_batch
+from utils.executors import get_executor, run_in_executor
+from utils.load_config import load_config
+
+# Tabelas copiadas para os snapshots em Parquet
+DEFAULT_TABLES = [
+    "contracts", "contract_values", "contract_dates", "administrative_processes",
+    "agreements", "agreement_values", "agreement_dates",
+]
+
+'''
+Configuração do motor analítico (seção analytics do config.yaml).
+engine: "database" (padrão, consultas no banco principal) ou "duckdb" (snapshots locais em Parquet).
+'''
+@lru_cache(maxsize=1)
+def get_analytics_config():
+    return {
+        "engine": "database",
+        "snapshot_dir": "snapshots",
+        "tables": DEFAULT_TABLES,
+        "refresh_interval": 3600,
+        "keep_snapshots": 2,
+        "batch_size": 50_000,
+        "threads": None,
+        "memory_limit": None,
+        **load_config().get("analytics", {}),
+    }
+
+def analytics_enabled():
+    return get_analytics_config()["engine"] == "duckdb"
+
+# Compila uma consulta do SQLAlchemy para o DuckDB (dialeto compatível com o do PostgreSQL)
+def compile_statement(statement):
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+'''
+Motor analítico embutido: copia as tabelas do banco para arquivos Parquet locais e executa as consultas
+analíticas no DuckDB, em processo, sobre views que leem esses arquivos. As consultas são vetorizadas e
+paralelas (threads do DuckDB) e não disputam o banco principal; os dados refletem o último snapshot.
+Cada snapshot é um diretório versionado (<snapshot_dir>/<versão>/<tabela>.parquet); o arquivo CURRENT
+aponta para a versão mais recente.
+'''
+class AnalyticsEngine:
+    def __init__(self, config):
+        import duckdb
+
+        self.config = config
+        self.connection = duckdb.connect(":memory:")
+        if config["threads"]:
+            self.connection.execute(f"SET threads = {int(config['threads'])}")
+        if config["memory_limit"]:
+            self.connection.execute("SET memory_limit = ?", [str(config["memory_limit"])])
+        self.refresh_lock = threading.RLock()
+        self.snapshot = None
+        self.refreshing = False
+
+    def path(self, version, table_name):
+        return os.path.join(self.config["snapshot_dir"], version, f"{table_name}.parquet")
+
+    # Copia uma tabela para Parquet em lotes (cursor no servidor), no diretório da versão em construção
+    def write_table(self, directory, table_name):
+        table = EXPORT_TABLES[table_name]
+        schema = arrow_schema(table)
+        batch_size = self.config["batch_size"]
+        rows_written = 0
+
+        writer = parquet_writer(os.path.join(directory, f"{table_name}.parquet"), schema, "zstd")
+        try:
+            with get_engine().connect() as conn:
+                result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(select(table))
+                for rows in result.partitions(batch_size):
+                    writer.write_batch(rows_to_batch(rows, schema))
+                    rows_written += len(rows)
+        finally:
+            writer.close()
+        return rows_written
+
+    '''
+    Aponta as views de todas as tabelas para uma versão em uma única transação do DuckDB: cada consulta
+    enxerga todas as tabelas da versão anterior ou todas da nova, nunca uma mistura das duas.
+    '''
+    def create_views(self, version):
+        with self.connection.cursor() as cursor:
+            cursor.execute("BEGIN TRANSACTION")
+            try:
+                for table_name in self.config["tables"]:
+                    path = self.path(version, table_name).replace("'", "''")
+                    cursor.execute(f"CREATE OR REPLACE VIEW \"{table_name}\" AS SELECT * FROM read_parquet('{path}')")
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+
+    def current(self):
+        try:
+            with open(os.path.join(self.config["snapshot_dir"], "CURRENT")) as file:
+                return file.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    '''
+    Remove as versões antigas: as deste processo além das keep_snapshots mais recentes (a anterior continua
+    disponível para as consultas que começaram antes da troca) e as de processos que já terminaram.
+    A versão apontada por CURRENT é sempre mantida.
+    '''
+    def prune(self):
+        directory = self.config["snapshot_dir"]
+        current = self.current()
+        versions = sorted(entry for entry in os.listdir(directory) if entry[0].isdigit())
+        own = [name for name in versions if name.endswith(f"-{os.getpid()}") or name.endswith(f"-{os.getpid()}.tmp")]
+        for name in versions:
+            if name == current or (name in own and name in own[-self.config["keep_snapshots"]:]):
+                continue
+            if name in own or not process_alive(int(name.split("-")[1].removesuffix(".tmp"))):
+                shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+    '''
+    Gera um novo snapshot de todas as tabelas em um diretório novo e troca as views de uma só vez.
+    As consultas em andamento continuam sobre os arquivos da versão anterior.
+    '''
+    def refresh(self):
+        with self.refresh_lock:
+            self.refreshing = True
+            try:
+                directory = self.config["snapshot_dir"]
+                version = f"{time.time_ns()}-{os.getpid()}"
+                temporary = os.path.join(directory, f"{version}.tmp")
+                os.makedirs(temporary)
+                started = time.perf_counter()
+                tables = {table_name: self.write_table(temporary, table_name) for table_name in self.config["tables"]}
+                os.rename(temporary, os.path.join(directory, version))
+                self.create_views(version)
+
+                pointer = os.path.join(directory, f"CURRENT.{os.getpid()}.tmp")
+                with open(pointer, "w") as file:
+                    file.write(version)
+                os.replace(pointer, os.path.join(directory, "CURRENT"))
+                self.prune()
+                self.snapshot = {
+                    "version": version,
+                    "created_at": datetime.now().isoformat(timespec="seconds"),
+                    "created_monotonic": time.monotonic(),
+                    "duration_s": round(time.perf_counter() - started, 3),
+                    "tables": tables,
+                }
+            finally:
+                self.refreshing = False
+            return self.snapshot
+
+    # Reaproveita os arquivos do último snapshot (ex.: após reiniciar a aplicação ou gerado por outro worker)
+    def load_existing(self):
+        version = self.current()
+        if version is None:
+            return False
+        paths = [self.path(version, table_name) for table_name in self.config["tables"]]
+        if not all(os.path.exists(path) for path in paths):
+            return False
+        self.create_views(version)
+        created_at = min(os.path.getmtime(path) for path in paths)
+        self.snapshot = {
+            "version": version,
+            "created_at": datetime.fromtimestamp(created_at).isoformat(timespec="seconds"),
+            "created_monotonic": time.monotonic() - (time.time() - created_at),
+            "duration_s": None,
+            "tables": {table_name: None for table_name in self.config["tables"]},
+        }
+        return True
+
+    # Garante um snapshot disponível; um snapshot vencido é atualizado em segundo plano
+    def ensure_snapshot(self):
+        if self.snapshot is None:
+            # Primeira consulta: as demais aguardam o mesmo snapshot em vez de gerar outro
+            with self.refresh_lock:
+                if self.snapshot is None and not self.load_existing():
+                    self.refresh()
+            return
+
+        age = time.monotonic() - self.snapshot["created_monotonic"]
+        if self.config["refresh_interval"] and age > self.config["refresh_interval"] and not self.refreshing:
+            self.refreshing = True
+            get_executor("analytics").submit(self.refresh)
+
+    '''
+    Executa uma consulta SQL no DuckDB. As linhas são tuplas nomeadas, acessíveis por posição
+    ou por nome da coluna, como as linhas retornadas pelo SQLAlchemy.
+    '''
+    def query(self, sql):
+        self.ensure_snapshot()
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql)
+            Row = namedtuple("Row", [column[0] for column in cursor.description], rename=True)
+            return [Row(*row) for row in cursor.fetchall()]
+
+    def stats(self):
+        snapshot = {key: value for key, value in (self.snapshot or {}).items() if key != "created_monotonic"}
+        return {"engine": "duckdb", "snapshot_dir": self.config["snapshot_dir"], "refreshing": self.refreshing, "snapshot": snapshot or None}
+
+
+# Verdadeiro se o processo ainda existe (versões de workers encerrados podem ser removidas)
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+@lru_cache(maxsize=1)
+def get_analytics_engine():
+    return AnalyticsEngine(get_analytics_config())
+
+# Nome do dialeto que executa as consultas analíticas ("duckdb" quando o motor analítico está ativo)
+def analytics_dialect(db):
+    return "duckdb" if analytics_enabled() else db.bind.dialect.name
+
+'''
+Executa uma consulta analítica: no DuckDB, quando habilitado (em uma thread do executor "analytics"),
+ou na sessão de leitura do banco. Retorna a lista de linhas.
+'''
+async def analytics_exec(db, statement):
+    if analytics_enabled():
+        return await run_in_executor("analytics", get_analytics_engine().query, compile_statement(statement))
+    return (await db.exec(statement)).all()
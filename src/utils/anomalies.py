@@ -0,0 +1,145 @@
+from datetime import datetime
+from functools import lru_cache
+from sqlmodel import Session, delete, func, insert, select
+from database import get_engine
+from models import *
+from utils.column_store import contract_years
+from utils.load_config import load_config
+from utils.summaries import lock_summary
+from utils.value_sketches import contract_modalities
+
+'''
+Configuração da detecção de anomalias (seção anomalies do config.yaml).
+threshold: |z robusto| a partir do qual o valor é marcado (3.5, como em Iglewicz e Hoaglin);
+min_group_size: grupos (modalidade, ano) menores usam a distribuição de todos os contratos.
+'''
+@lru_cache(maxsize=1)
+def get_anomalies_config():
+    return {
+        "threshold": 3.5,
+        "min_group_size": 10,
+        "batch_size": 50_000,
+        **load_config().get("anomalies", {}),
+    }
+
+# Métricas avaliadas: (numerador, denominador) de cada razão; denominadores nulos ou não positivos são ignorados
+METRICS = {
+    "razao_aditivo": lambda frame: (frame["valor_aditivo"], frame["valor_original"]),
+    "razao_pago_empenhado": lambda frame: (frame["valor_pago"], frame["valor_empenhado"]),
+    "excesso_pago_atualizado": lambda frame: (frame["valor_pago"] - frame["valor_atualizado"], frame["valor_atualizado"]),
+}
+
+COLUMNS = ["id", "contract_id", "ano", "modalidade", "valor_original", "valor_aditivo", "valor_atualizado", "valor_empenhado", "valor_pago"]
+
+def contract_value_rows():
+    years = contract_years()
+    modalities = contract_modalities()
+    return (
+        select(ContractValues.id, ContractValues.contract_id, years.c.ano, modalities.c.modalidade,
+               ContractValues.valor_original, ContractValues.valor_aditivo, ContractValues.valor_atualizado,
+               ContractValues.valor_empenhado, ContractValues.valor_pago)
+        .outerjoin(years, years.c.contract_id == ContractValues.contract_id)
+        .outerjoin(modalities, modalities.c.contract_id == ContractValues.contract_id)
+    )
+
+'''
+Z robusto de cada valor em relação ao seu grupo: (x - mediana) / (1.4826 * MAD). Quando o MAD é zero,
+usa 1.2533 * desvio absoluto médio; grupos sem dispersão ficam sem z (NaN) e não são marcados. Tudo vetorizado (groupby/transform).
+'''
+def robust_scores(frame, min_group_size):
+    import numpy as np
+
+    keys = [frame["modalidade"], frame["ano"]]
+    values = frame["valor"]
+    grouped = values.groupby(keys, dropna=False)
+    size = grouped.transform("size")
+    median = grouped.transform("median")
+    deviation = (values - median).abs()
+    mad = deviation.groupby(keys, dropna=False).transform("median")
+    mean_deviation = deviation.groupby(keys, dropna=False).transform("mean")
+
+    # Grupos pequenos: distribuição de todos os contratos
+    small = size < min_group_size
+    if small.any():
+        overall_median = values.median()
+        overall_deviation = (values - overall_median).abs()
+        median = median.where(~small, overall_median)
+        mad = mad.where(~small, overall_deviation.median())
+        mean_deviation = mean_deviation.where(~small, overall_deviation.mean())
+        size = size.where(~small, len(values))
+
+    # Escalas da ordem do erro de arredondamento (razões iguais no grupo inteiro) contam como dispersão nula
+    scale = (1.4826 * mad).where(mad > 0, 1.2533 * mean_deviation)
+    scale = scale.where(scale > 1e-9 * (median.abs() + 1), np.nan)
+    return frame.assign(
+        mediana=median,
+        escala=scale,
+        z_robusto=(values - median) / scale,
+        grupo=np.where(small, "geral", "modalidade_ano"),
+        tamanho_grupo=size,
+    )
+
+'''
+Recalcula as anomalias de todos os valores de contratos (bloqueante: executada em um executor).
+As estatísticas de grupo mudam com qualquer linha nova, então o cálculo é sempre sobre a tabela inteira;
+a tabela contract_anomalies é substituída na mesma transação (leitores veem a versão anterior até o commit).
+'''
+def update_contract_anomalies(full=False):
+    import numpy as np
+    import pandas as pd
+
+    config = get_anomalies_config()
+    with Session(get_engine()) as db:
+        state = lock_summary(db, "contract_anomalies", [ContractValues])[ContractValues.__tablename__]
+        row_count, max_id = db.exec(select(func.count(ContractValues.id), func.max(ContractValues.id))).one()
+        if not full and state.row_count == row_count and state.last_id == (max_id or 0):
+            db.rollback()
+            return {"rows": row_count, "anomalies": None}
+
+        result = db.connection().execution_options(stream_results=True, yield_per=config["batch_size"]).execute(contract_value_rows())
+        frames = [pd.DataFrame.from_records(rows, columns=COLUMNS) for rows in result.partitions(config["batch_size"])]
+        data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=COLUMNS)
+        for column in COLUMNS[4:]:
+            data[column] = pd.to_numeric(data[column], errors="coerce")
+        data["ano"] = pd.to_numeric(data["ano"], errors="coerce")
+
+        flagged = []
+        for metric, ratio in METRICS.items():
+            numerator, denominator = ratio(data)
+            frame = data[COLUMNS[:4]].assign(valor=numerator / denominator.where(denominator > 0))
+            frame = frame[np.isfinite(frame["valor"])]
+            if frame.empty:
+                continue
+            scored = robust_scores(frame, config["min_group_size"])
+            scored = scored[scored["z_robusto"].abs() >= config["threshold"]]
+            flagged.append(scored.assign(metrica=metric))
+
+        records = []
+        if flagged:
+            anomalies = pd.concat(flagged, ignore_index=True)
+            records = [
+                {
+                    "contract_id": int(row.contract_id),
+                    "contract_value_id": int(row.id),
+                    "ano": None if pd.isna(row.ano) else int(row.ano),
+                    "modalidade": None if pd.isna(row.modalidade) else row.modalidade,
+                    "metrica": row.metrica,
+                    "valor": float(row.valor),
+                    "mediana": float(row.mediana),
+                    "escala": float(row.escala),
+                    "z_robusto": float(row.z_robusto),
+                    "score": abs(float(row.z_robusto)),
+                    "grupo": row.grupo,
+                    "tamanho_grupo": int(row.tamanho_grupo),
+                }
+                for row in anomalies.itertuples(index=False)
+            ]
+
+        db.exec(delete(ContractAnomaly))
+        if records:
+            db.exec(insert(ContractAnomaly), params=records)
+        state.last_id = max_id or 0
+        state.row_count = row_count
+        state.updated_at = datetime.now()
+        db.commit()
+    return {"rows": row_count, "anomalies": len(records)}
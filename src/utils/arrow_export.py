@@ -0,0 +1,111 @@
+from functools import lru_cache
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, Numeric
+from sqlmodel import select
+from models import *
+from utils.load_config import load_config
+
+# Tabelas disponíveis para exportação, pelo nome da tabela no banco
+EXPORT_TABLES = {
+    model.__tablename__: model.__table__
+    for model in [Contract, ContractValues, ContractDates, AdministrativeProcess, Agreement, AgreementValues, AgreementDates, Accountability]
+}
+
+# Configuração da exportação (seção export do config.yaml)
+@lru_cache(maxsize=1)
+def get_export_config():
+    return {
+        "batch_size": 50_000,
+        "parquet_compression": "zstd",
+        "arrow_compression": "lz4",
+        **load_config().get("export", {}),
+    }
+
+'''
+Esquema Arrow de uma tabela, a partir dos tipos das colunas do SQLAlchemy (demais tipos viram texto)
+'''
+def arrow_schema(table):
+    import pyarrow as pa
+
+    types = [
+        (Boolean, pa.bool_()),
+        (Integer, pa.int64()),
+        (Float, pa.float64()),
+        (Numeric, pa.float64()),
+        (DateTime, pa.timestamp("us")),
+        (Date, pa.date32()),
+    ]
+    fields = []
+    for column in table.columns:
+        arrow_type = next((arrow_type for base, arrow_type in types if isinstance(column.type, base)), pa.string())
+        fields.append(pa.field(column.name, arrow_type, nullable=column.nullable))
+    return pa.schema(fields)
+
+# Converte um lote de linhas do banco (tuplas) em um RecordBatch, coluna a coluna
+def rows_to_batch(rows, schema):
+    import pyarrow as pa
+
+    columns = list(zip(*rows)) if rows else [[] for _ in schema]
+    arrays = [pa.array(values, type=field.type) for values, field in zip(columns, schema)]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+'''
+Lê a tabela em lotes com um cursor no servidor (stream_results/yield_per), sem carregar
+a tabela inteira em memória. Produz listas de linhas de até batch_size elementos.
+'''
+async def stream_rows(session, table, batch_size):
+    statement = select(table).order_by(*table.primary_key.columns).execution_options(yield_per=batch_size)
+    result = await session.stream(statement)
+    async for rows in result.partitions(batch_size):
+        yield rows
+
+'''
+Destino de escrita em memória para os writers do pyarrow: acumula os bytes escritos
+até serem retirados com drain(), permitindo enviar o arquivo em partes durante a escrita
+'''
+class ChunkSink:
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+# Writer de Parquet: um row group por lote, com o rodapé (metadados) gravado no close()
+def parquet_writer(sink, schema, compression):
+    import pyarrow.parquet as pq
+
+    return pq.ParquetWriter(sink, schema, compression=compression)
+
+# Writer do formato de streaming do Arrow IPC: uma mensagem por lote
+def arrow_writer(sink, schema, compression):
+    import pyarrow as pa
+
+    options = pa.ipc.IpcWriteOptions(compression=None if compression == "none" else compression)
+    return pa.ipc.new_stream(sink, schema, options=options)
+
+# Escreve um lote de linhas no writer e retorna os bytes produzidos até o momento
+def write_rows(writer, sink, rows, schema):
+    writer.write_batch(rows_to_batch(rows, schema))
+    return sink.drain()
+
+# Finaliza o arquivo e retorna os bytes restantes
+def close_writer(writer, sink):
+    writer.close()
+    return sink.drain()
@@ -0,0 +1,67 @@
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from utils.load_config import load_config
+
+'''
+Cache de gráficos renderizados, endereçado pelo hash do conteúdo (dados + parâmetros)
+'''
+class ChartCache:
+    def __init__(self, max_entries=256, disk_dir=None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, key):
+        # Busca primeiro na memória (LRU) e depois no disco
+        with self.lock:
+            content = self.entries.get(key)
+            if content is not None:
+                self.entries.move_to_end(key)
+                return content
+
+        if self.disk_dir:
+            path = os.path.join(self.disk_dir, key)
+            if os.path.exists(path):
+                with open(path, "rb") as file:
+                    content = file.read()
+                self._remember(key, content)
+                return content
+        return None
+
+    def set(self, key, content):
+        self._remember(key, content)
+
+        if self.disk_dir:
+            # Escrita atômica para que outro worker nunca leia um arquivo pela metade
+            path = os.path.join(self.disk_dir, key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as file:
+                file.write(content)
+            os.replace(tmp_path, path)
+
+    def _remember(self, key, content):
+        with self.lock:
+            self.entries[key] = content
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+# Cache criado no primeiro uso, depois que a configuração está disponível
+@lru_cache(maxsize=1)
+def get_chart_cache():
+    cache_config = load_config().get("charts", {}).get("cache", {})
+    return ChartCache(
+        max_entries=cache_config.get("max_entries", 256),
+        disk_dir=cache_config.get("disk_dir"),
+    )
+
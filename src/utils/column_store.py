@@ -0,0 +1,445 @@
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+import numpy as np
+from sqlalchemy import or_
+from sqlmodel import extract, func, select
+from database import get_engine
+from models import *
+from utils.executors import get_executor
+from utils.load_config import load_config
+
+# Configuração do armazenamento colunar (seção column_store do config.yaml)
+@lru_cache(maxsize=1)
+def get_column_store_config():
+    return {
+        "enabled": False,
+        "check_interval": 5,
+        "max_age": 3600,
+        "batch_size": 50_000,
+        "shared_dir": None,
+        "keep_snapshots": 3,
+        **load_config().get("column_store", {}),
+    }
+
+def column_store_enabled():
+    return get_column_store_config()["enabled"]
+
+'''
+Tabela de fatos em memória: uma linha por registro da tabela principal, com as dimensões codificadas
+em dicionário (códigos int32, um por categoria, incluindo None) e as medidas em float64 (NaN para nulos).
+As linhas ficam ordenadas pelo id da tabela principal, o que permite acrescentar apenas os registros novos.
+'''
+class FactTable:
+    def __init__(self, name, model, parent, statement, dependents, dimensions, measures):
+        self.name = name
+        self.model = model              # tabela principal (id crescente)
+        self.parent = parent            # coluna que liga as tabelas dependentes (contract_id / agreement_id)
+        self.statement = statement      # SELECT id, parent, dimensões..., medidas...
+        self.dependents = dependents    # tabelas cujas linhas novas alteram dimensões de linhas existentes
+        self.dimensions = dimensions
+        self.measures = measures
+        self.reset()
+
+    def reset(self):
+        self.last_key = 0
+        self.lookups = {dimension: {} for dimension in self.dimensions}
+        self.columns = {"id": np.empty(0, np.int64)}
+        self.columns.update({dimension: np.empty(0, np.int32) for dimension in self.dimensions})
+        self.columns.update({measure: np.empty(0, np.float64) for measure in self.measures})
+
+    def __len__(self):
+        return len(self.columns["id"])
+
+    def nbytes(self):
+        return sum(column.nbytes for column in self.columns.values())
+
+    # Categorias de uma dimensão, na ordem dos códigos
+    def categories(self, dimension):
+        return list(self.lookups[dimension])
+
+    '''
+    Lê as linhas do banco: todas (previous=None) ou apenas as novas e as afetadas por linhas novas
+    das tabelas dependentes desde a versão anterior
+    '''
+    def load(self, conn, previous, batch_size):
+        stmt = self.statement()
+        if previous is None:
+            self.reset()
+        else:
+            conditions = [self.model.id > self.last_key]
+            for dependent in self.dependents:
+                _, max_id = previous[dependent.__tablename__]
+                conditions.append(getattr(self.model, self.parent).in_(
+                    select(getattr(dependent, self.parent)).where(dependent.id > (max_id or 0))
+                ))
+            stmt = stmt.where(or_(*conditions))
+
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(stmt.order_by(self.model.id))
+        loaded = 0
+        for rows in result.partitions(batch_size):
+            self.upsert(rows)
+            loaded += len(rows)
+        return loaded
+
+    # Acrescenta as linhas novas e atualiza as existentes; os arrays são substituídos de uma vez (leitores não veem estado parcial)
+    def upsert(self, rows):
+        values = list(zip(*rows))
+        keys = np.array(values[0], dtype=np.int64)
+        incoming = {"id": keys}
+        for index, dimension in enumerate(self.dimensions, start=2):
+            lookup = self.lookups[dimension]
+            incoming[dimension] = np.fromiter((lookup.setdefault(value, len(lookup)) for value in values[index]), dtype=np.int32, count=len(keys))
+        for index, measure in enumerate(self.measures, start=2 + len(self.dimensions)):
+            incoming[measure] = np.array(values[index], dtype=np.float64)
+
+        is_new = keys > self.last_key
+        columns = {name: np.concatenate([column, incoming[name][is_new]]) for name, column in self.columns.items()}
+        if not is_new.all():
+            updated = ~is_new
+            positions = np.searchsorted(columns["id"], keys[updated])
+            found = positions < len(columns["id"])
+            found[found] = columns["id"][positions[found]] == keys[updated][found]
+            for name in self.dimensions + self.measures:
+                columns[name][positions[found]] = incoming[name][updated][found]
+
+        self.columns = columns
+        self.last_key = max(self.last_key, int(keys.max()))
+
+    '''
+    Agrega as medidas pelas dimensões com kernels vetorizados: as dimensões são combinadas em uma única chave
+    (base mista) e cada medida é somada com np.bincount. Funções: ("count", None) conta as linhas;
+    ("sum" | "avg" | "count", medida) seguem o SQL, ignorando nulos. Grupos nulos ficam por último.
+    '''
+    def aggregate(self, dimensions, measures):
+        columns = self.columns
+        sizes = [max(len(self.lookups[dimension]), 1) for dimension in dimensions]
+        groups = int(np.prod(sizes)) if dimensions else 1
+
+        key = np.zeros(len(columns["id"]), dtype=np.int64)
+        for dimension, size in zip(dimensions, sizes):
+            key = key * size + columns[dimension]
+
+        counts = np.bincount(key, minlength=groups)
+        results = []
+        for function, measure in measures:
+            if measure is None:
+                results.append(counts)
+                continue
+            values = columns[measure]
+            valid = ~np.isnan(values)
+            non_null = np.bincount(key, weights=valid, minlength=groups)
+            if function == "count":
+                results.append(non_null.astype(np.int64))
+                continue
+            sums = np.bincount(key, weights=np.where(valid, values, 0.0), minlength=groups)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                aggregated = sums if function == "sum" else sums / non_null
+            results.append(np.where(non_null > 0, aggregated, np.nan))
+
+        categories = [self.categories(dimension) for dimension in dimensions]
+        rows = []
+        for group in np.nonzero(counts)[0]:
+            labels = []
+            remainder = int(group)
+            for size, values in zip(reversed(sizes), reversed(categories)):
+                remainder, code = divmod(remainder, size)
+                labels.append(values[code])
+            measured = [None if np.isnan(result[group]) else result[group].item() for result in results]
+            rows.append((*reversed(labels), *measured))
+        return sorted(rows, key=lambda row: [(value is None, value) for value in row[:len(dimensions)]])
+
+
+# Ano de assinatura de cada contrato (menor ano entre as datas do contrato)
+def contract_years():
+    return (
+        select(ContractDates.contract_id, func.min(extract('year', ContractDates.data_de_assinatura)).label("ano"))
+        .group_by(ContractDates.contract_id)
+        .subquery()
+    )
+
+def contract_value_facts():
+    years = contract_years()
+    return (
+        select(ContractValues.id, ContractValues.contract_id, years.c.ano,
+               ContractValues.valor_original, ContractValues.valor_atualizado, ContractValues.valor_empenhado, ContractValues.valor_pago)
+        .outerjoin(years, years.c.contract_id == ContractValues.contract_id)
+    )
+
+def process_facts():
+    years = contract_years()
+    return (
+        select(AdministrativeProcess.id, AdministrativeProcess.contract_id, years.c.ano,
+               AdministrativeProcess.modalidade_de_licitacao, AdministrativeProcess.situacao_fisica, AdministrativeProcess.status_do_instrumento)
+        .outerjoin(years, years.c.contract_id == AdministrativeProcess.contract_id)
+    )
+
+# Ano de assinatura de cada convênio
+def agreement_years():
+    return (
+        select(AgreementDates.agreement_id, func.min(extract('year', AgreementDates.data_assinatura)).label("ano"))
+        .group_by(AgreementDates.agreement_id)
+        .subquery()
+    )
+
+def agreement_value_facts():
+    years = agreement_years()
+    return (
+        select(AgreementValues.id, AgreementValues.agreement_id, years.c.ano,
+               AgreementValues.valor_inicial_total, AgreementValues.valor_atualizado_total, AgreementValues.valor_pago)
+        .outerjoin(years, years.c.agreement_id == AgreementValues.agreement_id)
+    )
+
+def build_facts():
+    return {
+        "contract_values": FactTable("contract_values", ContractValues, "contract_id", contract_value_facts, [ContractDates],
+                                     ["ano"], ["valor_original", "valor_atualizado", "valor_empenhado", "valor_pago"]),
+        "administrative_processes": FactTable("administrative_processes", AdministrativeProcess, "contract_id", process_facts, [ContractDates],
+                                              ["ano", "modalidade_de_licitacao", "situacao_fisica", "status_do_instrumento"], []),
+        "agreement_values": FactTable("agreement_values", AgreementValues, "agreement_id", agreement_value_facts, [AgreementDates],
+                                      ["ano"], ["valor_inicial_total", "valor_atualizado_total", "valor_pago"]),
+    }
+
+'''
+Armazenamento colunar do processo: mantém as dimensões e medidas usadas pelos agregados do painel
+em arrays NumPy e responde group-by/sum/avg/count sem consultar o banco.
+
+A versão do conjunto de dados é (quantidade de linhas, maior id) de cada tabela de origem, consultada
+no máximo a cada check_interval segundos. Quando as tabelas apenas cresceram, só as linhas novas
+(e as afetadas por elas) são lidas; remoções, ou a idade máxima (max_age, que também cobre edições
+no lugar), provocam uma recarga completa. Os resultados são memorizados por versão.
+
+Com shared_dir, os arrays são publicados em snapshots versionados (arquivos .npy) que todos os workers
+mapeiam somente leitura (mmap): a memória é compartilhada pelo cache de páginas do sistema operacional
+e um worker recém-iniciado responde com o último snapshot sem ler o banco. Apenas um worker por vez
+(trava em arquivo) relê o banco e publica a nova versão; os demais trocam de snapshot ao vê-la.
+'''
+class ColumnStore:
+    def __init__(self, config):
+        self.config = config
+        self.facts = build_facts()
+        self.tables = {}
+        for fact in self.facts.values():
+            for model in [fact.model, *fact.dependents]:
+                self.tables[model.__tablename__] = model
+        self.lock = threading.Lock()
+        self.version = None
+        self.checked_at = 0.0
+        self.full_loaded_at = 0.0
+        self.results = {}
+        self.loads = {"full": 0, "incremental": 0}
+        self.last_load = None
+        self.snapshots = SharedSnapshots(config["shared_dir"], config["keep_snapshots"]) if config["shared_dir"] else None
+        self.attached = None
+
+    def needs_check(self):
+        return self.version is None or time.monotonic() - self.checked_at >= self.config["check_interval"]
+
+    def read_version(self, conn):
+        return {
+            name: tuple(conn.execute(select(func.count(model.id), func.max(model.id))).one())
+            for name, model in self.tables.items()
+        }
+
+    # Verdadeiro se a tabela apenas recebeu linhas novas desde a versão anterior
+    def appended_only(self, conn, name, previous, current):
+        (old_count, old_max), (new_count, _) = previous, current
+        if new_count < old_count:
+            return False
+        model = self.tables[name]
+        appended = conn.execute(select(func.count(model.id)).where(model.id > (old_max or 0))).one()[0]
+        return appended == new_count - old_count
+
+    '''
+    Verifica a versão do conjunto de dados e recarrega o que mudou (bloqueante: executada em um executor)
+    '''
+    def refresh(self):
+        with self.lock:
+            if not self.needs_check():
+                return
+            self.checked_at = time.monotonic()
+            if self.snapshots is None:
+                with get_engine().connect() as conn:
+                    version = self.read_version(conn)
+                    if version != self.version:
+                        self.load_changes(conn, version)
+                return
+
+            # Modo compartilhado: adota o snapshot mais recente e só relê o banco se ele estiver desatualizado
+            self.attach_latest()
+            with get_engine().connect() as conn:
+                version = self.read_version(conn)
+                if version == self.version:
+                    return
+                with self.snapshots.publisher() as acquired:
+                    if not acquired:
+                        # Outro worker está publicando: segue com o snapshot atual até a próxima verificação
+                        return
+                    self.attach_latest()
+                    if version == self.version:
+                        return
+                    self.load_changes(conn, version)
+                    self.snapshots.publish(self.manifest(), self.facts)
+                    # Troca os arrays carregados na memória pelos arquivos mapeados
+                    self.attach_latest()
+
+    # Lê as linhas novas (ou todas, na recarga completa) e passa para a nova versão
+    def load_changes(self, conn, version):
+        full = (
+            self.version is None
+            or time.time() - self.full_loaded_at > self.config["max_age"]
+            or not all(self.appended_only(conn, name, self.version[name], version[name]) for name in version)
+        )
+        started = time.perf_counter()
+        loaded = {
+            name: fact.load(conn, None if full else self.version, self.config["batch_size"])
+            for name, fact in self.facts.items()
+        }
+
+        self.version = version
+        self.results = {}
+        if full:
+            self.full_loaded_at = time.time()
+        self.loads["full" if full else "incremental"] += 1
+        self.last_load = {"type": "full" if full else "incremental", "rows": loaded, "duration_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+    def manifest(self):
+        return {
+            "version": self.version,
+            "full_loaded_at": self.full_loaded_at,
+            "facts": {
+                name: {"last_key": fact.last_key, "categories": {dimension: fact.categories(dimension) for dimension in fact.dimensions}}
+                for name, fact in self.facts.items()
+            },
+        }
+
+    # Troca para o snapshot publicado mais recente, se for diferente do atual
+    def attach_latest(self):
+        name = self.snapshots.current()
+        if name is None or name == self.attached:
+            return
+        manifest, facts = self.snapshots.open(name, build_facts())
+        self.facts = facts
+        self.version = {table: tuple(value) for table, value in manifest["version"].items()}
+        self.full_loaded_at = manifest["full_loaded_at"]
+        self.results = {}
+        self.attached = name
+
+    # Agregação memorizada pela versão do conjunto de dados
+    def aggregate(self, fact, dimensions, measures):
+        key = (fact, tuple(dimensions), tuple(measures))
+        results = self.results
+        if key not in results:
+            results[key] = self.facts[fact].aggregate(list(dimensions), list(measures))
+        return results[key]
+
+    # Força a verificação da versão em segundo plano (ex.: após uma ingestão)
+    def schedule_refresh(self):
+        self.checked_at = 0.0
+        get_executor("analytics").submit(self.refresh)
+
+    def stats(self):
+        return {
+            "version": {name: {"rows": count, "max_id": max_id} for name, (count, max_id) in (self.version or {}).items()},
+            "loads": self.loads,
+            "last_load": self.last_load,
+            "shared": {"dir": self.snapshots.directory, "snapshot": self.attached} if self.snapshots else None,
+            "facts": {
+                name: {"rows": len(fact), "bytes": fact.nbytes(), "categories": {dimension: len(fact.lookups[dimension]) for dimension in fact.dimensions}}
+                for name, fact in self.facts.items()
+            },
+        }
+
+
+'''
+Snapshots versionados do armazenamento colunar em disco, compartilhados entre os workers:
+cada versão é um diretório com um arquivo .npy por coluna e um manifest.json (versão e categorias).
+O arquivo CURRENT aponta para a versão publicada e é trocado de forma atômica (os.replace).
+'''
+class SharedSnapshots:
+    def __init__(self, directory, keep):
+        self.directory = directory
+        self.keep = keep
+        os.makedirs(directory, exist_ok=True)
+
+    def current(self):
+        try:
+            with open(os.path.join(self.directory, "CURRENT")) as file:
+                return file.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    # Trava exclusiva entre processos, sem espera: indica se este worker pode publicar
+    @contextmanager
+    def publisher(self):
+        import fcntl
+
+        with open(os.path.join(self.directory, ".lock"), "w") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    '''
+    Grava uma nova versão em um diretório temporário, renomeia e aponta CURRENT para ela.
+    Versões antigas são removidas; workers que ainda as mapeiam continuam lendo os arquivos abertos.
+    '''
+    def publish(self, manifest, facts):
+        name = f"{time.time_ns()}-{os.getpid()}"
+        temporary = os.path.join(self.directory, f"{name}.tmp")
+        for fact_name, fact in facts.items():
+            os.makedirs(os.path.join(temporary, fact_name))
+            for column, values in fact.columns.items():
+                np.save(os.path.join(temporary, fact_name, f"{column}.npy"), values)
+        with open(os.path.join(temporary, "manifest.json"), "w") as file:
+            json.dump(manifest, file, default=json_number)
+        os.rename(temporary, os.path.join(self.directory, name))
+
+        pointer = os.path.join(self.directory, f"CURRENT.{os.getpid()}.tmp")
+        with open(pointer, "w") as file:
+            file.write(name)
+        os.replace(pointer, os.path.join(self.directory, "CURRENT"))
+        self.prune(name)
+        return name
+
+    # Mapeia os arrays de uma versão (somente leitura) nas tabelas de fatos informadas
+    def open(self, name, facts):
+        path = os.path.join(self.directory, name)
+        with open(os.path.join(path, "manifest.json")) as file:
+            manifest = json.load(file)
+        for fact_name, fact in facts.items():
+            saved = manifest["facts"][fact_name]
+            fact.last_key = saved["last_key"]
+            fact.lookups = {dimension: {value: code for code, value in enumerate(values)} for dimension, values in saved["categories"].items()}
+            fact.columns = {column: np.load(os.path.join(path, fact_name, f"{column}.npy"), mmap_mode="r") for column in fact.columns}
+        return manifest, facts
+
+    # Remove as versões mais antigas, mantendo as keep mais recentes
+    def prune(self, current):
+        versions = sorted(entry for entry in os.listdir(self.directory) if entry[0].isdigit() and not entry.endswith(".tmp"))
+        for name in versions[:-self.keep]:
+            if name != current:
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+# Categorias numéricas do banco (ex.: Decimal do EXTRACT no PostgreSQL) gravadas como números no manifest
+def json_number(value):
+    return int(value) if value == int(value) else float(value)
+
+
+@lru_cache(maxsize=1)
+def get_column_store():
+    return ColumnStore(get_column_store_config())
+
+# Chamado após uma ingestão: o worker que a executou publica a nova versão sem esperar a próxima consulta
+def refresh_column_store_after_ingestion():
+    if column_store_enabled():
+        get_column_store().schedule_refresh()
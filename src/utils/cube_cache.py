@@ -0,0 +1,138 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from utils.load_config import load_config
+
+# Configuração do endpoint /cube (seção cube do config.yaml)
+@lru_cache(maxsize=1)
+def get_cube_config():
+    return {
+        "ttl": 300,
+        "max_entries": 64,
+        "hot_cuboids": 8,
+        "max_dimensions": 5,
+        **load_config().get("cube", {}),
+    }
+
+'''
+Cubo calculado: as linhas de um GROUP BY CUBE sobre as dimensões, no formato
+(flags de grouping..., valores das dimensões..., métricas...)
+'''
+class CubeEntry:
+    def __init__(self, key, dimensions, measures, rows):
+        self.key = key
+        self.dimensions = dimensions
+        self.measures = measures
+        self.rows = rows
+        self.created_at = time.monotonic()
+
+    def covers(self, dimensions, measures):
+        return set(dimensions) <= set(self.dimensions) and set(measures) <= set(self.measures)
+
+    '''
+    Extrai do cubo as células das dimensões pedidas: as demais dimensões do cubo precisam estar
+    agregadas (grouping = 1). Com cube=False, apenas o cuboide mais detalhado (todas as pedidas agrupadas).
+    Retorna (dimensões agrupadas, valores das dimensões, métricas) por célula.
+    '''
+    def cells(self, dimensions, measures, cube):
+        size = len(self.dimensions)
+        positions = [self.dimensions.index(dimension) for dimension in dimensions]
+        others = [index for index in range(size) if index not in positions]
+        measure_positions = [2 * size + self.measures.index(measure) for measure in measures]
+
+        cells = []
+        for row in self.rows:
+            if any(row[index] == 0 for index in others):
+                continue
+            grouped = [dimension for dimension, index in zip(dimensions, positions) if row[index] == 0]
+            if not cube and len(grouped) < len(dimensions):
+                continue
+            values = [row[size + index] for index in positions]
+            cells.append((grouped, values, [row[index] for index in measure_positions]))
+        return cells
+
+
+'''
+Cache dos cubos do processo. Uma consulta é respondida por qualquer cubo em cache que contenha as suas
+dimensões e métricas, com os mesmos filtros (o CUBE já traz todos os subconjuntos das dimensões).
+Os pedidos de cada cubo são contados: os hot_cuboids mais pedidos continuam sendo servidos após o ttl
+enquanto são recalculados em segundo plano; os demais são recalculados na própria consulta.
+'''
+class CubeCache:
+    def __init__(self, ttl=300, max_entries=64, hot_cuboids=8):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hot_cuboids = hot_cuboids
+        self.entries = OrderedDict()
+        self.requests = Counter()
+        self.refreshing = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    def fresh(self, entry):
+        return time.monotonic() - entry.created_at <= self.ttl
+
+    '''
+    Busca o menor cubo em cache que responde à consulta. Retorna (cubo, atualizado) ou (None, False).
+    '''
+    def find(self, dataset, filters, dimensions, measures):
+        with self.lock:
+            candidates = [
+                entry for key, entry in self.entries.items()
+                if key[0] == dataset and key[1] == filters and entry.covers(dimensions, measures)
+            ]
+            if not candidates:
+                self.misses += 1
+                return None, False
+            fresh = [entry for entry in candidates if self.fresh(entry)]
+            entry = min(fresh or candidates, key=lambda entry: (len(entry.dimensions), len(entry.measures)))
+            self.entries.move_to_end(entry.key)
+            self.requests[entry.key] += 1
+            if fresh:
+                self.hits += 1
+            return entry, bool(fresh)
+
+    # Verdadeiro se o cubo está entre os mais pedidos (servido desatualizado enquanto é recalculado)
+    def is_hot(self, key):
+        with self.lock:
+            return key in dict(self.requests.most_common(self.hot_cuboids))
+
+    def count_stale_hit(self):
+        with self.lock:
+            self.stale_hits += 1
+
+    def set(self, entry):
+        with self.lock:
+            self.entries[entry.key] = entry
+            self.entries.move_to_end(entry.key)
+            self.requests[entry.key] += 1
+            while len(self.entries) > self.max_entries:
+                key, _ = self.entries.popitem(last=False)
+                self.requests.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "refreshing": len(self.refreshing),
+                "most_requested": [
+                    {"dataset": key[0], "filters": list(key[1]), "dimensions": list(key[2]), "measures": list(key[3]), "requests": count}
+                    for key, count in self.requests.most_common(self.hot_cuboids)
+                ],
+            }
+
+
+@lru_cache(maxsize=1)
+def get_cube_cache():
+    config = get_cube_config()
+    return CubeCache(ttl=config["ttl"], max_entries=config["max_entries"], hot_cuboids=config["hot_cuboids"])
@@ -0,0 +1,341 @@
+import hashlib
+import json
+import re
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from sqlalchemy import and_, bindparam, or_, update
+from sqlmodel import Session, delete, func, insert, select
+from database import get_engine
+from models import *
+from utils.load_config import load_config
+from utils.minhash import MinHasher
+from utils.summaries import appended_only, lock_summary
+
+'''
+Configuração da deduplicação (seção duplicates do config.yaml).
+num_perm / bands: tamanho da assinatura MinHash e número de bandas LSH (mudar provoca a reconstrução);
+threshold: similaridade de Jaccard estimada mínima para dois registros serem quase duplicatas;
+max_bucket_size: buckets maiores (textos muito comuns) são ignorados, limitando o número de pares comparados.
+'''
+@lru_cache(maxsize=1)
+def get_duplicates_config():
+    return {
+        "num_perm": 64,
+        "bands": 16,
+        "shingle_size": 4,
+        "threshold": 0.8,
+        "max_bucket_size": 200,
+        "batch_size": 50_000,
+        **load_config().get("duplicates", {}),
+    }
+
+@lru_cache(maxsize=1)
+def get_hasher():
+    config = get_duplicates_config()
+    return MinHasher(config["num_perm"], config["bands"], config["shingle_size"])
+
+'''
+Conjuntos de dados: (modelo, colunas da chave natural, colunas de bloqueio, colunas de texto comparadas nas quase duplicatas).
+Só registros com o mesmo bloqueio (CPF/CNPJ do contratado; concedente do convênio) são candidatos a quase duplicatas:
+textos padronizados (mesmo serviço em municípios diferentes) de fornecedores diferentes não são comparados.
+'''
+SOURCES = {
+    "contracts": (Contract, ["numero_contrato", "cpf_cnpj", "contratante"], ["cpf_cnpj"], ["contratado", "objeto"]),
+    "agreements": (Agreement, ["codigo_plano_trabalho"], ["concedente"], ["convenente", "objeto"]),
+}
+
+# Texto sem acentos, em maiúsculas, apenas com letras, dígitos e espaços simples
+def normalize(value):
+    from unidecode import unidecode
+
+    if value is None:
+        return ""
+    return re.sub(r"[^A-Z0-9]+", " ", unidecode(str(value)).upper()).strip()
+
+# Partes normalizadas sem espaços nem pontuação, separadas por |
+def compact(values):
+    return "|".join(normalize(value).replace(" ", "") for value in values)
+
+# Hash da chave natural; None se todas as partes estão vazias
+def natural_key(values):
+    key = compact(values)
+    if not key.replace("|", ""):
+        return None
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+'''
+Calcula chave e assinatura dos registros novos em lotes (cursor no servidor), gravando as impressões
+digitais e os buckets LSH de cada banda (com a chave de bloqueio no hash do bucket)
+'''
+def fingerprint_rows(db, dataset, statement, key_size, block_size, hasher, batch_size):
+    count = 0
+    result = db.connection().execution_options(stream_results=True, yield_per=batch_size).execute(statement)
+    for rows in result.partitions(batch_size):
+        fingerprints, buckets = [], []
+        for record_id, *values in rows:
+            texts = values[key_size + block_size:]
+            signature = hasher.signature(normalize(" ".join(str(value) for value in texts if value is not None)))
+            fingerprints.append({
+                "dataset": dataset,
+                "record_id": record_id,
+                "chave": natural_key(values[:key_size]),
+                "assinatura": None if signature is None else json.dumps(signature.tolist()),
+            })
+            if signature is not None:
+                block = compact(values[key_size:key_size + block_size])
+                buckets += [
+                    {"dataset": dataset, "banda": banda, "bucket": bucket, "record_id": record_id}
+                    for banda, bucket in enumerate(hasher.band_hashes(signature, block))
+                ]
+        db.exec(insert(RecordFingerprint), params=fingerprints)
+        if buckets:
+            db.exec(insert(LshBucket), params=buckets)
+        count += len(fingerprints)
+    return count
+
+# Chaves naturais repetidas de um conjunto de dados (GROUP BY sobre o índice (dataset, chave))
+def repeated_keys(dataset):
+    return (
+        select(RecordFingerprint.chave)
+        .where(RecordFingerprint.dataset == dataset, RecordFingerprint.chave.is_not(None))
+        .group_by(RecordFingerprint.chave).having(func.count() > 1)
+        .subquery()
+    )
+
+# Registros com chave natural repetida, agrupados pela chave ({chave: [ids]})
+def exact_groups(db, dataset):
+    repeated = repeated_keys(dataset)
+    stmt = (
+        select(RecordFingerprint.chave, RecordFingerprint.record_id)
+        .join(repeated, repeated.c.chave == RecordFingerprint.chave)
+        .where(RecordFingerprint.dataset == dataset)
+        .order_by(RecordFingerprint.record_id)
+    )
+    groups = {}
+    for chave, record_id in db.exec(stmt).all():
+        groups.setdefault(chave, []).append(record_id)
+    return groups
+
+'''
+Agrupa os registros de ids em (first_id, last_id], em ordem de id, aos registros anteriores (agrupamento em estrela).
+Um registro entra no grupo do primeiro registro com a mesma chave natural ou, entre os registros anteriores
+que compartilham algum bucket LSH com ele, no de um registro com o mesmo texto (assinatura igual) ou no do
+centro mais similar, se a similaridade estimada com o centro atinge o limiar. O centro é o registro de menor
+id do grupo e todo membro é duplicata dele ou similar a ele, então similaridades não se encadeiam em grupos
+de registros distintos. Só os buckets com registros novos são lidos (buckets com mais de max_bucket_size
+registros são ignorados) e os grupos já gravados não mudam.
+'''
+def cluster_records(db, dataset, hasher, config, first_id, last_id):
+    import numpy as np
+
+    new = and_(RecordFingerprint.dataset == dataset, RecordFingerprint.record_id > first_id, RecordFingerprint.record_id <= last_id)
+    records = db.exec(select(RecordFingerprint.record_id, RecordFingerprint.chave).where(new).order_by(RecordFingerprint.record_id)).all()
+
+    # Primeiro registro de cada chave natural dos registros novos
+    keys = select(RecordFingerprint.chave).where(new, RecordFingerprint.chave.is_not(None))
+    first_holders = (
+        select(RecordFingerprint.chave, func.min(RecordFingerprint.record_id).label("record_id"))
+        .where(RecordFingerprint.dataset == dataset, RecordFingerprint.chave.in_(keys))
+        .group_by(RecordFingerprint.chave)
+    )
+    first_holder = dict(db.exec(first_holders).all())
+
+    # Buckets dos registros novos, com os registros de cada um
+    touched = select(LshBucket.banda, LshBucket.bucket).where(LshBucket.dataset == dataset, LshBucket.record_id > first_id, LshBucket.record_id <= last_id).distinct().subquery()
+    sizes = (
+        select(LshBucket.banda, LshBucket.bucket, func.count().label("tamanho"))
+        .join(touched, and_(touched.c.banda == LshBucket.banda, touched.c.bucket == LshBucket.bucket))
+        .where(LshBucket.dataset == dataset)
+        .group_by(LshBucket.banda, LshBucket.bucket).having(func.count() > 1)
+        .subquery()
+    )
+    skipped = db.exec(select(func.count()).select_from(sizes).where(sizes.c.tamanho > config["max_bucket_size"])).one()
+    members = (
+        select(LshBucket.banda, LshBucket.bucket, LshBucket.record_id)
+        .join(sizes, and_(sizes.c.banda == LshBucket.banda, sizes.c.bucket == LshBucket.bucket))
+        .where(LshBucket.dataset == dataset, sizes.c.tamanho <= config["max_bucket_size"], LshBucket.record_id <= last_id)
+    )
+    buckets, record_buckets = {}, {}
+    for banda, bucket, record_id in db.exec(members).all():
+        buckets.setdefault((banda, bucket), []).append(record_id)
+        if record_id > first_id:
+            record_buckets.setdefault(record_id, []).append((banda, bucket))
+
+    # Grupo, similaridade e assinatura dos registros envolvidos (novos, vizinhos de bucket e primeiros de cada chave)
+    involved = or_(
+        RecordFingerprint.record_id.in_(select(members.subquery().c.record_id)),
+        RecordFingerprint.record_id.in_(select(first_holders.subquery().c.record_id)),
+        and_(RecordFingerprint.record_id > first_id, RecordFingerprint.record_id <= last_id),
+    )
+    cluster, best, signatures = {}, {}, {}
+    for record_id, record_cluster, similaridade, assinatura in db.exec(select(RecordFingerprint.record_id, RecordFingerprint.cluster, RecordFingerprint.similaridade, RecordFingerprint.assinatura).where(RecordFingerprint.dataset == dataset, involved)).all():
+        cluster[record_id] = record_cluster
+        best[record_id] = similaridade
+        signatures[record_id] = assinatura
+
+    def signature(record_id):
+        if isinstance(signatures[record_id], str):
+            signatures[record_id] = np.asarray(json.loads(signatures[record_id]), dtype=np.uint64)
+        return signatures[record_id]
+
+    changed, exact, similar, pairs = set(), 0, 0, 0
+
+    # O registro entra no grupo do alvo (que vira centro se ainda não tem grupo)
+    def join(record_id, target, similarity):
+        cluster[target] = cluster[target] or target
+        cluster[record_id] = cluster[target]
+        for member in (record_id, target):
+            best[member] = max(best[member] or 0.0, similarity)
+            changed.add(member)
+
+    for record_id, chave in records:
+        holder = first_holder.get(chave)
+        if holder is not None and holder < record_id:
+            # Duplicata exata: entra no grupo do primeiro registro com a chave
+            join(record_id, holder, 1.0)
+            exact += 1
+            continue
+        if record_id not in record_buckets:
+            continue
+
+        # Registros anteriores do mesmo bucket. Texto igual (assinatura igual) conta como duplicata exata;
+        # senão, só os centros de um grupo e os registros ainda sem grupo podem receber o registro
+        neighbors = {other for key in record_buckets[record_id] for other in buckets[key] if other < record_id}
+        pairs += len(neighbors)
+        scored = sorted(((hasher.similarity(signature(record_id), signature(other)), other) for other in neighbors), key=lambda item: (-item[0], item[1]))
+        for similarity, other in scored:
+            if similarity == 1.0 or cluster[other] in (None, other):
+                if similarity >= config["threshold"]:
+                    join(record_id, other, similarity)
+                    similar += 1
+                break
+
+    if changed:
+        table = RecordFingerprint.__table__
+        stmt = (
+            update(table)
+            .where(table.c.dataset == dataset, table.c.record_id == bindparam("record"))
+            .values(cluster=bindparam("cluster_id"), similaridade=bindparam("similaridade_max"))
+        )
+        db.connection().execute(stmt, [{"record": member, "cluster_id": cluster[member], "similaridade_max": best[member]} for member in changed])
+
+    return {"exatos": exact, "similares": similar, "pares_comparados": pairs, "buckets_ignorados": skipped}
+
+'''
+Atualiza as impressões digitais com os registros novos e os agrupa às duplicatas (bloqueante: executada
+em um executor). Remoções, ou uma assinatura de tamanho diferente do configurado, provocam a reconstrução
+do conjunto de dados; edições no lugar só são refletidas pela reconstrução (full=True, POST /duplicates/rebuild).
+'''
+def update_duplicates(full=False):
+    config = get_duplicates_config()
+    hasher = get_hasher()
+    summary = {}
+    with Session(get_engine()) as db:
+        states = lock_summary(db, "duplicates", [model for model, _, _, _ in SOURCES.values()])
+        for dataset, (model, key_columns, block_columns, text_columns) in SOURCES.items():
+            state = states[model.__tablename__]
+            row_count, max_id = db.exec(select(func.count(model.id), func.max(model.id))).one()
+            stored = db.exec(select(RecordFingerprint.assinatura).where(RecordFingerprint.dataset == dataset, RecordFingerprint.assinatura.is_not(None)).limit(1)).first()
+            rebuild = full or not appended_only(db, model, state, row_count) or (stored is not None and len(json.loads(stored)) != hasher.num_perm)
+            if rebuild:
+                db.exec(delete(RecordFingerprint).where(RecordFingerprint.dataset == dataset))
+                db.exec(delete(LshBucket).where(LshBucket.dataset == dataset))
+                state.last_id = 0
+
+            new_rows, clusters = 0, Counter()
+            if (max_id or 0) > state.last_id:
+                columns = [getattr(model, column) for column in key_columns + block_columns + text_columns]
+                statement = select(model.id, *columns).where(model.id > state.last_id, model.id <= max_id)
+                new_rows = fingerprint_rows(db, dataset, statement, len(key_columns), len(block_columns), hasher, config["batch_size"])
+
+                # Agrupamento dos registros novos em faixas de ids de até batch_size registros
+                ids = db.exec(select(RecordFingerprint.record_id).where(RecordFingerprint.dataset == dataset, RecordFingerprint.record_id > state.last_id, RecordFingerprint.record_id <= max_id).order_by(RecordFingerprint.record_id)).all()
+                first_id = state.last_id
+                for start in range(0, len(ids), config["batch_size"]):
+                    last_id = ids[min(start + config["batch_size"], len(ids)) - 1]
+                    clusters.update(cluster_records(db, dataset, hasher, config, first_id, last_id))
+                    first_id = last_id
+
+            state.last_id = max_id or 0
+            state.row_count = row_count
+            state.updated_at = datetime.now()
+            summary[dataset] = {"rebuild": rebuild, "rows": new_rows, **clusters}
+        db.commit()
+    return summary
+
+'''
+Mescla os grupos de duplicatas em um registro canônico (o de menor id): campos vazios do canônico são
+preenchidos com os das duplicatas, valores / datas / processos (prestação de contas, nos convênios) das
+duplicatas passam ao canônico apenas quando ele não os tem, e as duplicatas são removidas com os dados
+restantes. tipo=exato mescla os registros com a mesma chave natural; tipo=similar, os grupos similares
+escolhidos (clusters). Em seguida os grupos que ficaram com um só registro são desfeitos.
+'''
+def merge_duplicates(dataset, tipo="exato", clusters=None):
+    model, _, _, _ = SOURCES[dataset]
+    columns = [column.name for column in model.__table__.columns if column.name != "id"]
+    relationships = [relationship.key for relationship in model.__mapper__.relationships]
+
+    with Session(get_engine()) as db:
+        state = lock_summary(db, "duplicates", [model])[model.__tablename__]
+        if tipo == "exato":
+            groups = {members[0]: members for members in exact_groups(db, dataset).values()}
+        else:
+            stmt = select(RecordFingerprint.cluster, RecordFingerprint.record_id).where(RecordFingerprint.dataset == dataset, RecordFingerprint.cluster.is_not(None))
+            groups = {}
+            for cluster, record_id in db.exec(stmt).all():
+                groups.setdefault(cluster, []).append(record_id)
+        if clusters:
+            groups = {cluster: members for cluster, members in groups.items() if cluster in clusters}
+
+        removed, moved = [], []
+        for cluster, members in groups.items():
+            canonical = db.get(model, cluster)
+            for record_id in sorted(members):
+                if record_id == cluster:
+                    continue
+                duplicate = db.get(model, record_id)
+                for column in columns:
+                    if getattr(canonical, column) is None:
+                        setattr(canonical, column, getattr(duplicate, column))
+                for name in relationships:
+                    current, other = getattr(canonical, name), getattr(duplicate, name)
+                    if isinstance(current, list):
+                        if not current and other:
+                            moved += other
+                            current.extend(list(other))
+                    elif current is None and other is not None:
+                        # Desliga da duplicata antes: a remoção dela apagaria o registro em cascata
+                        moved.append(other)
+                        setattr(duplicate, name, None)
+                        setattr(canonical, name, other)
+                db.delete(duplicate)
+                removed.append(record_id)
+            db.add(canonical)
+
+        # Os dados passados ao canônico precisam sobreviver à remoção das duplicatas
+        db.flush()
+        lost = [child for child in moved if db.exec(select(type(child).id).where(type(child).id == child.id)).first() is None]
+        if lost:
+            db.rollback()
+            raise RuntimeError(f"{len(lost)} registros passados ao canônico seriam removidos com as duplicatas")
+
+        # As impressões digitais das duplicatas saem junto, sem exigir a reconstrução
+        if groups:
+            db.exec(delete(RecordFingerprint).where(RecordFingerprint.dataset == dataset, RecordFingerprint.record_id.in_(removed)))
+            db.exec(delete(LshBucket).where(LshBucket.dataset == dataset, LshBucket.record_id.in_(removed)))
+            state.row_count -= len(removed)
+            state.updated_at = datetime.now()
+            # As duplicatas removidas nunca são centros: só os grupos que ficaram com um registro deixam de existir
+            alone = (
+                select(RecordFingerprint.cluster)
+                .where(RecordFingerprint.dataset == dataset, RecordFingerprint.cluster.is_not(None))
+                .group_by(RecordFingerprint.cluster).having(func.count() == 1)
+            )
+            db.exec(
+                update(RecordFingerprint)
+                .where(RecordFingerprint.dataset == dataset, RecordFingerprint.cluster.in_(alone))
+                .values(cluster=None, similaridade=None)
+            )
+        db.commit()
+    return {"dataset": dataset, "clusters": len(groups), "removidos": len(removed)}
@@ -0,0 +1,51 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from utils.load_config import load_config
+from utils.sql_profiler import request_statements
+
+# Quantidade padrão de threads de cada executor (sobrescrita pela seção executors do config.yaml)
+DEFAULT_WORKERS = {
+    "charts": 4,
+    "ingestion": 1,
+    "export": 2,
+    "analytics": 4,
+}
+
+# Executores de trabalho em lote (resumos, ingestão): seus comandos não contam como comandos da requisição
+BATCH_EXECUTORS = {"analytics", "ingestion"}
+
+executors = {}
+executors_lock = threading.Lock()
+
+'''
+Executor dedicado a um tipo de trabalho pesado (renderização de gráficos, ingestão de planilhas),
+separado do threadpool padrão para que esse trabalho não ocupe as threads das rotas leves
+'''
+def get_executor(name):
+    with executors_lock:
+        if name not in executors:
+            max_workers = load_config().get("executors", {}).get(name, DEFAULT_WORKERS.get(name, 1))
+            executors[name] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        return executors[name]
+
+'''
+Executa uma função bloqueante no executor indicado sem bloquear o event loop.
+O contexto (contextvars) da requisição é copiado para a thread, preservando as métricas da requisição;
+nos executores de lote, os comandos ficam fora da detecção de N+1 da requisição (inserções em massa não são N+1).
+'''
+async def run_in_executor(name, func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    if name in BATCH_EXECUTORS:
+        context.run(request_statements.set, None)
+    return await loop.run_in_executor(get_executor(name), partial(context.run, func, *args, **kwargs))
+
+# Encerra os executores criados (chamado no encerramento da aplicação)
+def shutdown_executors():
+    with executors_lock:
+        for executor in executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        executors.clear()
@@ -14,7 +14,11 @@ def generate_logs():
         "agreements.log",
         "agreement_values.log",
         "agreement_dates.log",
-        "accountability.log"
+        "accountability.log",
+        "slow_queries.log",
+        "export.log",
+        "analytics.log",
+        "replicas.log"
     ]
     
     print("Gerando arquivos de log...");
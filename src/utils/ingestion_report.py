@@ -0,0 +1,118 @@
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+import psutil
+from utils.load_config import load_config
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Histórico padrão dos relatórios de ingestão (um JSON por linha)
+DEFAULT_HISTORY_FILE = os.path.join("logs", "ingestion_history.jsonl")
+
+MB = 1024 * 1024
+
+# Pico de memória residente do processo desde o início (em MB)
+def peak_rss_mb():
+    if resource is not None:
+        # ru_maxrss é informado em KB no Linux
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2)
+    memory = psutil.Process().memory_info()
+    return round(getattr(memory, "peak_wset", memory.rss) / MB, 2)
+
+# Intervalo mínimo entre leituras da memória residente (as etapas por linha não consultam o processo a cada chamada)
+RSS_SAMPLE_INTERVAL = 1.0
+
+'''
+Relatório de uma execução de ingestão, medido por etapa: tempo de relógio, tempo de CPU da thread,
+linhas processadas, memória residente do processo e, em execuções de profiling, pico de alocação do
+Python (tracemalloc). Uma etapa pode ser executada várias vezes (ex.: uma vez por linha); os valores são acumulados.
+'''
+class IngestionReport:
+    def __init__(self, job):
+        config = load_config().get("ingestion", {}).get("report", {})
+        self.job = job
+        self.history_file = config.get("history_file", DEFAULT_HISTORY_FILE)
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.stages = {}
+        self.process = psutil.Process()
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.thread_time()
+        self.start_rss = self.process.memory_info().rss
+        self.rss_mb = round(self.start_rss / MB, 2)
+        self.rss_sampled = self.start_wall
+
+        # O tracemalloc vale para o processo inteiro e deixa todas as alocações mais lentas, inclusive as das
+        # requisições atendidas durante a ingestão: só é ligado em execuções de profiling (ingestion.report.tracemalloc)
+        self.trace_memory = config.get("tracemalloc", False) and not tracemalloc.is_tracing()
+        if self.trace_memory:
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name):
+        stats = self.stages.setdefault(name, {
+            "stage": name, "calls": 0, "rows": 0, "wall_s": 0.0, "cpu_s": 0.0, "tracemalloc_peak_mb": 0.0,
+        })
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            traced_before = tracemalloc.get_traced_memory()[0]
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield stats
+        finally:
+            now = time.perf_counter()
+            stats["wall_s"] += now - wall
+            stats["cpu_s"] += time.thread_time() - cpu
+            stats["calls"] += 1
+            if self.trace_memory:
+                peak = (tracemalloc.get_traced_memory()[1] - traced_before) / MB
+                stats["tracemalloc_peak_mb"] = max(stats["tracemalloc_peak_mb"], peak)
+            if now - self.rss_sampled >= RSS_SAMPLE_INTERVAL or stats["calls"] == 1:
+                self.rss_mb = round(self.process.memory_info().rss / MB, 2)
+                self.rss_sampled = now
+            stats["rss_mb"] = self.rss_mb
+
+    '''
+    Encerra a medição, grava o relatório no histórico e o retorna
+    '''
+    def finish(self, error=None):
+        if self.trace_memory:
+            tracemalloc.stop()
+
+        stages = []
+        for stats in self.stages.values():
+            stages.append({
+                **stats,
+                "wall_s": round(stats["wall_s"], 4),
+                "cpu_s": round(stats["cpu_s"], 4),
+                "tracemalloc_peak_mb": round(stats["tracemalloc_peak_mb"], 2),
+            })
+
+        report = {
+            "job": self.job,
+            "started_at": self.started_at,
+            "status": "error" if error else "ok",
+            "wall_s": round(time.perf_counter() - self.start_wall, 4),
+            "cpu_s": round(time.thread_time() - self.start_cpu, 4),
+            "rss_delta_mb": round((self.process.memory_info().rss - self.start_rss) / MB, 2),
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": stages,
+        }
+        if error:
+            report["error"] = str(error)
+
+        self.append_history(report)
+        return report
+
+    def append_history(self, report):
+        directory = os.path.dirname(self.history_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.history_file, "a", encoding="utf-8") as file:
+            file.write(json.dumps(report, ensure_ascii=False) + "\n")
@@ -0,0 +1,13 @@
+import os
+from functools import lru_cache
+import yaml
+
+'''
+Carrega o arquivo de configuração da aplicação (config.yaml)
+'''
+@lru_cache(maxsize=1)
+def load_config():
+    # O caminho pode ser sobrescrito pela variável de ambiente SFA_CONFIG
+    config_path = os.environ.get("SFA_CONFIG", "config.yaml")
+    with open(config_path, "r") as file:
+        return yaml.safe_load(file) or {}
@@ -0,0 +1,181 @@
+import bisect
+import contextvars
+import threading
+import time
+
+'''
+Métricas da aplicação no formato de texto do Prometheus, mantidas em memória em cada processo
+(cada worker do uvicorn expõe as suas próprias séries em /metrics)
+'''
+
+# Limites (em segundos) dos histogramas de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Limites (em bytes) do histograma de tamanho das respostas
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+# Limites do histograma de consultas por requisição
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250)
+
+registry = []
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in pairs) + "}"
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+# Base das métricas: nome, descrição, nomes dos rótulos e valores por combinação de rótulos
+class Metric:
+    type = None
+
+    def __init__(self, name, description, labels=()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+        registry.append(self)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.type}"]
+        with self.lock:
+            for label_values, value in sorted(self.values.items()):
+                lines.extend(self.render_value(label_values, value))
+        return lines
+
+    def render_value(self, label_values, value):
+        return [f"{self.name}{format_labels(self.labels, label_values)} {format_value(value)}"]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *label_values, amount=1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def inc(self, *label_values, amount=1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def dec(self, *label_values, amount=1):
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, description, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, *label_values, value):
+        with self.lock:
+            state = self.values.get(label_values)
+            if state is None:
+                # Contagens por faixa (não acumuladas), soma e total de observações
+                state = self.values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render_value(self, label_values, value):
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+            cumulative += bucket_count
+            labels = format_labels(self.labels, label_values, [("le", format_value(bound))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = format_labels(self.labels, label_values)
+        lines.append(f"{self.name}_sum{labels} {format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+http_requests = Counter("http_requests_total", "Total de requisições HTTP", ("method", "route", "status"))
+http_in_flight = Gauge("http_requests_in_flight", "Requisições HTTP em andamento", ("method",))
+http_duration = Histogram("http_request_duration_seconds", "Latência das requisições HTTP", ("method", "route"))
+http_response_size = Histogram("http_response_size_bytes", "Tamanho do corpo das respostas HTTP", ("method", "route"), SIZE_BUCKETS)
+db_queries_per_request = Histogram("db_queries_per_request", "Quantidade de comandos SQL por requisição", ("method", "route"), QUERY_COUNT_BUCKETS)
+db_time_per_request = Histogram("db_query_seconds_per_request", "Tempo total em comandos SQL por requisição", ("method", "route"))
+db_queries = Counter("db_queries_total", "Total de comandos SQL executados")
+db_query_duration = Histogram("db_query_duration_seconds", "Duração de cada comando SQL")
+
+# Consultas da requisição atual: [quantidade, tempo total]; None fora de uma requisição
+request_queries = contextvars.ContextVar("request_queries", default=None)
+
+'''
+Registra a execução de um comando SQL (chamado pelos eventos do engine em database.py)
+'''
+def record_query(duration):
+    db_queries.inc()
+    db_query_duration.observe(value=duration)
+    queries = request_queries.get()
+    if queries is not None:
+        queries[0] += 1
+        queries[1] += duration
+
+# Texto exposto em /metrics
+def render_metrics():
+    lines = []
+    for metric in registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# Caminho da rota (ex.: /contracts/contract/{contract_id}), evitando um rótulo por id
+def route_label(scope):
+    route = scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+'''
+Middleware ASGI que mede latência, requisições em andamento, tamanho e status das respostas
+e a quantidade/tempo de comandos SQL de cada requisição
+'''
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        http_in_flight.inc(method)
+        queries = [0, 0.0]
+        token = request_queries.set(queries)
+        response = {"status": 500, "size": 0}
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            request_queries.reset(token)
+            http_in_flight.dec(method)
+
+            route = route_label(scope)
+            http_requests.inc(method, route, str(response["status"]))
+            http_duration.observe(method, route, value=duration)
+            http_response_size.observe(method, route, value=response["size"])
+            db_queries_per_request.observe(method, route, value=queries[0])
+            db_time_per_request.observe(method, route, value=queries[1])
@@ -0,0 +1,52 @@
+import hashlib
+import zlib
+import numpy as np
+
+# Primo logo acima de 2^32: com a < 2^31 e h < 2^32, a * h + b cabe em 64 bits sem estouro
+PRIME = 4_294_967_311
+
+'''
+Assinaturas MinHash para estimar a similaridade de Jaccard entre textos (conjuntos de shingles de
+caracteres): a fração de posições iguais em duas assinaturas estima a similaridade. Com LSH, a assinatura
+é dividida em bandas e cada banda vira um bucket; dois textos com similaridade s caem no mesmo bucket
+em pelo menos uma banda com probabilidade 1 - (1 - s^r)^b (r linhas por banda, b bandas), então só os
+pares que compartilham algum bucket precisam ser comparados, em vez de todos os pares.
+'''
+class MinHasher:
+    def __init__(self, num_perm=64, bands=16, shingle_size=4, seed=1):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) deve ser múltiplo de bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        # Permutações fixas (semente): assinaturas calculadas em processos diferentes são comparáveis
+        generator = np.random.default_rng(seed)
+        self.a = generator.integers(1, 2 ** 31, size=(num_perm, 1), dtype=np.uint64)
+        self.b = generator.integers(0, 2 ** 32, size=(num_perm, 1), dtype=np.uint64)
+
+    # Hashes de 32 bits dos shingles (subtextos de shingle_size caracteres) de um texto
+    def shingles(self, text):
+        size = self.shingle_size
+        grams = {text[i:i + size] for i in range(max(len(text) - size + 1, 1))}
+        return np.fromiter((zlib.crc32(gram.encode()) for gram in grams), dtype=np.uint64, count=len(grams))
+
+    # Assinatura de um texto (None para textos vazios)
+    def signature(self, text):
+        if not text:
+            return None
+        return ((self.a * self.shingles(text) + self.b) % PRIME).min(axis=1)
+
+    # Um bucket (hash de 64 bits com sinal) por banda da assinatura; a chave de bloqueio entra no hash, então
+    # só registros com a mesma chave caem no mesmo bucket
+    def band_hashes(self, signature, block=""):
+        prefix = block.encode() + b"\0"
+        return [
+            int.from_bytes(hashlib.blake2b(prefix + band.tobytes(), digest_size=8).digest(), "big", signed=True)
+            for band in np.asarray(signature, dtype=np.uint64).reshape(self.bands, self.rows)
+        ]
+
+    # Similaridade de Jaccard estimada entre duas assinaturas
+    @staticmethod
+    def similarity(first, second):
+        return float(np.mean(np.asarray(first) == np.asarray(second)))
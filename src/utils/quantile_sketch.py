@@ -0,0 +1,137 @@
+import json
+import math
+import numpy as np
+
+'''
+Sketch de quantis com erro relativo (a mesma ideia do DDSketch): cada valor positivo cai no bucket
+ceil(log_gamma(x)), com gamma = (1 + alpha) / (1 - alpha), e qualquer quantil é estimado com erro relativo
+de no máximo alpha, ocupando poucas centenas de buckets mesmo para bilhões de valores. Dois sketches com o
+mesmo alpha são combinados somando os buckets (sem perda), então cada partição pode ser mantida
+separadamente e as partições combinadas na consulta. Valores negativos usam buckets próprios (pelo módulo)
+e zeros são apenas contados.
+'''
+class QuantileSketch:
+    def __init__(self, alpha=0.01):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self.log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zeros = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    # Acrescenta um lote de valores (nulos / NaN são ignorados)
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+
+        for buckets, selected in ((self.positive, values[values > 0]), (self.negative, -values[values < 0])):
+            if len(selected):
+                indexes, counts = np.unique(np.ceil(np.log(selected) / self.log_gamma).astype(np.int64), return_counts=True)
+                for index, count in zip(indexes.tolist(), counts.tolist()):
+                    buckets[index] = buckets.get(index, 0) + count
+        self.zeros += int(np.count_nonzero(values == 0))
+        self.count += len(values)
+        self.sum += float(values.sum())
+        self.min = float(values.min()) if self.min is None else min(self.min, float(values.min()))
+        self.max = float(values.max()) if self.max is None else max(self.max, float(values.max()))
+        return self
+
+    def merge(self, other):
+        if not math.isclose(self.alpha, other.alpha):
+            raise ValueError(f"Sketches com precisões diferentes: {self.alpha} e {other.alpha}")
+        for buckets, others in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in others.items():
+                buckets[index] = buckets.get(index, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        self.sum += other.sum
+        self.min = other.min if self.min is None else self.min if other.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else self.max if other.max is None else max(self.max, other.max)
+        return self
+
+    # Valor representativo de um bucket (erro relativo de no máximo alpha para qualquer valor do bucket)
+    def value(self, index):
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    # Buckets em ordem crescente de valor: (valor representativo, quantidade)
+    def bins(self):
+        bins = [(-self.value(index), self.negative[index]) for index in sorted(self.negative, reverse=True)]
+        if self.zeros:
+            bins.append((0.0, self.zeros))
+        bins += [(self.value(index), self.positive[index]) for index in sorted(self.positive)]
+        return bins
+
+    '''
+    Estima os quantis pedidos (0 a 1): o valor de posição q * (n - 1) na ordem crescente,
+    limitado ao mínimo e ao máximo observados
+    '''
+    def quantiles(self, quantiles):
+        if not self.count:
+            return [None for _ in quantiles]
+        bins = self.bins()
+        cumulative = np.cumsum([count for _, count in bins])
+        results = []
+        for quantile in quantiles:
+            if quantile in (0, 1):
+                # Mínimo e máximo são conhecidos exatamente
+                results.append(self.min if quantile == 0 else self.max)
+                continue
+            position = int(np.searchsorted(cumulative, quantile * (self.count - 1), side="right"))
+            value = bins[min(position, len(bins) - 1)][0]
+            results.append(min(max(value, self.min), self.max))
+        return results
+
+    '''
+    Histograma em escala logarítmica: faixas [10^(k/b), 10^((k+1)/b)) com b = bins_per_decade,
+    espelhadas para os valores negativos; os zeros formam uma faixa própria.
+    Retorna (limite inferior, limite superior, quantidade), em ordem crescente.
+    '''
+    def histogram(self, bins_per_decade=1):
+        ranges = {}
+        for value, count in self.bins():
+            if value == 0:
+                key = (0, 0)
+            else:
+                step = math.floor(math.log10(abs(value)) * bins_per_decade)
+                key = (1 if value > 0 else -1, step)
+            ranges[key] = ranges.get(key, 0) + count
+
+        histogram = []
+        for (sign, step), count in sorted(ranges.items(), key=lambda item: (item[0][0], item[0][0] * item[0][1])):
+            if sign == 0:
+                histogram.append((0.0, 0.0, count))
+                continue
+            lower, upper = 10 ** (step / bins_per_decade), 10 ** ((step + 1) / bins_per_decade)
+            histogram.append((lower, upper, count) if sign > 0 else (-upper, -lower, count))
+        return histogram
+
+    def to_json(self):
+        return json.dumps({
+            "alpha": self.alpha,
+            "positive": self.positive,
+            "negative": self.negative,
+            "zeros": self.zeros,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+        })
+
+    @classmethod
+    def from_json(cls, content):
+        data = json.loads(content)
+        sketch = cls(data["alpha"])
+        sketch.positive = {int(index): count for index, count in data["positive"].items()}
+        sketch.negative = {int(index): count for index, count in data["negative"].items()}
+        sketch.zeros = data["zeros"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        sketch.min = data["min"]
+        sketch.max = data["max"]
+        return sketch
@@ -0,0 +1,78 @@
+from fastapi import HTTPException, Request
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import Session
+from utils.load_config import load_config
+
+# Código do PostgreSQL para comando cancelado por statement_timeout
+QUERY_CANCELED = "57014"
+
+'''
+Orçamento de custo da rota: tempo máximo por comando (ms) e quantidade máxima de linhas.
+Lido da seção limits do config.yaml, com valores por rota sobrescrevendo o padrão.
+'''
+def get_route_budget(request: Request):
+    limits = load_config().get("limits", {})
+    budget = dict(limits.get("default", {}))
+
+    route = request.scope.get("route")
+    if route is not None:
+        budget.update(limits.get("routes", {}).get(route.path, {}))
+    return budget
+
+# Resultado maior do que o limite de linhas da rota
+class RowLimitExceeded(Exception):
+    def __init__(self, max_rows):
+        super().__init__(f"A consulta ultrapassou o limite de {max_rows} linhas")
+        self.max_rows = max_rows
+
+'''
+Limita as consultas da sessão a max_rows (+1 para detectar o excesso) quando a sessão
+tem um limite configurado em session.info["max_rows"]
+'''
+@event.listens_for(Session, "do_orm_execute")
+def enforce_row_limit(orm_execute_state):
+    max_rows = orm_execute_state.session.info.get("max_rows")
+    if not max_rows or not orm_execute_state.is_select:
+        return
+    if orm_execute_state.is_column_load or orm_execute_state.is_relationship_load:
+        return
+
+    statement = orm_execute_state.statement
+    limit = statement._limit
+    if limit is not None and limit <= max_rows:
+        return
+
+    result = orm_execute_state.invoke_statement(statement=statement.limit(max_rows + 1)).freeze()
+    if len(result.data) > max_rows:
+        raise RowLimitExceeded(max_rows)
+    return result()
+
+# Verifica se o erro do banco foi um cancelamento por statement_timeout
+def is_query_timeout(error):
+    if not isinstance(error, DBAPIError):
+        return False
+    orig = error.orig
+    return QUERY_CANCELED in (getattr(orig, "sqlstate", None), getattr(orig, "pgcode", None))
+
+'''
+Procura, na cadeia de exceções, uma violação do orçamento da rota e a converte no erro HTTP
+correspondente (as rotas convertem qualquer erro em 500, mantendo o original em __context__)
+'''
+def budget_error(error):
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, RowLimitExceeded):
+            return HTTPException(
+                status_code=413,
+                detail=f"{error} - utilize filtros ou paginação para reduzir o resultado",
+            )
+        if is_query_timeout(error):
+            return HTTPException(
+                status_code=503,
+                detail="A consulta excedeu o tempo máximo permitido para esta rota",
+                headers={"Retry-After": "30"},
+            )
+        error = error.__cause__ or error.__context__
+    return None
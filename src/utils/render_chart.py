@@ -0,0 +1,100 @@
+import hashlib
+import io
+import json
+from typing import Literal
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from utils.chart_cache import get_chart_cache
+
+# Formatos de saída aceitos pelas rotas de gráficos
+ChartFormat = Literal["png", "svg", "json"]
+
+MEDIA_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+'''
+Gera a chave do gráfico a partir da série agregada e dos parâmetros de renderização
+'''
+def chart_key(name, series, figsize, format, dpi):
+    payload = json.dumps(
+        {"name": name, "series": series, "figsize": list(figsize), "format": format, "dpi": dpi},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+'''
+Verifica se o cliente já possui a versão atual do gráfico (cabeçalho If-None-Match)
+'''
+def etag_matches(request: Request, etag):
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in tags or "*" in tags
+
+'''
+Converte a série colunar ({coluna: [valores]}) em registros, formato usado pelo Vega-Lite
+'''
+def series_records(series):
+    columns = list(series)
+    return [dict(zip(columns, values)) for values in zip(*series.values())]
+
+'''
+Renderiza a figura com a função de desenho informada
+'''
+def draw_figure(draw, series, figsize, format, dpi):
+    # O matplotlib só é importado quando um gráfico precisa ser desenhado.
+    # Usa a API orientada a objetos, sem o estado global do pyplot
+    from matplotlib.figure import Figure
+    
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    draw(ax, series)
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format=format, dpi=dpi)
+    return buf.getvalue()
+
+'''
+Renderiza o gráfico como imagem (png ou svg), reaproveitando renderizações anteriores pelo cache
+'''
+def render_image(name, series, draw, figsize=(8, 6), format="png", dpi=100):
+    key = chart_key(name, series, figsize, format, dpi)
+    chart_cache = get_chart_cache()
+    content = chart_cache.get(key)
+    if content is None:
+        content = draw_figure(draw, series, figsize, format, dpi)
+        chart_cache.set(key, content)
+    return content
+
+'''
+Monta a representação json do gráfico: registros da série e especificação Vega-Lite
+'''
+def chart_data(name, series, spec=None):
+    records = series_records(series)
+    content = {"name": name, "data": records}
+    if spec is not None:
+        content["spec"] = {**spec, "data": {"values": records}}
+    return jsonable_encoder(content)
+
+'''
+Retorna o gráfico como resposta HTTP no formato solicitado
+'''
+def render_chart(request: Request, name, series, draw, spec=None, figsize=(8, 6), format: ChartFormat = "png", dpi=100):
+    key = chart_key(name, series, figsize, format, dpi)
+    etag = f'"{key}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    # No modo json o matplotlib não é utilizado: o cliente desenha a partir da especificação Vega-Lite
+    if format == "json":
+        return JSONResponse(content=chart_data(name, series, spec), headers=headers)
+
+    content = render_image(name, series, draw, figsize, format, dpi)
+    return Response(content=content, media_type=MEDIA_TYPES[format], headers=headers)
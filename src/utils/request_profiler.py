@@ -0,0 +1,90 @@
+import cProfile
+import io
+import os
+import pstats
+import re
+import uuid
+from datetime import datetime
+from functools import lru_cache
+from utils.load_config import load_config
+
+# Cabeçalho que solicita o perfil da requisição (ex.: X-Profile: 1)
+PROFILE_HEADER = b"x-profile"
+
+# Apenas uma requisição é perfilada por vez (o cProfile é global ao interpretador)
+profiling_active = False
+
+# Identificadores de perfil aceitos na rota de download (evita acesso a outros arquivos)
+PROFILE_ID = re.compile(r"^[\w-]+$")
+
+'''
+Configuração do profiler de requisições (seção profiling.requests do config.yaml).
+Desligado por padrão: deve ser habilitado apenas em ambientes de diagnóstico (ex.: homologação).
+'''
+@lru_cache(maxsize=1)
+def get_request_profiler_config():
+    return {
+        "enabled": False,
+        "directory": os.path.join("logs", "profiles"),
+        "sort": "cumulative",
+        "top": 40,
+        **load_config().get("profiling", {}).get("requests", {}),
+    }
+
+# Caminho do arquivo .prof de um perfil; None para identificadores inválidos
+def profile_path(profile_id, extension="prof"):
+    if not PROFILE_ID.match(profile_id):
+        return None
+    return os.path.join(get_request_profiler_config()["directory"], f"{profile_id}.{extension}")
+
+'''
+Grava o perfil em formato pstats (.prof, para snakeviz/flameprof/gprof2dot) e um resumo em texto (.txt)
+'''
+def save_profile(profiler, profile_id, title):
+    config = get_request_profiler_config()
+    os.makedirs(config["directory"], exist_ok=True)
+    profiler.dump_stats(profile_path(profile_id))
+
+    summary = io.StringIO()
+    summary.write(f"{title}\n\n")
+    pstats.Stats(profiler, stream=summary).sort_stats(config["sort"]).print_stats(config["top"])
+    with open(profile_path(profile_id, "txt"), "w", encoding="utf-8") as file:
+        file.write(summary.getvalue())
+
+'''
+Middleware ASGI que executa a requisição sob o cProfile quando o cabeçalho X-Profile é enviado.
+O identificador do perfil é retornado no cabeçalho X-Profile-Id e o arquivo pode ser baixado em
+/profiling/profiles/{id}. O cProfile mede a thread do event loop: trabalho feito em outras threads
+(threadpool, executores) aparece apenas como espera.
+'''
+class RequestProfilerMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not get_request_profiler_config()["enabled"]:
+            await self.app(scope, receive, send)
+            return
+
+        global profiling_active
+        requested = dict(scope["headers"]).get(PROFILE_HEADER, b"").strip().lower()
+        if requested in (b"", b"0", b"false") or profiling_active:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode("ascii"))]
+            await send(message)
+
+        profiling_active = True
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            profiling_active = False
+            save_profile(profiler, profile_id, f"{scope['method']} {scope['path']}")
@@ -0,0 +1,160 @@
+import contextvars
+import hashlib
+import logging
+import re
+import threading
+from collections import Counter
+from functools import lru_cache
+from utils.load_config import load_config
+from utils.metrics import Counter as MetricCounter, route_label
+
+# Log dedicado às consultas lentas e aos padrões N+1 (configurado em services/configs.logs.yaml)
+logger = logging.getLogger("slow_queries")
+
+# Literais e parâmetros removidos da impressão digital do comando
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+PARAMETER = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<!:):\w+|\?")
+IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+WHITESPACE = re.compile(r"\s+")
+
+'''
+Configuração do profiler (seção profiling.sql do config.yaml):
+- slow_query_ms: duração a partir da qual o comando vai para o log de consultas lentas
+- explain_analyze: captura o plano com EXPLAIN ANALYZE das consultas lentas (PostgreSQL)
+- n_plus_one_threshold: repetições do mesmo comando na requisição que caracterizam N+1
+- top: quantidade de comandos exibidos em /profiling/sql
+'''
+@lru_cache(maxsize=1)
+def get_profiler_config():
+    return {
+        "enabled": True,
+        "slow_query_ms": 200,
+        "explain_analyze": False,
+        "n_plus_one_threshold": 10,
+        "top": 20,
+        **load_config().get("profiling", {}).get("sql", {}),
+    }
+
+'''
+Impressão digital do comando: o SQL sem literais nem parâmetros, para agrupar
+execuções do mesmo comando com valores diferentes
+'''
+@lru_cache(maxsize=1024)
+def fingerprint(statement):
+    normalized = STRING_LITERAL.sub("?", statement)
+    normalized = PARAMETER.sub("?", normalized)
+    normalized = NUMBER_LITERAL.sub("?", normalized)
+    normalized = IN_LIST.sub("IN (...)", normalized)
+    normalized = WHITESPACE.sub(" ", normalized).strip()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12], normalized
+
+
+# Estatísticas acumuladas por impressão digital: execuções, tempo, maior duração e linhas
+class StatementStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.statements = {}
+
+    def record(self, key, normalized, duration, rows):
+        with self.lock:
+            stats = self.statements.get(key)
+            if stats is None:
+                stats = self.statements[key] = {"statement": normalized, "calls": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0}
+            stats["calls"] += 1
+            stats["total_ms"] += duration * 1000
+            stats["max_ms"] = max(stats["max_ms"], duration * 1000)
+            stats["rows"] += max(rows, 0)
+
+    def top(self, limit):
+        with self.lock:
+            items = [{"fingerprint": key, **stats} for key, stats in self.statements.items()]
+        items.sort(key=lambda item: item["total_ms"], reverse=True)
+        for item in items[:limit]:
+            item["total_ms"] = round(item["total_ms"], 2)
+            item["max_ms"] = round(item["max_ms"], 2)
+            item["mean_ms"] = round(item["total_ms"] / item["calls"], 2)
+        return items[:limit]
+
+    def clear(self):
+        with self.lock:
+            self.statements.clear()
+
+    def statement(self, key):
+        with self.lock:
+            return self.statements.get(key, {}).get("statement", "")
+
+
+statement_stats = StatementStats()
+n_plus_one = MetricCounter("db_n_plus_one_total", "Requisições com o mesmo comando SQL repetido acima do limite (N+1)", ("method", "route"))
+
+# Impressões digitais executadas na requisição atual; None fora de uma requisição
+request_statements = contextvars.ContextVar("request_statements", default=None)
+
+# Captura o plano de execução de uma consulta lenta na mesma conexão
+def explain_analyze(conn, statement, parameters):
+    if conn.dialect.name != "postgresql" or not statement.lstrip().upper().startswith("SELECT"):
+        return None
+    try:
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN ANALYZE {statement}", parameters)
+            return "\n".join(row[0] for row in cursor.fetchall())
+        finally:
+            cursor.close()
+    except Exception as e:
+        return f"EXPLAIN ANALYZE indisponível: {e}"
+
+'''
+Registra um comando executado (chamado por after_cursor_execute em database.py):
+acumula as estatísticas da impressão digital, conta a repetição na requisição atual
+e grava no log de consultas lentas quando a duração ultrapassa o limite
+'''
+def profile_statement(conn, statement, parameters, duration, rows):
+    config = get_profiler_config()
+    if not config["enabled"]:
+        return
+
+    key, normalized = fingerprint(statement)
+    statement_stats.record(key, normalized, duration, rows)
+
+    statements = request_statements.get()
+    if statements is not None:
+        statements[key] += 1
+
+    if duration * 1000 >= config["slow_query_ms"]:
+        # rowcount é -1 quando o driver não informa a quantidade de linhas de um SELECT
+        rows_text = f"{rows} linhas" if rows >= 0 else "linhas não informadas"
+        message = f"[{key}] {duration * 1000:.1f} ms, {rows_text}: {normalized}"
+        if config["explain_analyze"]:
+            plan = explain_analyze(conn, statement, parameters)
+            if plan:
+                message += f"\n{plan}"
+        logger.warning(message)
+
+'''
+Middleware ASGI que acompanha os comandos de cada requisição e sinaliza padrões N+1
+(o mesmo comando executado mais vezes do que n_plus_one_threshold)
+'''
+class SQLProfilerMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not get_profiler_config()["enabled"]:
+            await self.app(scope, receive, send)
+            return
+
+        statements = Counter()
+        token = request_statements.set(statements)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_statements.reset(token)
+            threshold = get_profiler_config()["n_plus_one_threshold"]
+            repeated = [(key, count) for key, count in statements.items() if count > threshold]
+            if repeated:
+                route = route_label(scope)
+                n_plus_one.inc(scope["method"], route)
+                for key, count in repeated:
+                    logger.warning(f"Possível N+1 em {scope['method']} {route}: [{key}] executado {count} vezes: {statement_stats.statement(key)}")
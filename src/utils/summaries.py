@@ -0,0 +1,35 @@
+from datetime import datetime
+from sqlmodel import func, select, update
+from models.summary_state import SummaryState
+
+'''
+Trava o estado de um resumo mantido incrementalmente e o retorna ({tabela de origem: SummaryState}).
+O UPDATE inicial bloqueia as linhas do resumo até o commit da sessão (no SQLite, o banco inteiro),
+impedindo que dois workers processem as mesmas linhas novas ao mesmo tempo.
+'''
+def lock_summary(db, name, models):
+    now = datetime.now()
+    db.exec(update(SummaryState).where(SummaryState.name == name).values(updated_at=now))
+    states = {state.source: state for state in db.exec(select(SummaryState).where(SummaryState.name == name)).all()}
+    for model in models:
+        if model.__tablename__ not in states:
+            states[model.__tablename__] = SummaryState(name=name, source=model.__tablename__, updated_at=now)
+            db.add(states[model.__tablename__])
+    db.flush()
+    return states
+
+# Verdadeiro se a tabela apenas recebeu linhas novas desde o último processamento (sem remoções)
+def appended_only(db, model, state, row_count):
+    if row_count < state.row_count:
+        return False
+    appended = db.exec(select(func.count(model.id)).where(model.id > state.last_id)).one()
+    return appended == row_count - state.row_count
+
+# Verdadeiro se alguma tabela de origem tem ids além do último processado pelo resumo (sessão assíncrona de leitura)
+async def summary_outdated(db, name, models):
+    states = {state.source: state.last_id for state in (await db.exec(select(SummaryState).where(SummaryState.name == name))).all()}
+    for model in models:
+        max_id = (await db.exec(select(func.max(model.id)))).one()
+        if model.__tablename__ not in states or (max_id or 0) > states[model.__tablename__]:
+            return True
+    return False
@@ -0,0 +1,132 @@
+from datetime import datetime
+from functools import lru_cache
+from sqlalchemy import bindparam, literal, or_, update
+from sqlmodel import Session, delete, func, insert, select
+from database import get_engine
+from models import *
+from utils.column_store import agreement_years, contract_years
+from utils.load_config import load_config
+from utils.summaries import appended_only, lock_summary
+
+# Configuração dos totais por fornecedor (seção suppliers do config.yaml)
+@lru_cache(maxsize=1)
+def get_suppliers_config():
+    return {
+        "batch_size": 50_000,
+        **load_config().get("suppliers", {}),
+    }
+
+# Escopos pré-agregados: (separa por ano, separa por contratante)
+SCOPES = {
+    "geral": (False, False),
+    "ano": (True, False),
+    "contratante": (False, True),
+    "ano_contratante": (True, True),
+}
+
+def scope_name(by_year, by_contractor):
+    return next(name for name, scope in SCOPES.items() if scope == (by_year, by_contractor))
+
+# Valores de contratos: ano de assinatura, contratante, contratado e CPF/CNPJ do contratado
+def contract_rows():
+    years = contract_years()
+    return (
+        select(ContractValues.id, years.c.ano, Contract.contratante, Contract.contratado, Contract.cpf_cnpj,
+               ContractValues.valor_pago, ContractValues.valor_atualizado)
+        .join(Contract, Contract.id == ContractValues.contract_id)
+        .outerjoin(years, years.c.contract_id == ContractValues.contract_id)
+    )
+
+# Valores de convênios: ano de assinatura, concedente e convenente (sem documento)
+def agreement_rows():
+    years = agreement_years()
+    return (
+        select(AgreementValues.id, years.c.ano, Agreement.concedente, Agreement.convenente, literal(None).label("documento"),
+               AgreementValues.valor_pago, AgreementValues.valor_atualizado_total)
+        .join(Agreement, Agreement.id == AgreementValues.agreement_id)
+        .outerjoin(years, years.c.agreement_id == AgreementValues.agreement_id)
+    )
+
+SOURCES = {
+    "contracts": (ContractValues, contract_rows),
+    "agreements": (AgreementValues, agreement_rows),
+}
+
+'''
+Soma as linhas em lotes (cursor no servidor) em cada escopo.
+Chave: (escopo, ano, contratante, entidade, documento); valor: [quantidade, valor pago, valor atualizado]
+'''
+def accumulate(db, statement, batch_size):
+    deltas = {}
+    result = db.connection().execution_options(stream_results=True, yield_per=batch_size).execute(statement)
+    for rows in result.partitions(batch_size):
+        for _, ano, contratante, entidade, documento, valor_pago, valor_atualizado in rows:
+            ano = None if ano is None else int(ano)
+            for name, (by_year, by_contractor) in SCOPES.items():
+                key = (name, ano if by_year else None, contratante if by_contractor else None, entidade, documento)
+                totals = deltas.setdefault(key, [0, 0.0, 0.0])
+                totals[0] += 1
+                totals[1] += valor_pago or 0.0
+                totals[2] += valor_atualizado or 0.0
+    return deltas
+
+'''
+Atualiza os totais com as linhas novas de cada tabela de valores (bloqueante: executada em um executor).
+Remoções provocam a reconstrução do conjunto de dados; edições no lugar (valores, nomes ou datas)
+só são refletidas pela reconstrução (full=True, POST /suppliers/rebuild).
+'''
+def update_supplier_totals(full=False):
+    config = get_suppliers_config()
+    summary = {}
+    with Session(get_engine()) as db:
+        states = lock_summary(db, "supplier_totals", [model for model, _ in SOURCES.values()])
+        for dataset, (model, statement) in SOURCES.items():
+            state = states[model.__tablename__]
+            row_count, max_id = db.exec(select(func.count(model.id), func.max(model.id))).one()
+            rebuild = full or not appended_only(db, model, state, row_count)
+            new_rows = row_count if rebuild else row_count - state.row_count
+            if rebuild:
+                db.exec(delete(SupplierTotal).where(SupplierTotal.dataset == dataset))
+                state.last_id = 0
+
+            if (max_id or 0) > state.last_id:
+                deltas = accumulate(db, statement().where(model.id > state.last_id, model.id <= max_id), config["batch_size"])
+
+                # Linhas existentes que podem receber as somas: escopos sem ano e os anos afetados
+                years = {key[1] for key in deltas if key[1] is not None}
+                existing = {}
+                if not rebuild:
+                    stmt = select(SupplierTotal.id, SupplierTotal.escopo, SupplierTotal.ano, SupplierTotal.contratante, SupplierTotal.entidade, SupplierTotal.documento).where(
+                        SupplierTotal.dataset == dataset,
+                        or_(SupplierTotal.escopo.in_(["geral", "contratante"]), SupplierTotal.ano.in_(years), SupplierTotal.ano.is_(None)),
+                    )
+                    existing = {tuple(key): total_id for total_id, *key in db.exec(stmt).all()}
+
+                # Chaves novas em um único INSERT em massa; as existentes recebem as somas em um UPDATE com vários parâmetros
+                inserts, updates = [], []
+                for key, (quantidade, valor_pago, valor_atualizado) in deltas.items():
+                    if key in existing:
+                        updates.append({"total_id": existing[key], "delta_quantidade": quantidade, "delta_pago": valor_pago, "delta_atualizado": valor_atualizado})
+                    else:
+                        escopo, ano, contratante, entidade, documento = key
+                        inserts.append({
+                            "dataset": dataset, "escopo": escopo, "ano": ano, "contratante": contratante, "entidade": entidade, "documento": documento,
+                            "quantidade": quantidade, "valor_pago": valor_pago, "valor_atualizado": valor_atualizado,
+                        })
+                if inserts:
+                    db.exec(insert(SupplierTotal), params=inserts)
+                if updates:
+                    table = SupplierTotal.__table__
+                    stmt = update(table).where(table.c.id == bindparam("total_id")).values(
+                        quantidade=table.c.quantidade + bindparam("delta_quantidade"),
+                        valor_pago=table.c.valor_pago + bindparam("delta_pago"),
+                        valor_atualizado=table.c.valor_atualizado + bindparam("delta_atualizado"),
+                    )
+                    db.connection().execute(stmt, updates)
+
+            state.last_id = max_id or 0
+            state.row_count = row_count
+            state.updated_at = datetime.now()
+            summary[dataset] = {"rebuild": rebuild, "rows": new_rows}
+        db.commit()
+    return summary
@@ -0,0 +1,129 @@
+from datetime import datetime
+from functools import lru_cache
+from sqlalchemy import bindparam, literal, update
+from sqlmodel import Session, delete, func, insert, select
+from database import get_engine
+from models import *
+from utils.column_store import agreement_years, contract_years
+from utils.load_config import load_config
+from utils.quantile_sketch import QuantileSketch
+from utils.summaries import appended_only, lock_summary
+
+# Configuração dos sketches de quantis (seção distributions do config.yaml)
+@lru_cache(maxsize=1)
+def get_distributions_config():
+    return {
+        "alpha": 0.01,
+        "batch_size": 50_000,
+        **load_config().get("distributions", {}),
+    }
+
+# Colunas de valores com sketches, por conjunto de dados
+SKETCH_COLUMNS = {
+    "contracts": ["valor_original", "valor_aditivo", "valor_atualizado", "valor_empenhado", "valor_pago"],
+    "agreements": ["valor_inicial_total", "valor_inicial_repasse_concedente", "valor_inicial_contrapartida_convenente", "valor_atualizado_total", "valor_pago"],
+}
+
+# Modalidade de licitação de cada contrato (a menor entre os processos do contrato)
+def contract_modalities():
+    return (
+        select(AdministrativeProcess.contract_id, func.min(AdministrativeProcess.modalidade_de_licitacao).label("modalidade"))
+        .group_by(AdministrativeProcess.contract_id)
+        .subquery()
+    )
+
+# Valores de contratos com a partição: ano de assinatura e modalidade de licitação do contrato
+def contract_rows():
+    years = contract_years()
+    modalities = contract_modalities()
+    return (
+        select(ContractValues.id, years.c.ano, modalities.c.modalidade, *[getattr(ContractValues, column) for column in SKETCH_COLUMNS["contracts"]])
+        .outerjoin(years, years.c.contract_id == ContractValues.contract_id)
+        .outerjoin(modalities, modalities.c.contract_id == ContractValues.contract_id)
+    )
+
+# Valores de convênios com a partição: ano de assinatura (convênios não têm modalidade)
+def agreement_rows():
+    years = agreement_years()
+    return (
+        select(AgreementValues.id, years.c.ano, literal(None).label("modalidade"), *[getattr(AgreementValues, column) for column in SKETCH_COLUMNS["agreements"]])
+        .outerjoin(years, years.c.agreement_id == AgreementValues.agreement_id)
+    )
+
+SOURCES = {
+    "contracts": (ContractValues, contract_rows),
+    "agreements": (AgreementValues, agreement_rows),
+}
+
+'''
+Lê as linhas em lotes (cursor no servidor) e monta um sketch por (ano, modalidade, coluna)
+'''
+def sketch_rows(db, statement, columns, alpha, batch_size):
+    import numpy as np
+
+    sketches = {}
+    result = db.connection().execution_options(stream_results=True, yield_per=batch_size).execute(statement)
+    for rows in result.partitions(batch_size):
+        partitions = {}
+        for row in rows:
+            ano = None if row[1] is None else int(row[1])
+            partitions.setdefault((ano, row[2]), []).append(row[3:])
+        for (ano, modalidade), values in partitions.items():
+            matrix = np.array(values, dtype=np.float64)
+            for index, column in enumerate(columns):
+                sketches.setdefault((ano, modalidade, column), QuantileSketch(alpha)).add(matrix[:, index])
+    return sketches
+
+'''
+Atualiza os sketches com as linhas novas de cada tabela de valores (bloqueante: executada em um executor).
+Remoções ou mudança da precisão (alpha) provocam a reconstrução do conjunto de dados; edições no lugar
+só são refletidas pela reconstrução (full=True, POST /distributions/rebuild).
+'''
+def update_value_sketches(full=False):
+    config = get_distributions_config()
+    summary = {}
+    with Session(get_engine()) as db:
+        states = lock_summary(db, "value_sketches", [model for model, _ in SOURCES.values()])
+        for dataset, (model, statement) in SOURCES.items():
+            state = states[model.__tablename__]
+            row_count, max_id = db.exec(select(func.count(model.id), func.max(model.id))).one()
+            stored = {
+                (sketch.ano, sketch.modalidade, sketch.coluna): sketch
+                for sketch in db.exec(select(ValueSketch).where(ValueSketch.dataset == dataset)).all()
+            }
+            loaded = {key: QuantileSketch.from_json(sketch.sketch) for key, sketch in stored.items()}
+
+            rebuild = (
+                full
+                or not appended_only(db, model, state, row_count)
+                or any(sketch.alpha != config["alpha"] for sketch in loaded.values())
+            )
+            new_rows = row_count if rebuild else row_count - state.row_count
+            if rebuild:
+                db.exec(delete(ValueSketch).where(ValueSketch.dataset == dataset))
+                stored, loaded, state.last_id = {}, {}, 0
+
+            if (max_id or 0) > state.last_id:
+                sketches = sketch_rows(db, statement().where(model.id > state.last_id, model.id <= max_id), SKETCH_COLUMNS[dataset], config["alpha"], config["batch_size"])
+                # Partições novas em um único INSERT em massa; as existentes, em um UPDATE com vários parâmetros
+                inserts, updates = [], []
+                for (ano, modalidade, column), sketch in sketches.items():
+                    key = (ano, modalidade, column)
+                    if key in loaded:
+                        sketch = loaded[key].merge(sketch)
+                        updates.append({"sketch_id": stored[key].id, "count": sketch.count, "data": sketch.to_json()})
+                    else:
+                        inserts.append({"dataset": dataset, "coluna": column, "ano": ano, "modalidade": modalidade, "quantidade": sketch.count, "sketch": sketch.to_json()})
+                if inserts:
+                    db.exec(insert(ValueSketch), params=inserts)
+                if updates:
+                    table = ValueSketch.__table__
+                    stmt = update(table).where(table.c.id == bindparam("sketch_id")).values(quantidade=bindparam("count"), sketch=bindparam("data"))
+                    db.connection().execute(stmt, updates)
+
+            state.last_id = max_id or 0
+            state.row_count = row_count
+            state.updated_at = datetime.now()
+            summary[dataset] = {"rebuild": rebuild, "rows": new_rows}
+        db.commit()
+    return summary
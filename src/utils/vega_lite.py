@@ -0,0 +1,60 @@
+'''
+Especificações Vega-Lite equivalentes aos gráficos renderizados com matplotlib,
+para que o front end possa desenhar os gráficos no cliente
+'''
+SCHEMA = "https://vega.github.io/schema/vega-lite/v5.json"
+
+# Gráfico de pizza (arc) com a fatia proporcional ao campo theta
+def pie_spec(title, theta, color):
+    return {
+        "$schema": SCHEMA,
+        "title": title,
+        "mark": {"type": "arc", "tooltip": True},
+        "encoding": {
+            "theta": {"field": theta, "type": "quantitative", "stack": "normalize"},
+            "color": {"field": color, "type": "nominal"},
+        },
+    }
+
+# Gráfico de linha com pontos
+def line_spec(title, x, y, x_title=None, y_title=None):
+    return {
+        "$schema": SCHEMA,
+        "title": title,
+        "mark": {"type": "line", "point": True, "tooltip": True},
+        "encoding": {
+            "x": {"field": x, "type": "ordinal", "title": x_title or x},
+            "y": {"field": y, "type": "quantitative", "title": y_title or y},
+        },
+    }
+
+# Gráfico de barras simples
+def bar_spec(title, x, y, x_title=None, y_title=None):
+    return {
+        "$schema": SCHEMA,
+        "title": title,
+        "mark": {"type": "bar", "tooltip": True},
+        "encoding": {
+            "x": {"field": x, "type": "nominal", "title": x_title or x, "sort": None},
+            "y": {"field": y, "type": "quantitative", "title": y_title or y},
+        },
+    }
+
+# Gráfico de barras agrupadas, uma barra por campo em fields ({campo: legenda})
+def grouped_bar_spec(title, x, fields, x_title=None, y_title=None):
+    return {
+        "$schema": SCHEMA,
+        "title": title,
+        "transform": [
+            # Renomeia cada campo para a sua legenda antes de empilhar as séries
+            *[{"calculate": f"datum['{field}']", "as": label} for field, label in fields.items()],
+            {"fold": list(fields.values()), "as": ["serie", "valor"]},
+        ],
+        "mark": {"type": "bar", "tooltip": True},
+        "encoding": {
+            "x": {"field": x, "type": "ordinal", "title": x_title or x},
+            "xOffset": {"field": "serie"},
+            "y": {"field": "valor", "type": "quantitative", "title": y_title or "valor"},
+            "color": {"field": "serie", "type": "nominal", "title": None},
+        },
+    }